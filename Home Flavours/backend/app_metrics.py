@@ -0,0 +1,289 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import METRICS_EXPORTER_CONFIG
+from page_profiler import profiler
+
+# Upper bounds in seconds of the page render histogram buckets
+RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def histogram_samples(name, labels, buckets, counts, total, count):
+    """_bucket/_sum/_count samples from per-bucket (not cumulative) counts; counts[-1] is +Inf"""
+    samples = []
+    cumulative = 0
+    for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+        cumulative += bucket_count
+        samples.append((f'{name}_bucket', dict(labels, le=format_value(float(bound))), cumulative))
+    samples.append((f'{name}_sum', labels, total))
+    samples.append((f'{name}_count', labels, count))
+    return samples
+
+
+class Metric:
+    """A named metric family with a fixed set of label names"""
+    kind = 'untyped'
+    zero = 0
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # label values -> value; unlabelled metrics report 0 before their first update
+        self._values = {(): self.zero} if not self.labels and self.zero is not None else {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels ({', '.join(self.labels)}), got ({', '.join(labels)})")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labels, key)), value) for key, value in self._values.items()]
+
+    def families(self):
+        return [(self.name, self.kind, self.help, self.samples())]
+
+
+class Counter(Metric):
+    """Monotonic count, e.g. logins or orders placed"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down, e.g. active sessions"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Fixed-bucket distribution, e.g. page render seconds"""
+    kind = 'histogram'
+    zero = None
+
+    def __init__(self, name, help, labels=(), buckets=RENDER_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (last is +Inf), sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            entries = [(dict(zip(self.labels, key)), list(counts), total, count)
+                       for key, (counts, total, count) in self._values.items()]
+        samples = []
+        for labels, counts, total, count in entries:
+            samples.extend(histogram_samples(self.name, labels, self.buckets, counts, total, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text format.
+
+    Metrics the app updates as it runs are created with counter(), gauge()
+    and histogram(). Numbers other components already keep (pool, cache and
+    query stats) are read at scrape time by collectors, so the hot paths
+    pay nothing for them.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=RENDER_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector):
+        """Register a callable returning [(name, type, help, samples)] at scrape time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def watch_database(self, name, db):
+        """Export a database manager's pool, cache and query stats labelled db=name"""
+        self.add_collector(DatabaseCollector(name, db))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            sources = list(self._metrics.values()) + list(self._collectors)
+
+        families = {}  # name -> (type, help, samples); collectors for several dbs share names
+        for source in sources:
+            try:
+                collected = source.families() if isinstance(source, Metric) else source()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, kind, help, samples in collected:
+                families.setdefault(name, (kind, help, []))[2].extend(samples)
+
+        lines = []
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Streamlit re-runs page scripts; hand back the same metric
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+
+class DatabaseCollector:
+    """Reads pool utilisation, cache hit rate and query latency from a database manager"""
+
+    def __init__(self, name, db):
+        self.name = name
+        self.db = db
+
+    def __call__(self):
+        labels = {'db': self.name}
+        pool = self.db.pool_stats()
+        cache = self.db.cache_stats()
+        latency, errors = self.db.stats.latency()
+        return [
+            ('homeflavours_db_pool_size', 'gauge', 'Maximum pooled connections',
+             [('homeflavours_db_pool_size', labels, pool['pool_size'])]),
+            ('homeflavours_db_pool_connections', 'gauge', 'Open pooled connections by state',
+             [('homeflavours_db_pool_connections', dict(labels, state='in_use'), pool['in_use']),
+              ('homeflavours_db_pool_connections', dict(labels, state='idle'), pool['idle'])]),
+            ('homeflavours_db_pool_utilization', 'gauge', 'Share of the pool checked out',
+             [('homeflavours_db_pool_utilization', labels,
+               pool['in_use'] / pool['pool_size'] if pool['pool_size'] else 0.0)]),
+            ('homeflavours_db_pool_checkouts_total', 'counter', 'Connection checkouts',
+             [('homeflavours_db_pool_checkouts_total', labels, pool['checkouts'])]),
+            ('homeflavours_db_pool_waits_total', 'counter', 'Checkouts that had to wait for a connection',
+             [('homeflavours_db_pool_waits_total', labels, pool['waits'])]),
+            ('homeflavours_db_pool_timeouts_total', 'counter', 'Checkouts that timed out',
+             [('homeflavours_db_pool_timeouts_total', labels, pool['timeouts'])]),
+            ('homeflavours_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection',
+             [('homeflavours_db_pool_wait_seconds_total', labels, pool['wait_time_total'])]),
+            ('homeflavours_query_cache_hits_total', 'counter', 'Query cache hits',
+             [('homeflavours_query_cache_hits_total', labels, cache['hits'])]),
+            ('homeflavours_query_cache_misses_total', 'counter', 'Query cache misses',
+             [('homeflavours_query_cache_misses_total', labels, cache['misses'])]),
+            ('homeflavours_query_cache_hit_ratio', 'gauge', 'Query cache hits over lookups since start',
+             [('homeflavours_query_cache_hit_ratio', labels, cache['hit_rate'])]),
+            ('homeflavours_query_cache_entries', 'gauge', 'Cached query results',
+             [('homeflavours_query_cache_entries', labels, cache['entries'])]),
+            ('homeflavours_query_duration_seconds', 'histogram', 'Statement latency',
+             histogram_samples('homeflavours_query_duration_seconds', labels, latency.buckets,
+                               latency.counts, latency.total, latency.count)),
+            ('homeflavours_query_errors_total', 'counter', 'Statements that failed',
+             [('homeflavours_query_errors_total', labels, errors)]),
+        ]
+
+
+class MetricsExporter:
+    """Serves a registry at /metrics from a daemon thread beside Streamlit"""
+
+    def __init__(self, registry, port, host='127.0.0.1'):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self._server = None
+
+    def start(self):
+        """Start serving; returns False if the port could not be bound"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the console
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on {self.host}:{self.port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-exporter', daemon=True).start()
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+registry = MetricsRegistry()
+
+logins = registry.counter('homeflavours_logins_total', 'Login attempts by result', ('result',))
+orders_placed = registry.counter('homeflavours_orders_placed_total', 'Orders placed')
+cart_adds = registry.counter('homeflavours_cart_adds_total', 'Items added to a cart')
+page_renders = registry.histogram(
+    'homeflavours_page_render_seconds', 'Wall time of one run of a show_* page', ('page',)
+)
+profiler.add_observer(lambda page, wall: page_renders.observe(wall, page=page))
+
+exporter = MetricsExporter(registry, **METRICS_EXPORTER_CONFIG)
+if exporter.port:
+    exporter.start()
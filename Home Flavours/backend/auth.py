@@ -2,6 +2,7 @@ import streamlit as st
 import hashlib
 import streamlit_authenticator as stauth
 from database import db
+from app_metrics import logins
 import pandas as pd
 
 class AuthManager:
@@ -69,6 +70,7 @@ class AuthManager:
             )
             
             if not user:
+                logins.inc(result='failure')
                 return False, "Invalid username or password"
             
             user = user[0]
@@ -81,11 +83,14 @@ class AuthManager:
                 st.session_state.username = user['username']
                 st.session_state.full_name = user['full_name']
                 st.session_state.user_type = user['user_type']
+                logins.inc(result='success')
                 return True, "Login successful!"
             else:
+                logins.inc(result='failure')
                 return False, "Invalid username or password"
                 
         except Exception as e:
+            logins.inc(result='error')
             return False, f"Error during login: {str(e)}"
     
     def logout_user(self):
@@ -0,0 +1,26 @@
+from app_metrics import cart_adds
+
+class CartService:
+    """Cart writes keyed on the unique (user, menu item) pair"""
+
+    def __init__(self, db, user_column='customer_id'):
+        self.db = db
+        self.user_column = user_column
+
+    def add_item(self, user_id, menu_item_id, quantity):
+        """Add quantity of a menu item to the user's cart in one statement.
+
+        The unique key on (user, menu_item_id) turns a second add of the same
+        item into an in-place increment, so concurrent clicks never lose
+        quantity or create duplicate rows.
+        """
+        result = self.db.execute_write(
+            f"""INSERT INTO cart ({self.user_column}, menu_item_id, quantity)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)""",
+            (user_id, menu_item_id, quantity)
+        )
+        if result is None:
+            return False
+        cart_adds.inc()
+        return True
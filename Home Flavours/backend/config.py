@@ -1,7 +1,11 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    # simple_main.py runs without python-dotenv; settings then come from the environment only
+    pass
 
 # Database Configuration
 DB_CONFIG = {
@@ -12,6 +16,73 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 3306))
 }
 
+# Database engine: mysql, or sqlite for a single local file (WAL mode, one
+# connection per thread) with no server to run
+DB_BACKEND_CONFIG = {
+    'engine': os.getenv('DB_BACKEND', 'mysql'),
+    'sqlite_path': os.getenv('SQLITE_PATH', 'home_flavours.db'),
+    # Seconds a statement waits for another connection's write to finish
+    'busy_timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', 30))
+}
+
+# Connection Pool Configuration
+DB_POOL_CONFIG = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'idle_timeout': int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+    'checkout_timeout': int(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 30)),
+    'ping_interval': int(os.getenv('DB_POOL_PING_INTERVAL', 30))
+}
+
+# Query Cache Configuration (QUERY_CACHE_SIZE=0 disables the cache)
+QUERY_CACHE_CONFIG = {
+    'max_entries': int(os.getenv('QUERY_CACHE_SIZE', 1024)),
+    'ttl': float(os.getenv('QUERY_CACHE_TTL', 30))
+}
+
+# Query latency stats; statements slower than the threshold (seconds) go to
+# the slow-query log shown in the admin Settings tab
+QUERY_STATS_CONFIG = {
+    'slow_threshold': float(os.getenv('SLOW_QUERY_THRESHOLD', 0.5)),
+    'slow_log_size': int(os.getenv('SLOW_QUERY_LOG_SIZE', 100)),
+    # A statement repeated this often in one page run is flagged as N+1
+    'n_plus_one_threshold': int(os.getenv('N_PLUS_ONE_THRESHOLD', 5)),
+    # Raise QueryBudgetExceeded when a page goes over budget (for tests)
+    'strict_budgets': os.getenv('QUERY_BUDGET_STRICT', '0') == '1'
+}
+
+# Worker threads for loading a page's independent queries concurrently;
+# keep this below DB_POOL_SIZE so the page thread can still get a connection
+DATA_LOADER_CONFIG = {
+    'max_workers': int(os.getenv('DATA_LOADER_WORKERS', 4))
+}
+
+# Admin overview metrics are recomputed at most once per window
+METRICS_CONFIG = {
+    'ttl': float(os.getenv('METRICS_CACHE_TTL', 10))
+}
+
+# Page profiling; PAGE_PROFILE_DUMPS keeps .prof files of the slowest runs
+PAGE_PROFILER_CONFIG = {
+    'enabled': os.getenv('PAGE_PROFILING', '0') == '1',
+    'keep_slowest': int(os.getenv('PAGE_PROFILE_DUMPS', 0)),
+    'dump_dir': os.getenv('PAGE_PROFILE_DIR', 'profiles')
+}
+
+# Prometheus /metrics endpoint; METRICS_PORT=0 leaves it off
+METRICS_EXPORTER_CONFIG = {
+    'port': int(os.getenv('METRICS_PORT', 0)),
+    'host': os.getenv('METRICS_HOST', '127.0.0.1')
+}
+
+# simple_main.py's shared store journal; an empty SIMPLE_STORE_PATH keeps
+# the data in memory only
+SIMPLE_STORE_CONFIG = {
+    'path': os.getenv('SIMPLE_STORE_PATH', 'simple_store.jsonl') or None,
+    # Rewrite the journal as one snapshot after this many appended changes
+    'compact_every': int(os.getenv('SIMPLE_STORE_COMPACT_EVERY', 1000)),
+    'fsync': os.getenv('SIMPLE_STORE_FSYNC', '0') == '1'
+}
+
 # Application Configuration
 APP_CONFIG = {
     'title': 'Home Flavours',
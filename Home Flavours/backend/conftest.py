@@ -0,0 +1,49 @@
+import atexit
+import os
+import shutil
+import tempfile
+import pytest
+
+# Keep module-level singletons off disk and off MySQL: simple_store's store
+# stays in memory and database.py / database_config.py open a throwaway SQLite file
+os.environ['SIMPLE_STORE_PATH'] = ''
+os.environ['DB_BACKEND'] = 'sqlite'
+_singleton_dir = tempfile.mkdtemp(prefix='home_flavours_tests_')
+atexit.register(shutil.rmtree, _singleton_dir, ignore_errors=True)
+os.environ['SQLITE_PATH'] = os.path.join(_singleton_dir, 'home_flavours.db')
+
+from database_base import BaseDatabaseManager
+from migrations import MigrationRunner
+
+# test_mysql.py is a manual check against a live MySQL server, not a pytest suite
+collect_ignore = ['test_mysql.py']
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """A database manager with the query cache on, backed by a throwaway SQLite file"""
+    db = BaseDatabaseManager(
+        {}, {'pool_size': 4, 'checkout_timeout': 5},
+        cache_config={'max_entries': 100, 'ttl': 60},
+        backend_config={'engine': 'sqlite', 'sqlite_path': str(tmp_path / 'test.db')}
+    )
+    yield db
+    db.pool.close()
+
+@pytest.fixture
+def app_db(sqlite_db):
+    """sqlite_db with database.py's schema, one customer (id 1), one tiffin maker (id 1) and two menu items"""
+    from database import SQLITE_MIGRATIONS
+    MigrationRunner(sqlite_db, SQLITE_MIGRATIONS).migrate()
+    sqlite_db.execute_batch([
+        ("INSERT INTO users (username, email, password, full_name, user_type) VALUES (%s, %s, %s, %s, %s)",
+         ('asha', 'asha@example.com', '-', 'Asha', 'customer')),
+        ("INSERT INTO users (username, email, password, full_name, user_type) VALUES (%s, %s, %s, %s, %s)",
+         ('ravi', 'ravi@example.com', '-', 'Ravi', 'tiffin_maker')),
+        ("INSERT INTO tiffin_makers (user_id, business_name, location) VALUES (%s, %s, %s)",
+         (2, "Ravi's Kitchen", 'Pune')),
+        ("INSERT INTO menu_items (name, price, day_of_week, tiffin_maker_id) VALUES (%s, %s, %s, %s)",
+         ('Dal Khichdi', 80, 'Monday', 1)),
+        ("INSERT INTO menu_items (name, price, day_of_week, tiffin_maker_id) VALUES (%s, %s, %s, %s)",
+         ('Rajma Chawal', 85, 'Tuesday', 1)),
+    ])
+    return sqlite_db
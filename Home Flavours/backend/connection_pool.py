@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection is returned to the pool in time"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections with idle eviction.
+
+    Connections idle for longer than ping_interval are health-checked with
+    ping() on checkout and replaced only if the check fails.
+    """
+
+    def __init__(self, connect, pool_size=5, idle_timeout=300, checkout_timeout=30,
+                 ping=None, ping_interval=30):
+        self._connect = connect
+        self._ping = ping
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+
+        # Idle connections as (connection, last_used); the right end is the
+        # most recently returned one, so hot connections get reused and cold
+        # ones drift to the left where eviction finds them.
+        self._idle = deque()
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._created = 0
+        self._evicted = 0
+        self._reconnects = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def acquire(self):
+        """Check out a connection, waiting up to checkout_timeout for one"""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        waited = False
+
+        with self._condition:
+            if self._closed:
+                raise PoolTimeoutError("Connection pool is closed")
+            stale = self._pop_stale()
+
+            last_used = None
+            while True:
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.pool_size:
+                    connection = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No connection available after {self.checkout_timeout}s "
+                        f"(pool size {self.pool_size})"
+                    )
+                waited = True
+                self._condition.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            wait_time = time.monotonic() - start
+            if waited:
+                self._waits += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        self._close_all(stale)
+
+        if connection is not None and not self._healthy(connection, last_used):
+            self._close_all([connection])
+            connection = None
+            with self._condition:
+                self._reconnects += 1
+
+        if connection is None:
+            try:
+                connection = self._connect()
+            except Exception:
+                with self._condition:
+                    self._in_use -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._created += 1
+
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if discard is set"""
+        with self._condition:
+            self._in_use -= 1
+            if discard or self._closed:
+                to_close = [connection]
+            else:
+                self._idle.append((connection, time.monotonic()))
+                to_close = self._pop_stale()
+            self._condition.notify()
+
+        self._close_all(to_close)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def evict_idle(self):
+        """Close connections that have been idle longer than idle_timeout"""
+        with self._condition:
+            stale = self._pop_stale()
+        self._close_all(stale)
+        return len(stale)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        self._close_all(idle)
+
+    def stats(self):
+        """Snapshot of pool utilisation and checkout wait metrics"""
+        with self._condition:
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'pid': os.getpid(),
+                'connections': self._in_use + len(self._idle),
+                'created': self._created,
+                'evicted': self._evicted,
+                'reconnects': self._reconnects,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_time_total': self._wait_time_total,
+                'wait_time_max': self._wait_time_max,
+                'wait_time_avg': self._wait_time_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def _healthy(self, connection, last_used):
+        """Ping a connection that has sat idle long enough to have gone stale"""
+        if self._ping is None or time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            return self._ping(connection)
+        except Exception:
+            return False
+
+    def _pop_stale(self):
+        """Remove idle connections past idle_timeout; caller holds the lock"""
+        stale = []
+        if self.idle_timeout is None:
+            return stale
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff:
+            stale.append(self._idle.popleft()[0])
+        self._evicted += len(stale)
+        return stale
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
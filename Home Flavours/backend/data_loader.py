@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class DataLoader:
+    """Runs a page's independent reads concurrently on a bounded thread pool.
+
+    Each worker checks out its own pooled connection, so a tab that needs
+    several unrelated queries waits for the slowest one instead of the sum.
+    """
+
+    def __init__(self, db, max_workers=4):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='data-loader')
+        self._local = threading.local()
+
+    def load(self, **tasks):
+        """Run tasks concurrently and return {name: result}.
+
+        A task is a (query, params) pair for execute_query or a callable
+        taking no arguments. Tasks run inline when there is only one, when
+        called from a worker, or inside a transaction, whose connection the
+        workers could not see.
+        """
+        if len(tasks) <= 1 or getattr(self._local, 'worker', False) or self.db.in_transaction():
+            return {name: self._call(task) for name, task in tasks.items()}
+
+        # Workers can't see the caller's page or query trackers; pass them along
+        context = self.db.stats.context()
+        if context[0] is None:
+            context = (self.db.stats.current_page(), context[1])
+        futures = {name: self._executor.submit(self._run, task, context) for name, task in tasks.items()}
+        results = {}
+        for name, future in futures.items():
+            results[name], errors = future.result()
+            # Report from the page thread, where Streamlit can show them
+            for message in errors:
+                self.db.report_error(message)
+        return results
+
+    def _run(self, task, context):
+        self._local.worker = True
+        with self.db.stats.attach(context), self.db.deferred_errors() as errors:
+            return self._call(task), errors
+
+    def _call(self, task):
+        if callable(task):
+            return task()
+        query, params = task
+        return self.db.execute_query(query, params)
@@ -1,153 +1,360 @@
-import mysql.connector
 from mysql.connector import Error
 import pandas as pd
-from config import DB_CONFIG
+from config import (DB_CONFIG, DB_BACKEND_CONFIG, DB_POOL_CONFIG, QUERY_CACHE_CONFIG, QUERY_STATS_CONFIG,
+                    DATA_LOADER_CONFIG, METRICS_CONFIG, WEEKLY_MENU)
+from database_base import BaseDatabaseManager
+from connection_pool import PoolTimeoutError
+from migrations import Migration, MigrationRunner, MigrationError
+from menu_catalog import MenuCatalog
+from order_rollups import OrderRollups
+from data_loader import DataLoader
+from metrics_service import MetricsService
+from page_profiler import profiler
+from app_metrics import registry
 import streamlit as st
 
-class DatabaseManager:
+# Schema history; append new migrations, never edit applied ones
+MIGRATIONS = [
+    Migration(1, "initial schema", [
+        # Users table
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15),
+            address TEXT,
+            user_type ENUM('customer', 'tiffin_maker', 'admin') DEFAULT 'customer',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Tiffin makers table
+        """
+        CREATE TABLE IF NOT EXISTS tiffin_makers (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT,
+            business_name VARCHAR(100) NOT NULL,
+            location VARCHAR(200) NOT NULL,
+            cuisine_specialty VARCHAR(100),
+            rating DECIMAL(3,2) DEFAULT 0.0,
+            is_active BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+        """,
+        # Menu items table
+        """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            price DECIMAL(10,2) NOT NULL,
+            day_of_week VARCHAR(20),
+            tiffin_maker_id INT,
+            is_available BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (tiffin_maker_id) REFERENCES tiffin_makers(id)
+        )
+        """,
+        # Orders table
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT,
+            tiffin_maker_id INT,
+            order_date DATE NOT NULL,
+            delivery_date DATE NOT NULL,
+            total_amount DECIMAL(10,2) NOT NULL,
+            payment_method ENUM('COD', 'GPay') NOT NULL,
+            status ENUM('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled') DEFAULT 'pending',
+            delivery_address TEXT,
+            special_instructions TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES users(id),
+            FOREIGN KEY (tiffin_maker_id) REFERENCES tiffin_makers(id)
+        )
+        """,
+        # Order items table
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT,
+            menu_item_id INT,
+            quantity INT NOT NULL,
+            price_per_unit DECIMAL(10,2) NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders(id),
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """,
+        # Cart table
+        """
+        CREATE TABLE IF NOT EXISTS cart (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT,
+            menu_item_id INT,
+            quantity INT NOT NULL,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES users(id),
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """
+    ]),
+    # Covering indexes for the filters and orderings the pages use
+    Migration(2, "indexes for dashboard queries", [
+        """
+        ALTER TABLE orders
+            ADD INDEX idx_orders_maker_delivery (tiffin_maker_id, delivery_date, status),
+            ADD INDEX idx_orders_maker_created (tiffin_maker_id, created_at, status, total_amount),
+            ADD INDEX idx_orders_customer_created (customer_id, created_at),
+            ADD INDEX idx_orders_created (created_at, status, total_amount),
+            ADD INDEX idx_orders_delivery_created (delivery_date, created_at)
+        """,
+        "ALTER TABLE cart ADD INDEX idx_cart_customer_item (customer_id, menu_item_id)",
+        "ALTER TABLE menu_items ADD INDEX idx_menu_items_name_day (name, day_of_week)",
+        """
+        ALTER TABLE users
+            ADD INDEX idx_users_created (created_at),
+            ADD INDEX idx_users_type_created (user_type, created_at)
+        """
+    ]),
+    # One cart row per (user, menu item) so adds can upsert atomically
+    Migration(3, "unique cart item per user", [
+        # Fold existing duplicate rows into the oldest one first
+        """
+        UPDATE cart c
+        JOIN (
+            SELECT customer_id, menu_item_id, MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM cart
+            GROUP BY customer_id, menu_item_id
+            HAVING COUNT(*) > 1
+        ) d ON c.id = d.keep_id
+        SET c.quantity = d.total
+        """,
+        """
+        DELETE c FROM cart c
+        JOIN cart k ON c.customer_id = k.customer_id AND c.menu_item_id = k.menu_item_id AND c.id > k.id
+        """,
+        "ALTER TABLE cart ADD UNIQUE KEY uq_cart_customer_item (customer_id, menu_item_id)",
+        "ALTER TABLE cart DROP INDEX idx_cart_customer_item"
+    ]),
+    # Daily order counts and revenue per maker and status for the charts
+    Migration(4, "daily order rollups", [
+        """
+        CREATE TABLE IF NOT EXISTS order_daily_rollups (
+            day DATE NOT NULL,
+            tiffin_maker_id INT NOT NULL,
+            status VARCHAR(32) NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, tiffin_maker_id, status),
+            INDEX idx_rollups_maker_day (tiffin_maker_id, day)
+        )
+        """,
+        # Backfill from the existing order history
+        """
+        INSERT INTO order_daily_rollups (day, tiffin_maker_id, status, order_count, revenue)
+        SELECT DATE(created_at), COALESCE(tiffin_maker_id, 0), status, COUNT(*), SUM(total_amount)
+        FROM orders
+        GROUP BY DATE(created_at), COALESCE(tiffin_maker_id, 0), status
+        """
+    ])
+]
+
+# The same schema history for DB_BACKEND=sqlite; keep the versions in step
+SQLITE_MIGRATIONS = [
+    Migration(1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15),
+            address TEXT,
+            user_type TEXT DEFAULT 'customer' CHECK (user_type IN ('customer', 'tiffin_maker', 'admin')),
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tiffin_makers (
+            id INTEGER PRIMARY KEY,
+            user_id INT REFERENCES users(id),
+            business_name VARCHAR(100) NOT NULL,
+            location VARCHAR(200) NOT NULL,
+            cuisine_specialty VARCHAR(100),
+            rating DECIMAL(3,2) DEFAULT 0.0,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            price DECIMAL(10,2) NOT NULL,
+            day_of_week VARCHAR(20),
+            tiffin_maker_id INT REFERENCES tiffin_makers(id),
+            is_available BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY,
+            customer_id INT REFERENCES users(id),
+            tiffin_maker_id INT REFERENCES tiffin_makers(id),
+            order_date DATE NOT NULL,
+            delivery_date DATE NOT NULL,
+            total_amount DECIMAL(10,2) NOT NULL,
+            payment_method TEXT NOT NULL CHECK (payment_method IN ('COD', 'GPay')),
+            status TEXT DEFAULT 'pending'
+                CHECK (status IN ('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled')),
+            delivery_address TEXT,
+            special_instructions TEXT,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY,
+            order_id INT REFERENCES orders(id),
+            menu_item_id INT REFERENCES menu_items(id),
+            quantity INT NOT NULL,
+            price_per_unit DECIMAL(10,2) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS cart (
+            id INTEGER PRIMARY KEY,
+            customer_id INT REFERENCES users(id),
+            menu_item_id INT REFERENCES menu_items(id),
+            quantity INT NOT NULL,
+            added_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """
+    ]),
+    Migration(2, "indexes for dashboard queries", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_maker_delivery ON orders (tiffin_maker_id, delivery_date, status)",
+        """CREATE INDEX IF NOT EXISTS idx_orders_maker_created
+           ON orders (tiffin_maker_id, created_at, status, total_amount)""",
+        "CREATE INDEX IF NOT EXISTS idx_orders_customer_created ON orders (customer_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at, status, total_amount)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_delivery_created ON orders (delivery_date, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_cart_customer_item ON cart (customer_id, menu_item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_menu_items_name_day ON menu_items (name, day_of_week)",
+        "CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_users_type_created ON users (user_type, created_at)"
+    ]),
+    Migration(3, "unique cart item per user", [
+        """
+        UPDATE cart SET quantity = (
+            SELECT SUM(d.quantity) FROM cart d
+            WHERE d.customer_id = cart.customer_id AND d.menu_item_id = cart.menu_item_id
+        )
+        WHERE id IN (SELECT MIN(id) FROM cart GROUP BY customer_id, menu_item_id HAVING COUNT(*) > 1)
+        """,
+        "DELETE FROM cart WHERE id NOT IN (SELECT MIN(id) FROM cart GROUP BY customer_id, menu_item_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_customer_item ON cart (customer_id, menu_item_id)",
+        "DROP INDEX IF EXISTS idx_cart_customer_item"
+    ]),
+    Migration(4, "daily order rollups", [
+        """
+        CREATE TABLE IF NOT EXISTS order_daily_rollups (
+            day DATE NOT NULL,
+            tiffin_maker_id INT NOT NULL,
+            status VARCHAR(32) NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, tiffin_maker_id, status)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_rollups_maker_day ON order_daily_rollups (tiffin_maker_id, day)",
+        """
+        INSERT INTO order_daily_rollups (day, tiffin_maker_id, status, order_count, revenue)
+        SELECT DATE(created_at), COALESCE(tiffin_maker_id, 0), status, COUNT(*), SUM(total_amount)
+        FROM orders
+        GROUP BY DATE(created_at), COALESCE(tiffin_maker_id, 0), status
+        """
+    ])
+]
+
+class DatabaseManager(BaseDatabaseManager):
     def __init__(self):
-        self.connection = None
-        self.connect()
+        super().__init__(DB_CONFIG, DB_POOL_CONFIG, QUERY_CACHE_CONFIG, QUERY_STATS_CONFIG,
+                         DB_BACKEND_CONFIG)
+        self.ensure_ready()
+    
+    def show_error(self, message):
+        """Show a database error in the Streamlit page"""
+        st.error(message)
     
     def connect(self):
         """Establish database connection"""
-        try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                print("Successfully connected to MySQL database")
-                self.create_tables()
-        except Error as e:
-            st.error(f"Error connecting to MySQL: {e}")
+        if super().connect():
+            print(f"Successfully connected to {self.backend.label} database")
+            return True
+        return False
     
     def create_tables(self):
-        """Create all necessary tables if they don't exist"""
+        """Bring the schema up to date by applying pending migrations"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(50) UNIQUE NOT NULL,
-                    email VARCHAR(100) UNIQUE NOT NULL,
-                    password VARCHAR(255) NOT NULL,
-                    full_name VARCHAR(100) NOT NULL,
-                    phone VARCHAR(15),
-                    address TEXT,
-                    user_type ENUM('customer', 'tiffin_maker', 'admin') DEFAULT 'customer',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Tiffin makers table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tiffin_makers (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id INT,
-                    business_name VARCHAR(100) NOT NULL,
-                    location VARCHAR(200) NOT NULL,
-                    cuisine_specialty VARCHAR(100),
-                    rating DECIMAL(3,2) DEFAULT 0.0,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            """)
-            
-            # Menu items table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS menu_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    description TEXT,
-                    price DECIMAL(10,2) NOT NULL,
-                    day_of_week VARCHAR(20),
-                    tiffin_maker_id INT,
-                    is_available BOOLEAN DEFAULT TRUE,
-                    FOREIGN KEY (tiffin_maker_id) REFERENCES tiffin_makers(id)
-                )
-            """)
-            
-            # Orders table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS orders (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    customer_id INT,
-                    tiffin_maker_id INT,
-                    order_date DATE NOT NULL,
-                    delivery_date DATE NOT NULL,
-                    total_amount DECIMAL(10,2) NOT NULL,
-                    payment_method ENUM('COD', 'GPay') NOT NULL,
-                    status ENUM('pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled') DEFAULT 'pending',
-                    delivery_address TEXT,
-                    special_instructions TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (customer_id) REFERENCES users(id),
-                    FOREIGN KEY (tiffin_maker_id) REFERENCES tiffin_makers(id)
-                )
-            """)
-            
-            # Order items table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS order_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    order_id INT,
-                    menu_item_id INT,
-                    quantity INT NOT NULL,
-                    price_per_unit DECIMAL(10,2) NOT NULL,
-                    FOREIGN KEY (order_id) REFERENCES orders(id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            
-            # Cart table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS cart (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    customer_id INT,
-                    menu_item_id INT,
-                    quantity INT NOT NULL,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (customer_id) REFERENCES users(id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            
-            self.connection.commit()
-            cursor.close()
-            print("Tables created successfully")
-            
-        except Error as e:
+            MigrationRunner(self, SQLITE_MIGRATIONS if self.backend.name == 'sqlite' else MIGRATIONS).migrate()
+            return True
+        except (Error, PoolTimeoutError, MigrationError) as e:
             st.error(f"Error creating tables: {e}")
-    
-    def execute_query(self, query, params=None):
-        """Execute a query and return results"""
-        try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params or ())
-            result = cursor.fetchall()
-            cursor.close()
-            return result
-        except Error as e:
-            st.error(f"Error executing query: {e}")
-            return []
+            return False
     
     def execute_update(self, query, params=None):
         """Execute an update query"""
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            self.connection.commit()
-            cursor.close()
-            return True
-        except Error as e:
-            st.error(f"Error executing update: {e}")
-            return False
-    
-    def close_connection(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Database connection closed")
+        return self.execute_write(query, params) is not None
 
 # Initialize database manager
-db = DatabaseManager() 
\ No newline at end of file
+db = DatabaseManager()
+
+# Weekly menu ids; seeded items belong to the first active tiffin maker
+menu_catalog = MenuCatalog(
+    db, WEEKLY_MENU,
+    owner_column='tiffin_maker_id',
+    owner_query="SELECT id FROM tiffin_makers WHERE is_active = TRUE ORDER BY id LIMIT 1"
+)
+if db.ensure_ready():
+    menu_catalog.seed()
+
+# Daily order rollups behind the admin and tiffin maker charts
+order_rollups = OrderRollups(db)
+
+# Concurrent loading of a page's independent queries
+data_loader = DataLoader(db, **DATA_LOADER_CONFIG)
+
+# All admin overview numbers in one query, shared by every session
+overview_metrics = MetricsService(db, {
+    'total_users': "SELECT COUNT(*) FROM users",
+    'total_orders': "SELECT COUNT(*) FROM orders",
+    'total_tiffin_makers': "SELECT COUNT(*) FROM tiffin_makers",
+    'active_tiffin_makers': "SELECT COUNT(*) FROM tiffin_makers WHERE is_active = TRUE",
+    'total_menu_items': "SELECT COUNT(*) FROM menu_items",
+    'range_orders': """SELECT COALESCE(SUM(order_count), 0) FROM order_daily_rollups
+                       WHERE day BETWEEN %(start_date)s AND %(end_date)s""",
+    'range_revenue': """SELECT COALESCE(SUM(revenue), 0) FROM order_daily_rollups
+                        WHERE day BETWEEN %(start_date)s AND %(end_date)s AND status != 'cancelled'""",
+}, **METRICS_CONFIG)
+
+def load_overview(data_loader, start_date, end_date):
+    """Load the admin overview tab's independent reads concurrently"""
+    return data_loader.load(
+        metrics=lambda: overview_metrics.snapshot(start_date, end_date),
+        df_status=lambda: order_rollups.status_counts(start_date, end_date, as_frame=True),
+        df_revenue=lambda: order_rollups.daily_revenue(start_date, end_date, as_frame=True),
+        recent_orders=("""
+            SELECT o.*, u.full_name, tm.business_name
+            FROM orders o
+            JOIN users u ON o.customer_id = u.id
+            JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id
+            ORDER BY o.created_at DESC
+            LIMIT 10
+        """, None)
+    )
+
+# Profiled pages report their DB time from these stats
+profiler.watch(db.stats)
+registry.watch_database('database', db)
\ No newline at end of file
@@ -0,0 +1,394 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+import pandas as pd
+from mysql.connector import Error
+from connection_pool import PoolTimeoutError
+from db_backends import create_backend
+from query_cache import QueryCache, tables_in, is_cacheable
+from query_stats import QueryStats
+
+# Affected row count and generated id of a write; for a multi-row INSERT
+# MySQL reports the id of the first inserted row.
+WriteResult = namedtuple('WriteResult', ['rowcount', 'lastrowid'])
+
+def copy_rows(rows):
+    """Copy every row dict, so a caller's edits never reach the cached result"""
+    return [dict(row) for row in rows]
+
+class BaseDatabaseManager:
+    """Pooled query execution shared by the database managers.
+
+    backend_config selects the engine (see db_backends.create_backend);
+    config is the MySQL connection config and is unused on SQLite.
+    """
+
+    def __init__(self, config, pool_config, cache_config=None, stats_config=None, backend_config=None):
+        self.config = config
+        self.pool_config = pool_config
+        self.backend = create_backend(config, **(backend_config or {}))
+        self.pool = self.backend.create_pool(self.open_connection, self.ping_connection, pool_config)
+        self.cache = QueryCache(**(cache_config or {'max_entries': 0}))
+        self.stats = QueryStats(**(stats_config or {}))
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def open_connection(self):
+        """Open a new autocommit connection for the pool"""
+        return self.backend.connect()
+
+    def ping_connection(self, connection):
+        """Cheap liveness check for an idle pooled connection"""
+        return self.backend.ping(connection)
+
+    def report_error(self, message):
+        """Report a database error, or hold it while errors are deferred"""
+        deferred = getattr(self._local, 'deferred_errors', None)
+        if deferred is not None:
+            deferred.append(message)
+        else:
+            self.show_error(message)
+
+    def show_error(self, message):
+        """Show a database error to the user"""
+        print(message)
+
+    @contextmanager
+    def deferred_errors(self):
+        """Collect errors reported on this thread instead of showing them.
+
+        Worker threads have no Streamlit page to write to, so they hand the
+        collected messages back for the page thread to report.
+        """
+        errors = []
+        self._local.deferred_errors = errors
+        try:
+            yield errors
+        finally:
+            self._local.deferred_errors = None
+
+    def connect(self):
+        """Check out a pooled connection to verify the database is reachable"""
+        try:
+            with self.unit_of_work():
+                return True
+        except (Error, PoolTimeoutError) as e:
+            self.report_error(f"Error connecting to {self.backend.label}: {e}")
+            return False
+
+    def create_tables(self):
+        """Bring the schema up to date; subclasses define their schema"""
+        return True
+
+    def ensure_ready(self):
+        """Connect and bootstrap the schema once per process.
+
+        Streamlit re-runs the page script on every interaction, but this
+        manager lives in an imported module, so after the first successful
+        call this returns immediately without touching the database.
+        """
+        if self._ready:
+            return True
+        with self._ready_lock:
+            if not self._ready:
+                self._ready = self.connect() and self.create_tables()
+                if self._ready:
+                    print(f"Database ready (pid {self.pool_stats()['pid']}, "
+                          f"up to {self.pool.pool_size} pooled connections)")
+        return self._ready
+
+    @contextmanager
+    def unit_of_work(self):
+        """Pin one pooled connection to this thread for several statements"""
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+
+        connection = self.pool.acquire()
+        self._local.connection = connection
+        discard = False
+        try:
+            yield connection
+        except Error:
+            discard = not connection.is_connected()
+            raise
+        finally:
+            self._local.connection = None
+            self.pool.release(connection, discard=discard)
+
+    def in_transaction(self):
+        """Whether this thread is inside a transaction() block"""
+        return getattr(self._local, 'transaction', False)
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in one transaction on one connection.
+
+        Statements inside the block raise instead of reporting errors, so any
+        failure rolls the whole block back. Nested blocks join the outer one.
+        """
+        if self.in_transaction():
+            yield self._local.connection
+            return
+
+        with self.unit_of_work() as connection:
+            connection.start_transaction()
+            self._local.transaction = True
+            self._local.written_tables = set()
+            try:
+                yield connection
+                connection.commit()
+            except BaseException:
+                try:
+                    connection.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                self._local.transaction = False
+                # Evict after commit (or rollback) so no other thread can
+                # cache a pre-commit read once the block has finished.
+                self._invalidate(self._local.written_tables)
+
+    def execute_query(self, query, params=None, use_cache=True):
+        """Execute a SELECT query and return results.
+
+        Outside a transaction, results are served from the query cache and
+        tagged with the tables they read so writes to those tables evict them.
+        """
+        try:
+            return self._read(query, params, use_cache, self._fetch_rows, copy_rows)
+        except (Error, PoolTimeoutError) as e:
+            if self.in_transaction():
+                raise
+            self.report_error(f"Error executing query: {e}")
+            return []
+
+    def execute_frame(self, query, params=None, dtypes=None, use_cache=True):
+        """Execute a SELECT query and return a pandas DataFrame.
+
+        Rows are read as tuples and turned into one typed NumPy array per
+        column: DECIMAL and floating point columns become float64, integers
+        int64 (float64 if they contain NULLs) and dates datetime64. dtypes
+        maps column names to explicit dtypes instead. Cached like
+        execute_query.
+        """
+        try:
+            frame = self._read(query, params, use_cache, self._fetch_columns, pd.DataFrame.copy,
+                               key_prefix='frame')
+        except (Error, PoolTimeoutError) as e:
+            if self.in_transaction():
+                raise
+            self.report_error(f"Error executing query: {e}")
+            return pd.DataFrame()
+        if dtypes:
+            frame = frame.astype(dtypes)
+        return frame
+
+    def _read(self, query, params, use_cache, fetch, copy, key_prefix=None):
+        """Run fetch(connection, query, params) through the query cache.
+
+        Results served from or stored in the cache are copied so callers
+        can modify them freely.
+        """
+        key = None
+        if use_cache and self.cache.enabled and not self.in_transaction() and is_cacheable(query):
+            tables = tables_in(query)
+            try:
+                key = self.cache.make_key(query, params)
+                if key_prefix is not None:
+                    key = (key_prefix,) + key
+                hash(key)
+            except TypeError:
+                key = None
+            if key is not None and tables:
+                result = self.cache.get(key)
+                if result is not None:
+                    return copy(result)
+                generations = self.cache.generations(tables)
+            else:
+                key = None
+
+        with self.unit_of_work() as connection:
+            result = self._measure(query, params, lambda: fetch(connection, query, params), len)
+        if key is not None:
+            self.cache.put(key, tables, result, generations)
+            return copy(result)
+        return result
+
+    def _fetch_rows(self, connection, query, params):
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params or ())
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _fetch_columns(self, connection, query, params):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+            description = cursor.description
+        finally:
+            cursor.close()
+
+        columns = list(zip(*rows)) if rows else [()] * len(description)
+        return pd.DataFrame(
+            {field[0]: self.backend.column_array(values, field[1]) for field, values in zip(description, columns)},
+            copy=False
+        )
+
+    def stream_query(self, query, params=None, batch_size=1000, named=False):
+        """Yield the rows of a large SELECT without loading them all at once.
+
+        Rows are read from an unbuffered cursor batch_size at a time and
+        yielded as tuples, or as namedtuples when named is True. The stream
+        uses its own pooled connection, which goes back to the pool when the
+        consumer finishes; one abandoned part-way is closed instead, since
+        its unread rows would block the next user. Errors are raised rather
+        than reported, so a failed export or backfill cannot look complete.
+        """
+        connection = self.pool.acquire()
+        cursor = None
+        finished = False
+        failed = False
+        # Only time spent in the cursor counts, not the consumer's work
+        elapsed = 0.0
+        total_rows = 0
+        try:
+            started = time.perf_counter()
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(query, params or ())
+            row_type = namedtuple('Row', cursor.column_names, rename=True) if named else None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                total_rows += len(rows)
+                if row_type is None:
+                    yield from rows
+                else:
+                    yield from (row_type._make(row) for row in rows)
+                started = time.perf_counter()
+            finished = True
+        except Error:
+            failed = True
+            elapsed += time.perf_counter() - started
+            raise
+        finally:
+            if cursor is not None and finished:
+                cursor.close()
+            self.pool.release(connection, discard=not finished)
+            self.stats.record(query, params, elapsed, total_rows, error=failed)
+
+    def execute_write(self, query, params=None):
+        """Execute an INSERT, UPDATE, or DELETE and return a WriteResult"""
+        try:
+            with self.unit_of_work() as connection:
+                return self._write(connection, query, params)
+        except (Error, PoolTimeoutError) as e:
+            if self.in_transaction():
+                raise
+            self.report_error(f"Error executing update: {e}")
+            return None
+
+    def execute_many(self, query, params_seq):
+        """Execute one statement for many parameter rows in one transaction.
+
+        mysql.connector sends INSERT ... VALUES as a single multi-row
+        statement. Returns a WriteResult with the total affected rows, or
+        None if the batch failed and was rolled back.
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return WriteResult(0, None)
+
+        try:
+            with self.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    self._measure(query, params_seq[0], lambda: cursor.executemany(query, params_seq),
+                                  lambda _: cursor.rowcount)
+                    return WriteResult(cursor.rowcount, cursor.lastrowid)
+                finally:
+                    cursor.close()
+                    self._wrote(query)
+        except (Error, PoolTimeoutError) as e:
+            if self.in_transaction():
+                raise
+            self.report_error(f"Error executing batch: {e}")
+            return None
+
+    def execute_batch(self, statements):
+        """Execute (query, params) pairs in one transaction.
+
+        Returns one WriteResult per statement, or None if any statement
+        failed and the batch was rolled back.
+        """
+        try:
+            with self.transaction() as connection:
+                return [self._write(connection, query, params) for query, params in statements]
+        except (Error, PoolTimeoutError) as e:
+            if self.in_transaction():
+                raise
+            self.report_error(f"Error executing batch: {e}")
+            return None
+
+    def _write(self, connection, query, params):
+        cursor = connection.cursor()
+        try:
+            self._measure(query, params, lambda: cursor.execute(query, params or ()),
+                          lambda _: cursor.rowcount)
+            return WriteResult(cursor.rowcount, cursor.lastrowid)
+        finally:
+            cursor.close()
+            self._wrote(query)
+
+    def _measure(self, query, params, run, count):
+        """Call run() and record its latency and row count in the query stats"""
+        started = time.perf_counter()
+        try:
+            result = run()
+        except Error:
+            self.stats.record(query, params, time.perf_counter() - started, 0, error=True)
+            raise
+        self.stats.record(query, params, time.perf_counter() - started, count(result))
+        return result
+
+    def _wrote(self, query):
+        """Evict cached reads of the tables a statement may have changed"""
+        tables = tables_in(query)
+        if self.in_transaction():
+            self._local.written_tables.update(tables)
+        else:
+            self._invalidate(tables)
+
+    def _invalidate(self, tables):
+        if tables and self.cache.enabled:
+            self.cache.invalidate(tables)
+
+    def cache_stats(self):
+        """Return query cache hit/miss statistics"""
+        return self.cache.stats()
+
+    def clear_cache(self):
+        """Drop every cached query result"""
+        self.cache.clear()
+
+    def query_stats(self):
+        """Return per-statement latency percentiles and the slow-query log"""
+        return self.stats.snapshot()
+
+    def pool_stats(self):
+        """Return connection pool utilisation and wait metrics"""
+        return self.pool.stats()
+
+    def close_connection(self):
+        """Close all pooled database connections"""
+        self.pool.close()
+        print("Database connection closed")
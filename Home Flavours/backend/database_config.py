@@ -1,155 +1,228 @@
-import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
+from config import DB_BACKEND_CONFIG, DB_POOL_CONFIG, QUERY_CACHE_CONFIG, QUERY_STATS_CONFIG
+from database_base import BaseDatabaseManager
+from app_metrics import registry
+from connection_pool import PoolTimeoutError
+from migrations import Migration, MigrationRunner, MigrationError
 
 load_dotenv()
 
-class DatabaseManager:
+# Schema history; append new migrations, never edit applied ones
+MIGRATIONS = [
+    Migration(1, "initial schema", [
+        # Users table
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(20) NOT NULL,
+            address TEXT NOT NULL,
+            user_type ENUM('customer', 'tiffin_maker', 'admin') DEFAULT 'customer',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Menu items table
+        """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            price DECIMAL(10,2) NOT NULL,
+            day_of_week VARCHAR(20) NOT NULL,
+            icon VARCHAR(10) DEFAULT '🍽️',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Orders table
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            total_amount DECIMAL(10,2) NOT NULL,
+            status ENUM('pending', 'confirmed', 'preparing', 'ready', 'delivered', 'cancelled') DEFAULT 'pending',
+            payment_method ENUM('COD', 'GPay') DEFAULT 'COD',
+            delivery_address TEXT,
+            order_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES users(id)
+        )
+        """,
+        # Order items table
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            menu_item_id INT NOT NULL,
+            quantity INT NOT NULL,
+            price DECIMAL(10,2) NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders(id),
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """,
+        # Cart table
+        """
+        CREATE TABLE IF NOT EXISTS cart (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            menu_item_id INT NOT NULL,
+            quantity INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """
+    ]),
+    # Covering indexes for the filters and orderings the pages use
+    Migration(2, "indexes for dashboard queries", [
+        """
+        ALTER TABLE orders
+            ADD INDEX idx_orders_customer_created (customer_id, created_at),
+            ADD INDEX idx_orders_created (created_at, status, total_amount)
+        """,
+        "ALTER TABLE cart ADD INDEX idx_cart_user_item (user_id, menu_item_id)",
+        "ALTER TABLE menu_items ADD INDEX idx_menu_items_name_day (name, day_of_week)",
+        "ALTER TABLE users ADD INDEX idx_users_created (created_at)"
+    ]),
+    # One cart row per (user, menu item) so adds can upsert atomically
+    Migration(3, "unique cart item per user", [
+        # Fold existing duplicate rows into the oldest one first
+        """
+        UPDATE cart c
+        JOIN (
+            SELECT user_id, menu_item_id, MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM cart
+            GROUP BY user_id, menu_item_id
+            HAVING COUNT(*) > 1
+        ) d ON c.id = d.keep_id
+        SET c.quantity = d.total
+        """,
+        """
+        DELETE c FROM cart c
+        JOIN cart k ON c.user_id = k.user_id AND c.menu_item_id = k.menu_item_id AND c.id > k.id
+        """,
+        "ALTER TABLE cart ADD UNIQUE KEY uq_cart_user_item (user_id, menu_item_id)",
+        "ALTER TABLE cart DROP INDEX idx_cart_user_item"
+    ])
+]
+
+# The same schema history for DB_BACKEND=sqlite; keep the versions in step
+SQLITE_MIGRATIONS = [
+    Migration(1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(20) NOT NULL,
+            address TEXT NOT NULL,
+            user_type TEXT DEFAULT 'customer' CHECK (user_type IN ('customer', 'tiffin_maker', 'admin')),
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            description TEXT,
+            price DECIMAL(10,2) NOT NULL,
+            day_of_week VARCHAR(20) NOT NULL,
+            icon VARCHAR(10) DEFAULT '🍽️',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY,
+            customer_id INT NOT NULL REFERENCES users(id),
+            total_amount DECIMAL(10,2) NOT NULL,
+            status TEXT DEFAULT 'pending'
+                CHECK (status IN ('pending', 'confirmed', 'preparing', 'ready', 'delivered', 'cancelled')),
+            payment_method TEXT DEFAULT 'COD' CHECK (payment_method IN ('COD', 'GPay')),
+            delivery_address TEXT,
+            order_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY,
+            order_id INT NOT NULL REFERENCES orders(id),
+            menu_item_id INT NOT NULL REFERENCES menu_items(id),
+            quantity INT NOT NULL,
+            price DECIMAL(10,2) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS cart (
+            id INTEGER PRIMARY KEY,
+            user_id INT NOT NULL REFERENCES users(id),
+            menu_item_id INT NOT NULL REFERENCES menu_items(id),
+            quantity INT NOT NULL,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+        )
+        """
+    ]),
+    Migration(2, "indexes for dashboard queries", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_customer_created ON orders (customer_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at, status, total_amount)",
+        "CREATE INDEX IF NOT EXISTS idx_cart_user_item ON cart (user_id, menu_item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_menu_items_name_day ON menu_items (name, day_of_week)",
+        "CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at)"
+    ]),
+    Migration(3, "unique cart item per user", [
+        """
+        UPDATE cart SET quantity = (
+            SELECT SUM(d.quantity) FROM cart d
+            WHERE d.user_id = cart.user_id AND d.menu_item_id = cart.menu_item_id
+        )
+        WHERE id IN (SELECT MIN(id) FROM cart GROUP BY user_id, menu_item_id HAVING COUNT(*) > 1)
+        """,
+        "DELETE FROM cart WHERE id NOT IN (SELECT MIN(id) FROM cart GROUP BY user_id, menu_item_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_user_item ON cart (user_id, menu_item_id)",
+        "DROP INDEX IF EXISTS idx_cart_user_item"
+    ])
+]
+
+class DatabaseManager(BaseDatabaseManager):
     def __init__(self):
-        self.connection = None
-        self.config = {
+        super().__init__({
             'host': os.getenv('DB_HOST', 'localhost'),
             'user': os.getenv('DB_USER', 'root'),
             'password': os.getenv('DB_PASSWORD', 'sanskruti14'),
             'database': os.getenv('DB_NAME', 'home_flavours'),
             'port': int(os.getenv('DB_PORT', 3306))
-        }
+        }, DB_POOL_CONFIG, QUERY_CACHE_CONFIG, QUERY_STATS_CONFIG, DB_BACKEND_CONFIG)
     
     def connect(self):
         """Establish database connection"""
-        try:
-            self.connection = mysql.connector.connect(**self.config)
-            if self.connection.is_connected():
-                print("Successfully connected to MySQL database")
-                return True
-        except Error as e:
-            print(f"Error connecting to MySQL: {e}")
-            return False
+        if super().connect():
+            print(f"Successfully connected to {self.backend.label} database")
+            return True
+        return False
     
     def create_tables(self):
-        """Create all necessary tables if they don't exist"""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return False
-        
+        """Bring the schema up to date by applying pending migrations"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(50) UNIQUE NOT NULL,
-                    email VARCHAR(100) NOT NULL,
-                    password_hash VARCHAR(255) NOT NULL,
-                    full_name VARCHAR(100) NOT NULL,
-                    phone VARCHAR(20) NOT NULL,
-                    address TEXT NOT NULL,
-                    user_type ENUM('customer', 'tiffin_maker', 'admin') DEFAULT 'customer',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Menu items table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS menu_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    description TEXT,
-                    price DECIMAL(10,2) NOT NULL,
-                    day_of_week VARCHAR(20) NOT NULL,
-                    icon VARCHAR(10) DEFAULT '🍽️',
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Orders table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS orders (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    customer_id INT NOT NULL,
-                    total_amount DECIMAL(10,2) NOT NULL,
-                    status ENUM('pending', 'confirmed', 'preparing', 'ready', 'delivered', 'cancelled') DEFAULT 'pending',
-                    payment_method ENUM('COD', 'GPay') DEFAULT 'COD',
-                    delivery_address TEXT,
-                    order_date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (customer_id) REFERENCES users(id)
-                )
-            """)
-            
-            # Order items table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS order_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    order_id INT NOT NULL,
-                    menu_item_id INT NOT NULL,
-                    quantity INT NOT NULL,
-                    price DECIMAL(10,2) NOT NULL,
-                    FOREIGN KEY (order_id) REFERENCES orders(id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            
-            # Cart table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS cart (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id INT NOT NULL,
-                    menu_item_id INT NOT NULL,
-                    quantity INT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            
-            self.connection.commit()
-            print("Database tables created successfully")
+            MigrationRunner(self, SQLITE_MIGRATIONS if self.backend.name == 'sqlite' else MIGRATIONS).migrate()
             return True
-            
-        except Error as e:
+        except (Error, PoolTimeoutError, MigrationError) as e:
             print(f"Error creating tables: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
-    
-    def execute_query(self, query, params=None):
-        """Execute a SELECT query and return results"""
-        try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params or ())
-            results = cursor.fetchall()
-            return results
-        except Error as e:
-            print(f"Error executing query: {e}")
-            return []
-        finally:
-            if cursor:
-                cursor.close()
     
     def execute_update(self, query, params=None):
         """Execute an INSERT, UPDATE, or DELETE query"""
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            self.connection.commit()
-            return cursor.lastrowid
-        except Error as e:
-            print(f"Error executing update: {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
-    
-    def close_connection(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Database connection closed")
+        result = self.execute_write(query, params)
+        return result.lastrowid if result else None
 
 # Initialize database manager
-db_manager = DatabaseManager() 
\ No newline at end of file
+db_manager = DatabaseManager()
+registry.watch_database('database_config', db_manager) 
\ No newline at end of file
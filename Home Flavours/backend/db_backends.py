@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import mysql.connector
+from mysql.connector import Error, FieldType
+from connection_pool import ConnectionPool
+
+ENGINES = ('mysql', 'sqlite')
+
+FLOAT_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL, FieldType.FLOAT, FieldType.DOUBLE}
+INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG,
+                 FieldType.LONGLONG, FieldType.YEAR}
+DATETIME_TYPES = {FieldType.DATE, FieldType.NEWDATE, FieldType.DATETIME, FieldType.TIMESTAMP}
+
+def column_array(values, field_type):
+    """Convert one result column to a typed array based on its MySQL type"""
+    if field_type in FLOAT_TYPES:
+        return np.array(values, dtype=np.float64)
+    if field_type in INTEGER_TYPES:
+        if None in values:
+            return np.array(values, dtype=np.float64)
+        return np.array(values, dtype=np.int64)
+    if field_type in DATETIME_TYPES:
+        return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy()
+    return np.array(values, dtype=object)
+
+
+class DatabaseBackend(ABC):
+    """What a database manager needs from the engine underneath it.
+
+    Connections handed out by a backend behave like mysql.connector ones:
+    cursor(dictionary=..., buffered=...), start_transaction(), commit(),
+    rollback(), is_connected() and close(), with failures raised as
+    mysql.connector errors, so the managers and services run unchanged.
+    """
+    name = None
+    label = None
+
+    @abstractmethod
+    def connect(self):
+        """Open a new autocommit connection"""
+
+    def ping(self, connection):
+        """Cheap liveness check for an idle pooled connection"""
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def create_pool(self, connect, ping, pool_config):
+        """Pool that hands connect()'s connections to the manager's threads"""
+        return ConnectionPool(connect, ping=ping, **pool_config)
+
+    @abstractmethod
+    def column_array(self, values, type_code):
+        """Convert one result column to a typed array for execute_frame"""
+
+
+class MySQLBackend(DatabaseBackend):
+    """A MySQL server reached through mysql.connector"""
+    name = 'mysql'
+    label = 'MySQL'
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        # Autocommit keeps pooled connections from holding a stale read
+        # snapshot between checkouts; transactions are started explicitly.
+        return mysql.connector.connect(autocommit=True, **self.config)
+
+    def column_array(self, values, type_code):
+        return column_array(values, type_code)
+
+
+def create_backend(config, engine='mysql', sqlite_path='home_flavours.db', busy_timeout=30):
+    """Build the backend named by DB_BACKEND; config is the MySQL connection config"""
+    if engine == 'mysql':
+        return MySQLBackend(config)
+    if engine == 'sqlite':
+        # Imported here because sqlite_backend builds on DatabaseBackend
+        from sqlite_backend import SQLiteBackend
+        return SQLiteBackend(sqlite_path, busy_timeout=busy_timeout)
+    raise ValueError(f"Unknown database backend '{engine}'; use one of: {', '.join(ENGINES)}")
@@ -0,0 +1,330 @@
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from streamlit import config as streamlit_config, logger as streamlit_logger
+
+# Next status a tiffin maker moves an order to
+NEXT_STATUS = {
+    'pending': 'confirmed',
+    'confirmed': 'preparing',
+    'preparing': 'out_for_delivery',
+    'out_for_delivery': 'delivered',
+}
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def quiet_bare_mode_warnings():
+    """Silence Streamlit's per-call warnings about running outside `streamlit run`"""
+    # AppTest re-applies logger.level from the config on its first run
+    streamlit_config.set_option('logger.level', 'error')
+    streamlit_logger.set_log_level('error')
+
+def parse_mix(value):
+    """'customer=8,maker=1,admin=1' -> {'customer': 8, 'maker': 1, 'admin': 1}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in VIRTUAL_USERS:
+            raise argparse.ArgumentTypeError(f"Unknown user type '{name}'; use {', '.join(VIRTUAL_USERS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class LoadStats:
+    """Latencies and errors per operation; merged across threads and processes"""
+
+    def __init__(self):
+        self.latencies = {}  # operation -> [seconds]
+        self.errors = {}     # operation -> Counter of error messages
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, error=None):
+        with self._lock:
+            self.latencies.setdefault(operation, []).append(seconds)
+            if error is not None:
+                self.errors.setdefault(operation, Counter())[error] += 1
+
+    def merge(self, other):
+        for operation, latencies in other.latencies.items():
+            self.latencies.setdefault(operation, []).extend(latencies)
+        for operation, errors in other.errors.items():
+            self.errors.setdefault(operation, Counter()).update(errors)
+        self.elapsed = max(self.elapsed, other.elapsed)
+
+    def report(self):
+        """One row per operation: throughput, latency percentiles and error rate"""
+        rows = []
+        for operation, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            errors = sum(self.errors.get(operation, Counter()).values())
+            rows.append({
+                'operation': operation,
+                'calls': len(latencies),
+                'per_second': len(latencies) / self.elapsed if self.elapsed else 0.0,
+                'p50_ms': percentile(latencies, 0.50) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'max_ms': latencies[-1] * 1000,
+                'errors': errors,
+                'error_rate': errors / len(latencies),
+            })
+        return rows
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class VirtualUser(ABC):
+    """One simulated session running its flow in a closed loop.
+
+    Operations call the same services the dashboards use, so the load hits
+    the real queries, pool and caches without a browser.
+    """
+
+    def __init__(self, app, stats, index, rng):
+        self.app = app
+        self.stats = stats
+        self.index = index
+        self.rng = rng
+
+    def setup(self):
+        """Prepare the session; return False to drop this user"""
+        return True
+
+    @abstractmethod
+    def iteration(self):
+        """One pass through this user's flow"""
+
+    def timed(self, operation, func, *args, **kwargs):
+        """Run func and record its latency.
+
+        None, False, a (False, message) tuple or an exception counts as an
+        error. Returns the result, or None on error.
+        """
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.stats.record(operation, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+            return None
+        elapsed = time.perf_counter() - started
+        if isinstance(result, tuple):
+            ok, error = result[0], result[1]
+        else:
+            ok, error = result is not None and result is not False, 'failed'
+        self.stats.record(operation, elapsed, None if ok else error)
+        return result if ok else None
+
+
+class CustomerUser(VirtualUser):
+    """Registers once, then logs in, fills a cart and places an order"""
+
+    password = 'loadtest123'
+
+    def setup(self):
+        self.username = f"load_{self.app.run_id}_{self.index}"
+        registered = self.timed(
+            'register', self.app.auth.register_user,
+            self.username, f"{self.username}@example.com", self.password,
+            f"Load Test Customer {self.index}", '9000000000', f"{self.index} Load Test Street", 'customer'
+        )
+        user = self.app.db.execute_query("SELECT id FROM users WHERE username = %s", (self.username,))
+        self.user_id = user[0]['id'] if registered and user else None
+        return self.user_id is not None
+
+    def iteration(self):
+        self.timed('login', self.app.auth.login_user, self.username, self.password)
+        day = self.rng.choice(list(self.app.weekly_menu))
+        for item in self.rng.sample(self.app.weekly_menu[day], self.rng.randint(1, 3)):
+            self.timed('cart_add', self.add_to_cart, day, item['name'], self.rng.randint(1, 2))
+        self.timed('place_order', self.place_order)
+
+    def add_to_cart(self, day, name, quantity):
+        menu_item_id = self.app.menu_catalog.resolve(day, name)
+        return menu_item_id is not None and self.app.cart_service.add_item(self.user_id, menu_item_id, quantity)
+
+    def place_order(self):
+        # Same reads and writes as UserDashboard.show_cart and place_order
+        cart_items = self.app.db.execute_query("""
+            SELECT c.menu_item_id, c.quantity, mi.price, mi.tiffin_maker_id
+            FROM cart c JOIN menu_items mi ON c.menu_item_id = mi.id
+            WHERE c.customer_id = %s
+        """, (self.user_id,))
+        if not cart_items:
+            return False
+        return self.app.order_service.place_order(
+            self.user_id,
+            [(item['menu_item_id'], item['quantity'], item['price']) for item in cart_items],
+            tiffin_maker_id=cart_items[0]['tiffin_maker_id'],
+            order_date=datetime.now().date(),
+            delivery_date=datetime.now().date() + timedelta(days=1),
+            total_amount=sum(item['quantity'] * item['price'] for item in cart_items),
+            payment_method='COD',
+            delivery_address=f"{self.index} Load Test Street",
+            special_instructions=''
+        ) is not None
+
+
+class MakerUser(VirtualUser):
+    """Works through a tiffin maker's open orders one status step at a time"""
+
+    def setup(self):
+        makers = self.app.db.execute_query("SELECT id FROM tiffin_makers WHERE is_active = TRUE ORDER BY id")
+        if not makers:
+            return False
+        self.tiffin_maker_id = makers[self.index % len(makers)]['id']
+        return True
+
+    def iteration(self):
+        orders = self.timed('maker_orders', self.app.db.execute_query, """
+            SELECT id, status FROM orders
+            WHERE tiffin_maker_id = %s AND status IN ('pending', 'confirmed', 'preparing', 'out_for_delivery')
+            ORDER BY created_at
+            LIMIT 5
+        """, (self.tiffin_maker_id,), use_cache=False)
+        for order in orders or []:
+            self.timed('status_update', self.app.order_rollups.update_status,
+                       order['id'], NEXT_STATUS[order['status']])
+
+
+class AdminUser(VirtualUser):
+    """Loads the admin overview tab"""
+
+    def iteration(self):
+        self.timed('admin_overview', self.load_overview)
+
+    def load_overview(self):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=30)
+        data = self.app.load_overview(self.app.data_loader, start_date, end_date)
+        return data['metrics'].generated_at is not None
+
+
+VIRTUAL_USERS = {'customer': CustomerUser, 'maker': MakerUser, 'admin': AdminUser}
+
+
+class App:
+    """The services a virtual user drives, imported on first use in each process"""
+
+    def __init__(self, run_id):
+        from database import db, menu_catalog, order_rollups, data_loader, load_overview
+        from auth import auth
+        from order_service import OrderService
+        from cart_service import CartService
+        from config import WEEKLY_MENU
+        self.run_id = run_id
+        self.db = db
+        self.auth = auth
+        self.menu_catalog = menu_catalog
+        self.order_rollups = order_rollups
+        self.data_loader = data_loader
+        self.load_overview = load_overview
+        self.order_service = OrderService(db, rollups=order_rollups)
+        self.cart_service = CartService(db)
+        self.weekly_menu = WEEKLY_MENU
+
+
+def run_load(mix, users, duration, think_time=1.0, ramp_up=0.0, seed=42, run_id=None, first_index=0):
+    """Run users virtual users on threads for duration seconds and return their LoadStats.
+
+    Each user repeats its flow, pausing around think_time seconds between
+    iterations, so throughput is bounded by how fast the app answers.
+    """
+    quiet_bare_mode_warnings()
+    app = App(run_id or uuid.uuid4().hex[:8])
+    stats = LoadStats()
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=users)
+    started = time.perf_counter()
+    deadline = started + ramp_up + duration
+
+    def session(index, kind):
+        user_rng = random.Random(f"{seed}-{index}")
+        time.sleep(ramp_up * (index - first_index) / max(users, 1))
+        user = VIRTUAL_USERS[kind](app, stats, index, user_rng)
+        if not user.setup():
+            stats.record('setup', 0.0, f"{kind} setup failed")
+            return
+        while time.perf_counter() < deadline:
+            user.iteration()
+            if think_time:
+                time.sleep(min(user_rng.uniform(0.5, 1.5) * think_time, max(deadline - time.perf_counter(), 0)))
+
+    threads = [
+        threading.Thread(target=session, args=(first_index + offset, kind), name=f"vu-{first_index + offset}")
+        for offset, kind in enumerate(kinds)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+def run_processes(processes, mix, users, duration, think_time=1.0, ramp_up=0.0, seed=42):
+    """Split users across processes, each with its own connection pool, and merge the stats"""
+    run_id = uuid.uuid4().hex[:8]
+    shares = [users // processes + (1 if index < users % processes else 0) for index in range(processes)]
+    stats = LoadStats()
+    # spawn, so no process inherits another's pooled connections
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [
+            executor.submit(run_load, mix, share, duration, think_time, ramp_up,
+                            seed + index, run_id, sum(shares[:index]))
+            for index, share in enumerate(shares) if share
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+def print_report(stats):
+    rows = stats.report()
+    print(f"{'operation':<16}{'calls':>8}{'per sec':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}{'errors':>8}{'error %':>9}")
+    for row in rows:
+        print(f"{row['operation']:<16}{row['calls']:>8}{row['per_second']:>10.1f}{row['p50_ms']:>10.1f}"
+              f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}{row['errors']:>8}"
+              f"{row['error_rate'] * 100:>8.1f}%")
+    for operation, errors in sorted(stats.errors.items()):
+        for message, count in errors.most_common(3):
+            print(f"  {operation}: {count}x {message}")
+    total = sum(row['calls'] for row in rows)
+    print(f"{total} operations in {stats.elapsed:.1f}s ({total / stats.elapsed if stats.elapsed else 0:.1f}/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Closed-loop load test of the customer, maker and admin flows")
+    parser.add_argument('--users', type=int, default=20, help="concurrent virtual users")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('customer=8,maker=1,admin=1'),
+                        help="weights per user type, e.g. customer=8,maker=1,admin=1")
+    parser.add_argument('--duration', type=float, default=60, help="seconds of load after ramp-up")
+    parser.add_argument('--ramp-up', type=float, default=5, help="seconds over which users start")
+    parser.add_argument('--think-time', type=float, default=1.0, help="mean pause between iterations")
+    parser.add_argument('--processes', type=int, default=1, help="split users across processes")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Running {args.users} users ({', '.join(f'{k}={v:g}' for k, v in args.mix.items())}) "
+          f"for {args.duration:g}s on {args.processes} process(es)...")
+    if args.processes > 1:
+        result = run_processes(args.processes, args.mix, args.users, args.duration,
+                               args.think_time, args.ramp_up, args.seed)
+    else:
+        result = run_load(args.mix, args.users, args.duration, args.think_time, args.ramp_up, args.seed)
+    print_report(result)
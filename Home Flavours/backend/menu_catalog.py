@@ -0,0 +1,121 @@
+import threading
+from mysql.connector import Error
+from connection_pool import PoolTimeoutError
+
+class MenuCatalog:
+    """Process-wide (day, name) -> menu_items.id index over the weekly menu.
+
+    The weekly menu is bulk-inserted into menu_items once, and adding to the
+    cart resolves ids from memory instead of looking up or creating rows.
+    Call refresh() after anything edits menu_items.
+    """
+
+    def __init__(self, db, weekly_menu, item_fields=('name', 'description', 'price'),
+                 owner_column=None, owner_query=None, lock_name='home_flavours_menu_seed', lock_timeout=30):
+        self.db = db
+        self.weekly_menu = weekly_menu
+        self.item_fields = item_fields
+        self.owner_column = owner_column
+        self.owner_query = owner_query
+        self.lock_name = lock_name
+        self.lock_timeout = lock_timeout
+        self._index = None
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def resolve(self, day, name):
+        """Return the menu_items id for a weekly menu entry, or None"""
+        index = self._index
+        if index is None or (not self._seeded and (day, name) not in index):
+            self.seed()
+            index = self._index or {}
+        return index.get((day, name))
+
+    def seed(self):
+        """Insert any weekly menu entries missing from menu_items, then reload.
+
+        A named lock stops two workers from inserting the same entries.
+        Returns the number of rows inserted.
+        """
+        with self._lock:
+            if self._seeded and self._index is not None:
+                return 0
+            try:
+                with self.db.unit_of_work() as connection:
+                    cursor = connection.cursor()
+                    try:
+                        cursor.execute("SELECT GET_LOCK(%s, %s)", (self.lock_name, self.lock_timeout))
+                        (acquired,), = cursor.fetchall()
+                        if acquired != 1:
+                            # 0 is a timeout, NULL an error; another worker may be seeding
+                            self.db.report_error(f"Could not take the '{self.lock_name}' lock to seed the menu")
+                            return 0
+                        try:
+                            inserted = self._insert_missing()
+                        finally:
+                            cursor.execute("SELECT RELEASE_LOCK(%s)", (self.lock_name,))
+                            cursor.fetchall()
+                    finally:
+                        cursor.close()
+            except (Error, PoolTimeoutError) as e:
+                self.db.report_error(f"Error seeding menu: {e}")
+                return 0
+            if inserted:
+                print(f"Seeded {inserted} weekly menu items")
+            return inserted
+
+    def refresh(self):
+        """Reload the index after menu items were added, edited or deleted"""
+        with self._lock:
+            try:
+                self._load()
+            except (Error, PoolTimeoutError) as e:
+                self.db.report_error(f"Error loading menu: {e}")
+
+    def _insert_missing(self):
+        self._load()
+        missing = [
+            (day, item) for day, items in self.weekly_menu.items() for item in items
+            if (day, item['name']) not in self._index
+        ]
+        if not missing:
+            return 0
+
+        columns = list(self.item_fields) + ['day_of_week']
+        owner = []
+        if self.owner_column:
+            owners = self.db.execute_query(self.owner_query, use_cache=False)
+            if not owners:
+                # Nothing can own the menu yet; try again on the next miss
+                return 0
+            columns.append(self.owner_column)
+            owner = [owners[0]['id']]
+
+        result = self.db.execute_many(
+            f"INSERT INTO menu_items ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})",
+            [tuple(item[field] for field in self.item_fields) + (day,) + tuple(owner)
+             for day, item in missing]
+        )
+        self._load()
+        return result.rowcount if result else 0
+
+    def _load(self):
+        # Read through a cursor so a failed load raises instead of looking
+        # like an empty catalog and re-seeding every entry
+        with self.db.unit_of_work() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT id, name, day_of_week FROM menu_items ORDER BY id")
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        index = {}
+        for row in rows:
+            # Keep the oldest row when a maker reuses a weekly menu name
+            index.setdefault((row['day_of_week'], row['name']), row['id'])
+        self._index = index
+        self._seeded = all(
+            (day, item['name']) in index
+            for day, items in self.weekly_menu.items() for item in items
+        )
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# Overview numbers for the admin pages; metrics a schema does not define
+# (main_mysql.py has no tiffin_makers table) are left as None.
+OverviewMetrics = namedtuple('OverviewMetrics', [
+    'total_users', 'total_orders', 'total_revenue',
+    'total_tiffin_makers', 'active_tiffin_makers', 'total_menu_items',
+    'range_orders', 'range_revenue', 'generated_at'
+], defaults=(None,) * 9)
+
+class MetricsService:
+    """Computes all overview metrics in one query and caches the snapshot.
+
+    metrics maps OverviewMetrics fields to scalar SELECTs. Range metrics use
+    %(start_date)s / %(end_date)s placeholders and are only computed when
+    snapshot() is given a date range.
+    """
+
+    def __init__(self, db, metrics, ttl=10, max_entries=32):
+        unknown = set(metrics) - set(OverviewMetrics._fields)
+        if unknown:
+            raise ValueError(f"Unknown overview metrics: {', '.join(sorted(unknown))}")
+        self.db = db
+        self.metrics = metrics
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._snapshots = {}  # (start_date, end_date) -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+
+    def snapshot(self, start_date=None, end_date=None):
+        """Return an OverviewMetrics, at most ttl seconds old"""
+        key = (start_date, end_date)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._snapshots.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        snapshot = self._compute(start_date, end_date)
+        if snapshot is None:
+            # The query failed and was reported; don't cache the blank snapshot
+            return OverviewMetrics()
+
+        with self._lock:
+            self._snapshots = {
+                k: v for k, v in self._snapshots.items() if v[0] > now
+            }
+            if len(self._snapshots) < self.max_entries:
+                self._snapshots[key] = (now + self.ttl, snapshot)
+        return snapshot
+
+    def invalidate(self):
+        """Drop cached snapshots, e.g. right after an admin action"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def _compute(self, start_date, end_date):
+        with_range = start_date is not None and end_date is not None
+        selected = {
+            name: query for name, query in self.metrics.items()
+            if with_range or '%(' not in query
+        }
+        row = self.db.execute_query(
+            "SELECT " + ", ".join(f"({query}) AS {name}" for name, query in selected.items()),
+            {'start_date': start_date, 'end_date': end_date} if with_range else None,
+            use_cache=False
+        )
+        if not row:
+            return None
+        return OverviewMetrics(
+            generated_at=datetime.now(),
+            **{name: row[0][name] for name in selected}
+        )
@@ -0,0 +1,86 @@
+from collections import namedtuple
+from mysql.connector import Error, errorcode
+
+# A numbered schema change; statements run in order and the version is
+# recorded in schema_version once they have all succeeded.
+Migration = namedtuple('Migration', ['version', 'name', 'statements'])
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+class MigrationError(Exception):
+    """Raised when migrations cannot be applied"""
+
+
+class MigrationRunner:
+    """Applies numbered migrations once each, tracked in a schema_version table"""
+
+    def __init__(self, db, migrations, lock_name='home_flavours_migrations', lock_timeout=60):
+        self.db = db
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.lock_name = lock_name
+        self.lock_timeout = lock_timeout
+
+    def current_version(self):
+        """Return the highest applied migration version (0 for a fresh database)"""
+        with self.db.unit_of_work() as connection:
+            cursor = connection.cursor()
+            try:
+                return self._current_version(cursor)
+            finally:
+                cursor.close()
+
+    def migrate(self):
+        """Apply pending migrations in order and return their versions.
+
+        When the schema is current this costs a single SELECT. Otherwise a
+        named lock makes concurrent workers apply each migration only once.
+        """
+        applied = []
+        with self.db.unit_of_work() as connection:
+            cursor = connection.cursor()
+            try:
+                if self._current_version(cursor) >= self.migrations[-1].version:
+                    return applied
+
+                cursor.execute("SELECT GET_LOCK(%s, %s)", (self.lock_name, self.lock_timeout))
+                if not cursor.fetchone()[0]:
+                    raise MigrationError(f"Timed out waiting for migration lock '{self.lock_name}'")
+                try:
+                    # Another worker may have migrated while we waited for the lock
+                    current = self._current_version(cursor)
+                    for migration in self.migrations:
+                        if migration.version <= current:
+                            continue
+                        for statement in migration.statements:
+                            cursor.execute(statement)
+                        cursor.execute(
+                            "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                            (migration.version, migration.name)
+                        )
+                        applied.append(migration.version)
+                        print(f"Applied migration {migration.version}: {migration.name}")
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (self.lock_name,))
+                    cursor.fetchall()
+            finally:
+                cursor.close()
+
+        if applied:
+            self.db.clear_cache()
+        return applied
+
+    def _current_version(self, cursor):
+        try:
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            return cursor.fetchone()[0]
+        except Error as e:
+            if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+            cursor.execute(SCHEMA_VERSION_TABLE)
+            return 0
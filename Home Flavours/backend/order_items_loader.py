@@ -0,0 +1,38 @@
+import streamlit as st
+
+class OrderItemsLoader:
+    """Loads the line items of many orders with one IN (...) query"""
+
+    def __init__(self, db, chunk_size=500):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def load(self, order_ids):
+        """Return {order_id: [item rows]} for the given orders"""
+        order_ids = list(dict.fromkeys(order_ids))
+        grouped = {order_id: [] for order_id in order_ids}
+
+        for start in range(0, len(order_ids), self.chunk_size):
+            chunk = order_ids[start:start + self.chunk_size]
+            rows = self.db.execute_query(f"""
+                SELECT oi.*, mi.name, mi.description
+                FROM order_items oi
+                JOIN menu_items mi ON oi.menu_item_id = mi.id
+                WHERE oi.order_id IN ({', '.join(['%s'] * len(chunk))})
+                ORDER BY oi.order_id, oi.id
+            """, tuple(chunk))
+            for row in rows:
+                grouped[row['order_id']].append(row)
+
+        return grouped
+
+def expanded_order_ids(orders, key_prefix):
+    """Ids of orders whose "show items" checkbox is ticked in this session.
+
+    Widget values are in session_state before the widgets are drawn, so a
+    page can batch-load just these orders ahead of its render loop.
+    """
+    return [
+        order['id'] for order in orders
+        if st.session_state.get(f"{key_prefix}_{order['id']}")
+    ]
@@ -0,0 +1,203 @@
+import sys
+from datetime import datetime, timedelta
+from mysql.connector import Error
+from connection_pool import PoolTimeoutError
+
+# Aggregates orders into rollup rows; the WHERE clause is filled in per range
+ROLLUP_SELECT = """
+    SELECT DATE(created_at), COALESCE(tiffin_maker_id, 0), status, COUNT(*), SUM(total_amount)
+    FROM orders
+    {where}
+    GROUP BY DATE(created_at), COALESCE(tiffin_maker_id, 0), status
+"""
+
+class OrderRollups:
+    """Per-day, per-maker, per-status order counts and revenue.
+
+    Orders without a tiffin maker are counted under maker 0. Every order
+    insert and status change applies its delta in the same transaction, so
+    charts read order_daily_rollups instead of grouping the orders table.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def record_order(self, order_id):
+        """Add a newly inserted order to its day's rollup row"""
+        self.db.execute_write("""
+            INSERT INTO order_daily_rollups (day, tiffin_maker_id, status, order_count, revenue)
+            SELECT DATE(created_at), COALESCE(tiffin_maker_id, 0), status, 1, total_amount
+            FROM orders WHERE id = %s
+            ON DUPLICATE KEY UPDATE
+                order_count = order_count + VALUES(order_count),
+                revenue = revenue + VALUES(revenue)
+        """, (order_id,))
+
+    def update_status(self, order_id, new_status):
+        """Change an order's status and move it between rollup rows atomically"""
+        try:
+            with self.db.transaction():
+                # Lock the order so concurrent status changes apply in turn
+                order = self.db.execute_query(
+                    """SELECT DATE(created_at) AS day, COALESCE(tiffin_maker_id, 0) AS maker_id,
+                              status, total_amount
+                       FROM orders WHERE id = %s FOR UPDATE""",
+                    (order_id,)
+                )
+                if not order:
+                    return False
+                order = order[0]
+                if order['status'] == new_status:
+                    return True
+
+                self.db.execute_write(
+                    "UPDATE orders SET status = %s WHERE id = %s", (new_status, order_id)
+                )
+                for status, sign in ((order['status'], -1), (new_status, 1)):
+                    self.db.execute_write("""
+                        INSERT INTO order_daily_rollups (day, tiffin_maker_id, status, order_count, revenue)
+                        VALUES (%s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                            order_count = order_count + VALUES(order_count),
+                            revenue = revenue + VALUES(revenue)
+                    """, (order['day'], order['maker_id'], status, sign, sign * order['total_amount']))
+            return True
+        except (Error, PoolTimeoutError) as e:
+            self.db.report_error(f"Error updating order status: {e}")
+            return False
+
+    def daily_revenue(self, start_date, end_date, tiffin_maker_id=None, as_frame=False):
+        """Revenue per day (cancelled orders excluded) between two dates inclusive"""
+        where, params = self._range(start_date, end_date, tiffin_maker_id)
+        return self._select(as_frame)(f"""
+            SELECT day AS date, SUM(revenue) AS daily_revenue
+            FROM order_daily_rollups
+            WHERE {where} AND status != 'cancelled'
+            GROUP BY day
+            HAVING SUM(order_count) > 0
+            ORDER BY day
+        """, params)
+
+    def status_counts(self, start_date, end_date, tiffin_maker_id=None, as_frame=False):
+        """Order count per status between two dates inclusive"""
+        where, params = self._range(start_date, end_date, tiffin_maker_id)
+        return self._select(as_frame)(f"""
+            SELECT status, SUM(order_count) AS count
+            FROM order_daily_rollups
+            WHERE {where}
+            GROUP BY status
+            HAVING SUM(order_count) > 0
+        """, params)
+
+    def backfill(self, start_date=None, end_date=None):
+        """Rebuild rollup rows from orders, for all days or a date range.
+
+        Returns the number of rollup rows written, or None on failure.
+        """
+        order_where, order_params, rollup_where, rollup_params = self._bounds(start_date, end_date)
+        results = self.db.execute_batch([
+            (f"DELETE FROM order_daily_rollups {rollup_where}", rollup_params),
+            ("INSERT INTO order_daily_rollups (day, tiffin_maker_id, status, order_count, revenue)"
+             + ROLLUP_SELECT.format(where=order_where), order_params),
+        ])
+        return results[1].rowcount if results else None
+
+    def check_consistency(self, start_date=None, end_date=None):
+        """Compare rollups with a fresh aggregate of orders.
+
+        Returns the (day, tiffin_maker_id, status) rows whose counts or
+        revenue disagree, so an empty list means the rollups are accurate.
+        Returns None if the check could not run.
+        """
+        order_where, order_params, rollup_where, rollup_params = self._bounds(start_date, end_date)
+        try:
+            # Inside a transaction query errors raise instead of returning []
+            with self.db.transaction():
+                return self.db.execute_query(f"""
+                    SELECT day, tiffin_maker_id, status,
+                           SUM(expected_count) AS expected_count, SUM(rollup_count) AS rollup_count,
+                           SUM(expected_revenue) AS expected_revenue, SUM(rollup_revenue) AS rollup_revenue
+                    FROM (
+                        SELECT DATE(created_at) AS day, COALESCE(tiffin_maker_id, 0) AS tiffin_maker_id,
+                               status, COUNT(*) AS expected_count, 0 AS rollup_count,
+                               SUM(total_amount) AS expected_revenue, 0 AS rollup_revenue
+                        FROM orders
+                        {order_where}
+                        GROUP BY DATE(created_at), COALESCE(tiffin_maker_id, 0), status
+                        UNION ALL
+                        SELECT day, tiffin_maker_id, status, 0, order_count, 0, revenue
+                        FROM order_daily_rollups
+                        {rollup_where}
+                    ) combined
+                    GROUP BY day, tiffin_maker_id, status
+                    HAVING SUM(expected_count) <> SUM(rollup_count)
+                        OR SUM(expected_revenue) <> SUM(rollup_revenue)
+                    ORDER BY day, tiffin_maker_id, status
+                """, order_params + rollup_params)
+        except (Error, PoolTimeoutError) as e:
+            self.db.report_error(f"Error checking rollups: {e}")
+            return None
+
+    def _bounds(self, start_date, end_date):
+        """WHERE clauses selecting the same days from orders and the rollups"""
+        order_conditions, order_params, rollup_conditions, rollup_params = [], [], [], []
+        if start_date is not None:
+            order_conditions.append("created_at >= %s")
+            order_params.append(start_date)
+            rollup_conditions.append("day >= %s")
+            rollup_params.append(start_date)
+        if end_date is not None:
+            # Half-open on created_at so the range can use idx_orders_created
+            order_conditions.append("created_at < %s")
+            order_params.append(end_date + timedelta(days=1))
+            rollup_conditions.append("day <= %s")
+            rollup_params.append(end_date)
+        order_where = "WHERE " + " AND ".join(order_conditions) if order_conditions else ""
+        rollup_where = "WHERE " + " AND ".join(rollup_conditions) if rollup_conditions else ""
+        return order_where, tuple(order_params), rollup_where, tuple(rollup_params)
+
+    def _select(self, as_frame):
+        """Typed DataFrame columns for charts, dict rows otherwise"""
+        return self.db.execute_frame if as_frame else self.db.execute_query
+
+    def _range(self, start_date, end_date, tiffin_maker_id):
+        where = "day BETWEEN %s AND %s"
+        params = [start_date, end_date]
+        if tiffin_maker_id is not None:
+            where = "tiffin_maker_id = %s AND " + where
+            params.insert(0, tiffin_maker_id)
+        return where, tuple(params)
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+if __name__ == "__main__":
+    # python order_rollups.py backfill|check [START YYYY-MM-DD] [END YYYY-MM-DD]
+    from database import order_rollups
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    start_date = parse_date(sys.argv[2]) if len(sys.argv) > 2 else None
+    end_date = parse_date(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    if command == "backfill":
+        rows = order_rollups.backfill(start_date, end_date)
+        if rows is None:
+            print("❌ Backfill failed")
+            sys.exit(1)
+        print(f"✅ Rebuilt {rows} rollup rows")
+    elif command == "check":
+        mismatches = order_rollups.check_consistency(start_date, end_date)
+        if mismatches is None:
+            print("❌ Consistency check failed")
+            sys.exit(1)
+        for row in mismatches:
+            print(f"❌ {row['day']} maker {row['tiffin_maker_id']} {row['status']}: "
+                  f"orders {row['expected_count']} / ₹{row['expected_revenue']}, "
+                  f"rollup {row['rollup_count']} / ₹{row['rollup_revenue']}")
+        if mismatches:
+            print(f"Found {len(mismatches)} inconsistent rollup rows; run: python order_rollups.py backfill")
+            sys.exit(1)
+        print("✅ Rollups match the orders table")
+    else:
+        print(f"Unknown command '{command}'; use backfill or check")
+        sys.exit(2)
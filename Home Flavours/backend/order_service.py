@@ -0,0 +1,54 @@
+from mysql.connector import Error
+from connection_pool import PoolTimeoutError
+from app_metrics import orders_placed
+
+class OrderService:
+    """Places an order, its line items and the cart clear in one transaction"""
+
+    def __init__(self, db, cart_user_column='customer_id', item_price_column='price_per_unit',
+                 rollups=None):
+        self.db = db
+        self.cart_user_column = cart_user_column
+        self.item_price_column = item_price_column
+        self.rollups = rollups
+
+    def place_order(self, customer_id, items, **order_fields):
+        """Insert the order and all line items, then empty the customer's cart.
+
+        items is a list of (menu_item_id, quantity, price) tuples and
+        order_fields are the remaining orders columns. Returns the new order
+        id, or None if anything failed and the transaction was rolled back.
+        """
+        if not items:
+            return None
+
+        columns = ['customer_id'] + list(order_fields)
+        values = [customer_id] + list(order_fields.values())
+
+        try:
+            with self.db.transaction():
+                # lastrowid is per-connection, so a second order from the
+                # same customer can never hand us the wrong id.
+                order_id = self.db.execute_write(
+                    f"INSERT INTO orders ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(columns))})",
+                    values
+                ).lastrowid
+                if self.rollups is not None:
+                    self.rollups.record_order(order_id)
+
+                self.db.execute_many(
+                    f"INSERT INTO order_items (order_id, menu_item_id, quantity, {self.item_price_column}) "
+                    "VALUES (%s, %s, %s, %s)",
+                    [(order_id, menu_item_id, quantity, price) for menu_item_id, quantity, price in items]
+                )
+
+                self.db.execute_write(
+                    f"DELETE FROM cart WHERE {self.cart_user_column} = %s",
+                    (customer_id,)
+                )
+            orders_placed.inc()
+            return order_id
+        except (Error, PoolTimeoutError) as e:
+            self.db.report_error(f"Error placing order: {e}")
+            return None
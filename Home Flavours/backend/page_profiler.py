@@ -0,0 +1,183 @@
+import cProfile
+import functools
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from config import PAGE_PROFILER_CONFIG
+
+class PageProfiler:
+    """Opt-in wall/CPU/DB timers for show_* pages, with cProfile dumps of the slowest reruns.
+
+    Disabled it costs one attribute check per page, plus a timer when an
+    observer such as the metrics exporter is registered. When enabled, every
+    page run is timed, and each outermost page run (a whole rerun of a
+    dashboard) can be profiled with cProfile; the keep_slowest slowest are
+    written to dump_dir as .prof files for snakeviz or pstats.
+    """
+
+    def __init__(self, enabled=False, keep_slowest=0, dump_dir='profiles', samples=200):
+        self.enabled = enabled
+        self.keep_slowest = keep_slowest
+        self.dump_dir = dump_dir
+        self.samples = samples
+        self._pages = {}     # page -> aggregate timings
+        self._slowest = []   # min-heap of (wall, seq, run)
+        self._sequence = itertools.count()
+        self._query_stats = []
+        self._observers = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def watch(self, query_stats):
+        """Also measure DB time per page from a database manager's QueryStats"""
+        if query_stats not in self._query_stats:
+            self._query_stats.append(query_stats)
+
+    def add_observer(self, callback):
+        """Call callback(page, wall_seconds) after every page run, even while disabled"""
+        self._observers.append(callback)
+
+    @contextmanager
+    def profile(self, page):
+        """Time one run of a page; only observers are fed while profiling is disabled"""
+        if not self.enabled:
+            if not self._observers:
+                yield
+                return
+            wall_start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._notify(page, time.perf_counter() - wall_start)
+            return
+
+        outermost = not getattr(self._local, 'active', False)
+        self._local.active = True
+        profile = cProfile.Profile() if outermost and self.keep_slowest else None
+        with ExitStack() as stack:
+            trackers = [
+                stack.enter_context(stats.track(page, report=False)) for stats in self._query_stats
+            ]
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            if profile is not None:
+                profile.enable()
+            try:
+                yield
+            finally:
+                # Also reached by st.rerun()/st.stop(), which end a page by raising
+                if profile is not None:
+                    profile.disable()
+                wall = time.perf_counter() - wall_start
+                cpu = time.thread_time() - cpu_start
+                if outermost:
+                    self._local.active = False
+                self._record(page, wall, cpu, sum(tracker.db_time for tracker in trackers))
+                self._notify(page, wall)
+                if profile is not None:
+                    self._keep_if_slow(page, wall, profile)
+
+    def snapshot(self):
+        """Per-page timing breakdown (slowest total first) and the kept cProfile dumps"""
+        with self._lock:
+            pages = []
+            for page, stats in self._pages.items():
+                walls = sorted(stats['walls'])
+                runs = stats['runs']
+                pages.append({
+                    'page': page,
+                    'runs': runs,
+                    'wall_ms': stats['wall'] / runs * 1000,
+                    'p95_wall_ms': walls[min(len(walls) - 1, int(len(walls) * 0.95))] * 1000,
+                    'max_wall_ms': stats['max_wall'] * 1000,
+                    'cpu_ms': stats['cpu'] / runs * 1000,
+                    'db_ms': stats['db'] / runs * 1000,
+                    # Waiting that is neither Python CPU nor DB: network, locks, workers
+                    'other_ms': max(stats['wall'] - stats['cpu'] - stats['db'], 0) / runs * 1000,
+                    'total_wall_ms': stats['wall'] * 1000,
+                })
+            slowest = [run for _, _, run in sorted(self._slowest, reverse=True)]
+        pages.sort(key=lambda row: row['total_wall_ms'], reverse=True)
+        return {'enabled': self.enabled, 'pages': pages, 'slowest_runs': slowest}
+
+    def reset(self):
+        """Forget collected timings (dump files are left on disk)"""
+        with self._lock:
+            self._pages.clear()
+            self._slowest.clear()
+
+    def _notify(self, page, wall):
+        for callback in self._observers:
+            callback(page, wall)
+
+    def _record(self, page, wall, cpu, db_time):
+        with self._lock:
+            stats = self._pages.get(page)
+            if stats is None:
+                stats = self._pages[page] = {
+                    'runs': 0, 'wall': 0.0, 'cpu': 0.0, 'db': 0.0, 'max_wall': 0.0,
+                    'walls': deque(maxlen=self.samples),
+                }
+            stats['runs'] += 1
+            stats['wall'] += wall
+            stats['cpu'] += cpu
+            stats['db'] += db_time
+            stats['max_wall'] = max(stats['max_wall'], wall)
+            stats['walls'].append(wall)
+
+    def _keep_if_slow(self, page, wall, profile):
+        with self._lock:
+            if len(self._slowest) >= self.keep_slowest and wall <= self._slowest[0][0]:
+                return
+            sequence = next(self._sequence)
+
+        os.makedirs(self.dump_dir, exist_ok=True)
+        path = os.path.join(
+            self.dump_dir,
+            f"{page.replace('.', '_')}_{datetime.now():%Y%m%d_%H%M%S}_{sequence}.prof"
+        )
+        profile.dump_stats(path)
+        run = {'page': page, 'wall_ms': wall * 1000, 'time': datetime.now(), 'dump': path}
+
+        with self._lock:
+            heapq.heappush(self._slowest, (wall, sequence, run))
+            evicted = heapq.heappop(self._slowest) if len(self._slowest) > self.keep_slowest else None
+        if evicted is not None:
+            try:
+                os.remove(evicted[2]['dump'])
+            except OSError:
+                pass
+
+
+def profile_page(profiler, page=None):
+    """Decorator timing a page function with profiler.profile()"""
+    def decorate(func):
+        name = page or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.profile(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def profile_pages(profiler):
+    """Class decorator timing every show_* method"""
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith('show_') and callable(method):
+                setattr(cls, name, profile_page(profiler, f"{cls.__name__}.{name}")(method))
+        return cls
+    return decorate
+
+def profile_module_pages(profiler, namespace):
+    """Wrap the module-level show_* functions of a single-file app in place"""
+    for name, func in list(namespace.items()):
+        if name.startswith('show_') and callable(func):
+            namespace[name] = profile_page(profiler, name)(func)
+
+profiler = PageProfiler(**PAGE_PROFILER_CONFIG)
@@ -0,0 +1,97 @@
+import streamlit as st
+
+class KeysetPaginator:
+    """Seek pagination over (created_at, id), newest first.
+
+    Each page continues from the last row of the previous one instead of
+    using OFFSET, so every page costs the same no matter how deep it is.
+    The cursors of the pages visited so far are kept in session state for
+    the Previous button, and reset whenever the query or filters change.
+    """
+
+    def __init__(self, key, select, from_clause, where=None, params=(), group_by=None,
+                 time_column='created_at', id_column='id', page_sizes=(10, 25, 50, 100)):
+        self.key = f"keyset_{key}"
+        self.select = select
+        self.from_clause = from_clause
+        self.where = where
+        self.params = tuple(params)
+        self.group_by = group_by
+        self.time_column = time_column
+        self.id_column = id_column
+        self.page_sizes = page_sizes
+        self.rows = []
+        self.has_next = False
+
+    def _state(self):
+        signature = (self.select, self.from_clause, self.where, self.params, self.group_by)
+        state = st.session_state.get(self.key)
+        if state is None or state['signature'] != signature:
+            state = {'signature': signature, 'cursors': []}
+            st.session_state[self.key] = state
+        return state
+
+    def _reset(self):
+        self._state()['cursors'] = []
+
+    def _next(self, cursor):
+        self._state()['cursors'].append(cursor)
+
+    def _previous(self):
+        cursors = self._state()['cursors']
+        if cursors:
+            cursors.pop()
+
+    def fetch(self, db):
+        """Draw the page-size picker and return the rows of the current page"""
+        state = self._state()
+        page_size = st.selectbox(
+            "Rows per page", self.page_sizes, key=f"{self.key}_size", on_change=self._reset
+        )
+
+        rows = self._query(db, state['cursors'], page_size)
+        if not rows and state['cursors']:
+            # The page we were on disappeared (rows deleted); start over
+            state['cursors'] = []
+            rows = self._query(db, state['cursors'], page_size)
+
+        self.has_next = len(rows) > page_size
+        self.rows = rows[:page_size]
+        return self.rows
+
+    def _query(self, db, cursors, page_size):
+        conditions = [self.where] if self.where else []
+        params = list(self.params)
+        if cursors:
+            created_at, row_id = cursors[-1]
+            conditions.append(
+                f"({self.time_column} < %s OR ({self.time_column} = %s AND {self.id_column} < %s))"
+            )
+            params.extend([created_at, created_at, row_id])
+
+        query = f"SELECT {self.select} FROM {self.from_clause}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if self.group_by:
+            query += f" GROUP BY {self.group_by}"
+        query += f" ORDER BY {self.time_column} DESC, {self.id_column} DESC LIMIT %s"
+        params.append(page_size + 1)
+
+        return db.execute_query(query, tuple(params))
+
+    def show_navigation(self):
+        """Draw Previous/Next buttons for the page returned by fetch()"""
+        state = self._state()
+        time_field = self.time_column.split('.')[-1]
+        id_field = self.id_column.split('.')[-1]
+        cursor = (self.rows[-1][time_field], self.rows[-1][id_field]) if self.rows else None
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("⬅️ Previous", key=f"{self.key}_prev",
+                      disabled=not state['cursors'], on_click=self._previous)
+        with col2:
+            st.markdown(f"Page {len(state['cursors']) + 1}")
+        with col3:
+            st.button("Next ➡️", key=f"{self.key}_next",
+                      disabled=not self.has_next, on_click=self._next, args=(cursor,))
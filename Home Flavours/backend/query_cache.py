@@ -0,0 +1,136 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+TABLE_PATTERN = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
+
+# Results of these depend on more than the tables they read
+VOLATILE_PATTERN = re.compile(
+    r"\b(?:NOW|CURDATE|CURTIME|SYSDATE|RAND|UUID)\s*\(|\bCURRENT_(?:DATE|TIME|TIMESTAMP)\b",
+    re.IGNORECASE
+)
+
+def tables_in(query):
+    """Return the lower-cased table names a statement reads or writes"""
+    return frozenset(name.lower() for name in TABLE_PATTERN.findall(query))
+
+def is_cacheable(query):
+    """Whether a statement is a deterministic SELECT worth caching"""
+    return query.lstrip().upper().startswith('SELECT') and not VOLATILE_PATTERN.search(query)
+
+
+class QueryCache:
+    """Read-through SELECT cache with TTL, LRU bound and table-tagged invalidation"""
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, rows)
+        self._by_table = {}            # table -> set of keys
+        self._generations = {}         # table -> invalidation counter
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(query, params):
+        if params is None:
+            return query, ()
+        if isinstance(params, dict):
+            return query, tuple(sorted(params.items()))
+        return query, tuple(params)
+
+    def get(self, key):
+        """Return cached rows for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, tables, rows = entry
+            if expires_at < time.monotonic():
+                self._remove(key, tables)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return rows
+
+    def generations(self, tables):
+        """Snapshot the invalidation counters of tables before a read"""
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in sorted(tables))
+
+    def put(self, key, tables, rows, generations):
+        """Store rows unless one of their tables was written since the read began"""
+        with self._lock:
+            current = tuple(self._generations.get(table, 0) for table in sorted(tables))
+            if current != generations:
+                return
+
+            if key in self._entries:
+                self._remove(key, self._entries[key][1])
+            self._entries[key] = (time.monotonic() + self.ttl, tables, rows)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                old_key, (_, old_tables, _) = next(iter(self._entries.items()))
+                self._remove(old_key, old_tables)
+                self._evictions += 1
+
+    def invalidate(self, tables):
+        """Drop every entry that read any of the given tables"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in self._by_table.pop(table, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._invalidations += 1
+                        for other in entry[1]:
+                            if other != table:
+                                self._by_table.get(other, set()).discard(key)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            for table in self._by_table:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self):
+        """Snapshot of hit/miss counters and cache size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+    def _remove(self, key, tables):
+        self._entries.pop(key, None)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
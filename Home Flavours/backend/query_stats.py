@@ -0,0 +1,308 @@
+import re
+import sys
+import functools
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# Literals and placeholders are replaced so statements that differ only in
+# their values are counted together.
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+@lru_cache(maxsize=1024)
+def normalize(query):
+    """Collapse a statement to its shape: literals and placeholders become ?"""
+    statement = STRING_LITERAL.sub('?', query)
+    statement = PLACEHOLDER.sub('?', statement)
+    statement = NUMBER_LITERAL.sub('?', statement)
+    statement = VALUE_LIST.sub('(...)', statement)
+    return WHITESPACE.sub(' ', statement).strip()
+
+def redact(params):
+    """Describe parameters by type only, so values never reach the log"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Estimate the latency below which fraction of the calls fell"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a page runs more queries than its budget"""
+
+
+class QueryTracker:
+    """DB calls and time for one run of one page"""
+
+    def __init__(self, page, budget=None, n_plus_one_threshold=5):
+        self.page = page
+        self.budget = budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.calls = 0
+        self.db_time = 0.0
+        self._statements = {}  # normalized statement -> [calls, set of param hashes]
+        self._lock = threading.Lock()
+
+    def add(self, statement, params, elapsed):
+        with self._lock:
+            self.calls += 1
+            self.db_time += elapsed
+            seen = self._statements.setdefault(statement, [0, set()])
+            seen[0] += 1
+            seen[1].add(hash(repr(params)))
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.calls > self.budget
+
+    def repeated(self):
+        """Statements run n_plus_one_threshold or more times with different parameters"""
+        with self._lock:
+            return sorted(
+                ((statement, calls) for statement, (calls, variants) in self._statements.items()
+                 if calls >= self.n_plus_one_threshold and len(variants) > 1),
+                key=lambda item: item[1], reverse=True
+            )
+
+    def summary(self):
+        return {
+            'page': self.page,
+            'calls': self.calls,
+            'db_ms': self.db_time * 1000,
+            'budget': self.budget,
+            'over_budget': self.over_budget,
+            'repeated': self.repeated(),
+            'time': datetime.now(),
+        }
+
+
+class QueryStats:
+    """Per-statement call counts and latency plus a slow-query log"""
+
+    def __init__(self, slow_threshold=0.5, slow_log_size=100, max_statements=500,
+                 n_plus_one_threshold=5, strict_budgets=False):
+        self.slow_threshold = slow_threshold
+        self.max_statements = max_statements
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict_budgets = strict_budgets
+        self._statements = {}  # normalized statement -> counters
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._page_runs = {}   # page -> summary of its latest run
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, query, params, elapsed, rows, error=False):
+        """Record one execution of a statement"""
+        statement = normalize(query)
+        slow = elapsed >= self.slow_threshold
+        page = self.current_page() if slow else None
+
+        with self._lock:
+            # Only the aggregate table is capped; trackers and the slow log see the real statement
+            bucket = statement
+            stats = self._statements.get(bucket)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    bucket = '<other statements>'
+                    stats = self._statements.get(bucket)
+                if stats is None:
+                    stats = self._statements[bucket] = {
+                        'calls': 0, 'rows': 0, 'errors': 0, 'latency': LatencyHistogram()
+                    }
+            stats['calls'] += 1
+            stats['rows'] += rows
+            stats['errors'] += error
+            stats['latency'].observe(elapsed)
+
+            if slow:
+                self._slow_log.append({
+                    'time': datetime.now(),
+                    'statement': statement,
+                    'elapsed_ms': elapsed * 1000,
+                    'rows': rows,
+                    'page': page,
+                    'params': redact(params),
+                    'error': error,
+                })
+
+        for tracker in getattr(self._local, 'trackers', ()):
+            tracker.add(statement, params, elapsed)
+
+        if slow:
+            print(f"Slow query ({elapsed * 1000:.0f} ms) from {page or 'unknown page'}: {statement}")
+
+    @contextmanager
+    def track(self, page, budget=None, report=True):
+        """Count the statements a page runs on this thread (and its loaders).
+
+        Trackers nest, so a dashboard's total includes its tabs. Repeated
+        statements (the N+1 pattern) are printed when the page finishes; a
+        page over its budget raises QueryBudgetExceeded in strict mode.
+        With report=False the tracker only counts, for callers such as the
+        page profiler that read it themselves.
+        """
+        tracker = QueryTracker(page, budget, self.n_plus_one_threshold)
+        previous = self.context()
+        self._local.page = page
+        self._local.trackers = previous[1] + (tracker,)
+        try:
+            yield tracker
+        finally:
+            self._local.page, self._local.trackers = previous
+            if report:
+                summary = tracker.summary()
+                with self._lock:
+                    self._page_runs[page] = summary
+
+        if not report:
+            return
+        for statement, calls in summary['repeated']:
+            print(f"Possible N+1 in {page}: {calls} calls of {statement}")
+        if tracker.over_budget:
+            message = f"{page} ran {tracker.calls} queries, over its budget of {budget}"
+            if self.strict_budgets:
+                raise QueryBudgetExceeded(message)
+            print(message)
+
+    def context(self):
+        """This thread's page and trackers, to hand to a worker thread"""
+        return getattr(self._local, 'page', None), getattr(self._local, 'trackers', ())
+
+    @contextmanager
+    def attach(self, context):
+        """Run a worker's statements under the submitting thread's context"""
+        previous = self.context()
+        self._local.page, self._local.trackers = context
+        try:
+            yield
+        finally:
+            self._local.page, self._local.trackers = previous
+
+    def current_page(self):
+        """The page running on this thread: an explicit page() or the nearest show_* caller"""
+        page = getattr(self._local, 'page', None)
+        if page is not None:
+            return page
+        frame = sys._getframe(1)
+        while frame is not None:
+            name = frame.f_code.co_name
+            if name.startswith('show_'):
+                owner = frame.f_locals.get('self')
+                return f"{type(owner).__name__}.{name}" if owner is not None else name
+            frame = frame.f_back
+        return None
+
+    def latency(self):
+        """All statements merged into one LatencyHistogram, plus the total error count"""
+        merged = LatencyHistogram()
+        errors = 0
+        with self._lock:
+            for stats in self._statements.values():
+                histogram = stats['latency']
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.count += histogram.count
+                merged.total += histogram.total
+                merged.max = max(merged.max, histogram.max)
+                errors += stats['errors']
+        return merged, errors
+
+    def snapshot(self):
+        """Statement stats sorted by total time, plus the slow-query log (newest first)"""
+        with self._lock:
+            statements = [
+                {
+                    'statement': statement,
+                    'calls': stats['calls'],
+                    'rows': stats['rows'],
+                    'errors': stats['errors'],
+                    'total_ms': stats['latency'].total * 1000,
+                    'p50_ms': stats['latency'].percentile(0.50) * 1000,
+                    'p95_ms': stats['latency'].percentile(0.95) * 1000,
+                    'p99_ms': stats['latency'].percentile(0.99) * 1000,
+                    'max_ms': stats['latency'].max * 1000,
+                }
+                for statement, stats in self._statements.items()
+            ]
+            slow_queries = list(reversed(self._slow_log))
+            pages = sorted(self._page_runs.values(), key=lambda run: run['db_ms'], reverse=True)
+        statements.sort(key=lambda row: row['total_ms'], reverse=True)
+        return {
+            'slow_threshold_ms': self.slow_threshold * 1000,
+            'statements': statements,
+            'slow_queries': slow_queries,
+            'pages': pages,
+        }
+
+    def reset(self):
+        """Forget all recorded statements and slow queries"""
+        with self._lock:
+            self._statements.clear()
+            self._slow_log.clear()
+            self._page_runs.clear()
+
+
+def track_page(stats, page=None, budget=None):
+    """Decorator running a page function inside stats.track()"""
+    def decorate(func):
+        name = page or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stats.track(name, budget):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def track_pages(stats, budgets=None):
+    """Class decorator tracking every show_* method, with optional per-method budgets"""
+    budgets = budgets or {}
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith('show_') and callable(method):
+                setattr(cls, name, track_page(stats, f"{cls.__name__}.{name}", budgets.get(name))(method))
+        return cls
+    return decorate
@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# Keep simple_main.py's store in memory so the benchmark never touches the app's journal
+os.environ['SIMPLE_STORE_PATH'] = ''
+from streamlit.testing.v1 import AppTest
+from seed_data import DataGenerator, DISHES
+from load_test import quiet_bare_mode_warnings
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend')
+SIZES = (10, 1000, 100000)
+
+# AppTest runs a script string in this process, so the dashboards share our db singletons
+DASHBOARD_SCRIPT = """
+import sys
+sys.path[:0] = [{backend!r}, {frontend!r}]
+from {module} import {cls}
+{cls}().show_dashboard()
+"""
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class RenderBenchmark:
+    """Times headless reruns of one page with Streamlit's AppTest.
+
+    The first run (imports, connecting, caches) is not timed. Each timed
+    run is a rerun of the same session, like a user clicking around; peak
+    memory comes from one extra run under tracemalloc, which would
+    otherwise slow the timed runs down.
+    """
+
+    def __init__(self, runs=10, timeout=120):
+        self.runs = runs
+        self.timeout = timeout
+
+    def measure(self, page, orders, app, stats=None):
+        """Render one page; timings are None if it never finished within the timeout"""
+        result = {
+            'page': page, 'orders': orders, 'runs': 0, 'median_ms': None, 'p95_ms': None,
+            'queries_per_run': None, 'peak_memory_mb': None, 'errors': [],
+        }
+        at = app()
+        timings = []
+        try:
+            self._run(at)
+            queries_before = stats.latency()[0].count if stats is not None else 0
+            for _ in range(self.runs):
+                started = time.perf_counter()
+                self._run(at)
+                timings.append(time.perf_counter() - started)
+            queries = stats.latency()[0].count - queries_before if stats is not None else 0
+            result['queries_per_run'] = queries / self.runs
+
+            tracemalloc.start()
+            try:
+                self._run(at)
+                result['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            finally:
+                tracemalloc.stop()
+        except RuntimeError as e:
+            # AppTest raises RuntimeError when a run exceeds the timeout
+            result['errors'].append(str(e))
+
+        result['errors'] = sorted(set(result['errors'] + [str(exception.value) for exception in at.exception]))
+        if timings:
+            timings.sort()
+            result.update(runs=len(timings), median_ms=statistics.median(timings) * 1000,
+                          p95_ms=percentile(timings, 0.95) * 1000)
+        return result
+
+    def _run(self, at):
+        at.run(timeout=self.timeout)
+
+
+def simple_main_pages(size, seed):
+    """simple_main.py keeps its data in the in-process store, so the dataset is restored into it"""
+    from simple_store import store
+    rng = random.Random(seed)
+    password = hashlib.sha256(b'password123').hexdigest()
+    users = {
+        'admin': {'email': 'admin@homeflavours.com', 'password': hashlib.sha256(b'admin123').hexdigest(),
+                  'full_name': 'System Administrator', 'phone': '1234567890', 'address': 'Admin Address',
+                  'user_type': 'admin'},
+        'chef1': {'email': 'chef1@homeflavours.com', 'password': hashlib.sha256(b'chef123').hexdigest(),
+                  'full_name': 'Priya Sharma', 'phone': '9876543210', 'address': 'Mumbai',
+                  'user_type': 'tiffin_maker'},
+    }
+    customers = ['customer1'] + [f"seed_customer_{index}" for index in range(max(size // 20, 1))]
+    for username in customers:
+        users[username] = {'email': f"{username}@example.com", 'password': password,
+                           'full_name': username.replace('_', ' ').title(), 'phone': '9000000000',
+                           'address': 'Seed Street', 'user_type': 'customer'}
+
+    orders = []
+    start = date.today() - timedelta(days=365)
+    for order_id in range(1, size + 1):
+        items = [
+            {'name': name, 'price': price, 'description': description, 'quantity': rng.randint(1, 3), 'icon': '🍽️'}
+            for name, description, price in rng.sample(DISHES, rng.randint(1, 3))
+        ]
+        orders.append({
+            'id': order_id,
+            # A heavy user, so the customer's order list grows with the dataset
+            'customer': 'customer1' if rng.random() < 0.1 else rng.choice(customers),
+            'items': items,
+            'total': sum(item['price'] * item['quantity'] for item in items),
+            'date': (start + timedelta(days=rng.randrange(366))).strftime('%Y-%m-%d'),
+            'status': rng.choice(('pending', 'confirmed', 'delivered')),
+        })
+
+    store.restore({'users': users, 'carts': {}, 'orders': orders})
+
+    def app(username):
+        def build():
+            at = AppTest.from_file(os.path.join(FRONTEND_DIR, 'simple_main.py'))
+            at.session_state['authenticated'] = True
+            at.session_state['current_user'] = username
+            return at
+        return build
+
+    return [
+        ('simple_main.main[admin]', app('admin'), None),
+        ('simple_main.main[customer]', app('customer1'), None),
+        ('simple_main.main[tiffin_maker]', app('chef1'), None),
+    ]
+
+def top_up(db, schema, size, seed):
+    """Generate orders until the database holds at least size of them"""
+    existing = db.execute_query("SELECT COUNT(*) AS orders FROM orders", use_cache=False)
+    if not existing:
+        raise RuntimeError("Could not count orders")
+    missing = size - existing[0]['orders']
+    if missing > 0:
+        print(f"Seeding {missing} orders...")
+        end_date = date.today()
+        counts = DataGenerator(db, schema, seed=seed + size).generate(
+            max(missing // 20, 1), max(missing // 5000, 2), missing, end_date - timedelta(days=365), end_date
+        )
+        if counts is None:
+            raise RuntimeError("Seeding failed")
+        return end_date - timedelta(days=365), end_date
+    return None
+
+def busiest(db, column):
+    row = db.execute_query(
+        f"SELECT {column} AS id FROM orders WHERE {column} IS NOT NULL "
+        f"GROUP BY {column} ORDER BY COUNT(*) DESC LIMIT 1", use_cache=False
+    )
+    return row[0]['id'] if row else None
+
+def main_mysql_pages(size, seed):
+    from database_config import db_manager
+    if not db_manager.ensure_ready():
+        raise RuntimeError("Could not connect to the main_mysql.py database")
+    top_up(db_manager, 'database_config', size, seed)
+    customer = db_manager.execute_query("SELECT * FROM users WHERE id = %s", (busiest(db_manager, 'customer_id'),))[0]
+    admin = dict(customer, full_name='Benchmark Admin', user_type='admin')
+
+    def app(user):
+        def build():
+            at = AppTest.from_file(os.path.join(FRONTEND_DIR, 'main_mysql.py'))
+            at.session_state['authenticated'] = True
+            at.session_state['current_user'] = user
+            return at
+        return build
+
+    return [
+        ('main_mysql.main[admin]', app(admin), db_manager.stats),
+        ('main_mysql.main[customer]', app(customer), db_manager.stats),
+    ]
+
+def dashboard_pages(size, seed):
+    from database import db, order_rollups
+    if not db.ensure_ready():
+        raise RuntimeError("Could not connect to the dashboard database")
+    seeded = top_up(db, 'database', size, seed)
+    if seeded is not None:
+        order_rollups.backfill(*seeded)
+    customer_id = busiest(db, 'customer_id')
+    maker_user_id = db.execute_query(
+        "SELECT user_id FROM tiffin_makers WHERE id = %s", (busiest(db, 'tiffin_maker_id'),)
+    )[0]['user_id']
+
+    def app(module, cls, user_id, user_type):
+        def build():
+            at = AppTest.from_string(DASHBOARD_SCRIPT.format(
+                backend=BACKEND_DIR, frontend=FRONTEND_DIR, module=module, cls=cls
+            ))
+            at.session_state['authenticated'] = True
+            at.session_state['user_id'] = user_id
+            at.session_state['username'] = f"benchmark_{user_type}"
+            at.session_state['full_name'] = f"Benchmark {user_type.replace('_', ' ').title()}"
+            at.session_state['user_type'] = user_type
+            return at
+        return build
+
+    return [
+        ('AdminDashboard.show_dashboard', app('admin_dashboard', 'AdminDashboard', customer_id, 'admin'), db.stats),
+        ('UserDashboard.show_dashboard', app('user_dashboard', 'UserDashboard', customer_id, 'customer'), db.stats),
+        ('TiffinMakerDashboard.show_dashboard',
+         app('tiffin_maker_dashboard', 'TiffinMakerDashboard', maker_user_id, 'tiffin_maker'), db.stats),
+    ]
+
+APPS = {'simple': simple_main_pages, 'mysql': main_mysql_pages, 'dashboards': dashboard_pages}
+
+def compare(results, baseline):
+    """Print the median and query count change against an earlier results file"""
+    before = {(row['page'], row['orders']): row for row in baseline['results']}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for row in results:
+        old = before.get((row['page'], row['orders']))
+        if old is None or old['median_ms'] is None or row['median_ms'] is None:
+            continue
+        change = (row['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+        print(f"  {row['page']:<40}{row['orders']:>8} orders  {old['median_ms']:>9.1f} -> {row['median_ms']:>9.1f} ms "
+              f"({change:+.0f}%)  queries {old['queries_per_run'] or 0:.0f} -> {row['queries_per_run'] or 0:.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless rerun benchmark of the Streamlit pages")
+    parser.add_argument('--apps', default='simple,dashboards',
+                        help="comma-separated: simple, mysql, dashboards (mysql and dashboards need separate databases)")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="order counts to seed and render")
+    parser.add_argument('--runs', type=int, default=10, help="timed reruns per page and size")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a run counts as failed")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="results file (default render_benchmark_<commit>.json)")
+    parser.add_argument('--compare', default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    apps = [app.strip() for app in args.apps.split(',')]
+    unknown = [app for app in apps if app not in APPS]
+    if unknown:
+        parser.error(f"Unknown apps: {', '.join(unknown)}")
+
+    quiet_bare_mode_warnings()
+    commit = git_commit()
+    benchmark = RenderBenchmark(runs=args.runs, timeout=args.timeout)
+    results = []
+    for size in sorted(int(value) for value in args.sizes.split(',')):
+        for app in apps:
+            for page, build, stats in APPS[app](size, args.seed):
+                result = benchmark.measure(page, size, build, stats)
+                results.append(result)
+                if result['median_ms'] is None:
+                    print(f"{page:<40}{size:>8} orders  did not finish")
+                else:
+                    print(f"{page:<40}{size:>8} orders  median {result['median_ms']:>9.1f} ms  "
+                          f"p95 {result['p95_ms']:>9.1f} ms  {result['queries_per_run'] or 0:>5.0f} queries  "
+                          f"{result['peak_memory_mb'] or 0:>7.1f} MB" + ("  ERRORS" if result['errors'] else ""))
+                for error in result['errors']:
+                    print(f"  ❌ {error}")
+
+    output = args.output or f"render_benchmark_{commit or 'local'}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    sys.exit(1 if any(result['errors'] for result in results) else 0)
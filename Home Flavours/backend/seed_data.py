@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from config import WEEKLY_MENU
+
+# Column and status differences between the two database managers
+SCHEMAS = {
+    'database': {
+        'password_column': 'password',
+        'item_price_column': 'price_per_unit',
+        'tiffin_makers': True,
+        'statuses': ('pending', 'confirmed', 'preparing', 'out_for_delivery'),
+    },
+    'database_config': {
+        'password_column': 'password_hash',
+        'item_price_column': 'price',
+        'tiffin_makers': False,
+        'statuses': ('pending', 'confirmed', 'preparing', 'ready'),
+    },
+}
+
+DISHES = [
+    ('Dal Tadka with Rice', 'Yellow lentils tempered with cumin and garlic', 90),
+    ('Rajma Chawal', 'Kidney bean curry with steamed rice', 100),
+    ('Paneer Butter Masala', 'Cottage cheese in a creamy tomato gravy', 140),
+    ('Chole Bhature', 'Spiced chickpeas with fried bread', 110),
+    ('Aloo Paratha', 'Potato stuffed flatbread with curd', 80),
+    ('Veg Biryani', 'Fragrant rice with mixed vegetables', 130),
+    ('Chicken Biryani', 'Hyderabadi style chicken biryani', 180),
+    ('Butter Chicken', 'Creamy tomato-based chicken curry', 160),
+    ('Palak Paneer', 'Spinach with cottage cheese', 110),
+    ('Masala Dosa', 'Crisp dosa with potato filling and chutney', 95),
+    ('Idli Sambar', 'Steamed rice cakes with lentil stew', 70),
+    ('Poha', 'Flattened rice with peanuts and curry leaves', 60),
+    ('Kadhi Pakora', 'Gram flour fritters in yoghurt curry', 90),
+    ('Fish Curry with Rice', 'Coastal style fish curry', 170),
+    ('Egg Curry', 'Boiled eggs in onion tomato masala', 100),
+    ('Mini Thali', 'Dal, sabzi, three rotis and rice', 120),
+    ('Special Thali', 'Two sabzis, dal, rice, rotis and dessert', 160),
+    ('Jeera Rice with Dal', 'Cumin rice with lentil soup', 85),
+]
+DAYS = list(WEEKLY_MENU)
+CITIES = ['Mumbai', 'Pune', 'Bengaluru', 'Delhi', 'Hyderabad', 'Chennai', 'Kolkata', 'Ahmedabad']
+CUISINES = ['North Indian', 'South Indian', 'Gujarati', 'Bengali', 'Maharashtrian', 'Punjabi']
+
+# Items per order and quantity per item, weighted towards small orders
+ITEM_COUNTS, ITEM_COUNT_WEIGHTS = (1, 2, 3, 4), (50, 30, 15, 5)
+QUANTITIES, QUANTITY_WEIGHTS = (1, 2, 3), (70, 22, 8)
+
+def zipf_weights(count, skew):
+    """Cumulative weights where rank r is 1/r**skew as likely as rank 1"""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DataGenerator:
+    """Writes synthetic customers, tiffin makers, menus and orders for scale tests.
+
+    The same seed always produces the same data. Rows are written with
+    explicit ids in multi-row INSERTs of batch_size rows, so order items can
+    refer to their orders without reading ids back. Item and tiffin maker
+    popularity follow a Zipf distribution: a few dishes and kitchens take
+    most of the orders, as in the real app.
+    """
+
+    def __init__(self, db, schema='database', seed=42, batch_size=2000, skew=1.1):
+        if schema not in SCHEMAS:
+            raise ValueError(f"Unknown schema '{schema}'; use one of {', '.join(SCHEMAS)}")
+        self.db = db
+        self.schema = SCHEMAS[schema]
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.skew = skew
+        self.password = hashlib.sha256(b'password123').hexdigest()
+
+    def generate(self, customers, tiffin_makers, orders, start_date, end_date, menu_size=12):
+        """Generate everything and return {table: rows written}, or None on failure.
+
+        menu_size is the number of dishes per tiffin maker, or of the whole
+        menu for a schema without tiffin makers.
+        """
+        counts = {}
+        customer_ids = self._insert_users(customers, 'customer', counts)
+        if customer_ids is None:
+            return None
+
+        maker_ids = [None]
+        if self.schema['tiffin_makers']:
+            maker_ids = self._insert_tiffin_makers(tiffin_makers, counts)
+            if maker_ids is None:
+                return None
+
+        menus = self._insert_menus(maker_ids, menu_size, counts)
+        if menus is None:
+            return None
+
+        if not self._insert_orders(orders, customer_ids, menus, start_date, end_date, counts):
+            return None
+        return counts
+
+    def _next_id(self, table):
+        rows = self.db.execute_query(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM {table}", use_cache=False)
+        return rows[0]['max_id'] + 1 if rows else None
+
+    def _insert(self, table, columns, rows, counts):
+        """Bulk insert rows batch by batch; False as soon as a batch fails"""
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        for chunk in chunked(rows, self.batch_size):
+            if self.db.execute_many(query, chunk) is None:
+                return False
+            counts[table] = counts.get(table, 0) + len(chunk)
+        return True
+
+    def _insert_users(self, count, user_type, counts):
+        first_id = self._next_id('users')
+        if first_id is None:
+            return None
+        ids = range(first_id, first_id + count)
+        rows = (
+            (user_id, f"seed_{user_type}_{user_id}", f"seed_{user_type}_{user_id}@example.com",
+             self.password, f"Seed {user_type.replace('_', ' ').title()} {user_id}",
+             f"9{user_id % 1000000000:09d}", f"{user_id} Seed Street, {CITIES[user_id % len(CITIES)]}",
+             user_type)
+            for user_id in ids
+        )
+        columns = ('id', 'username', 'email', self.schema['password_column'], 'full_name',
+                   'phone', 'address', 'user_type')
+        return list(ids) if self._insert('users', columns, rows, counts) else None
+
+    def _insert_tiffin_makers(self, count, counts):
+        user_ids = self._insert_users(count, 'tiffin_maker', counts)
+        first_id = self._next_id('tiffin_makers') if user_ids is not None else None
+        if first_id is None:
+            return None
+        rows = [
+            (first_id + index, user_id, f"Seed Kitchen {user_id}", CITIES[user_id % len(CITIES)],
+             self.random.choice(CUISINES), round(self.random.uniform(3.0, 5.0), 2))
+            for index, user_id in enumerate(user_ids)
+        ]
+        columns = ('id', 'user_id', 'business_name', 'location', 'cuisine_specialty', 'rating')
+        if not self._insert('tiffin_makers', columns, rows, counts):
+            return None
+        return [row[0] for row in rows]
+
+    def _insert_menus(self, maker_ids, menu_size, counts):
+        """Insert each maker's dishes; returns [(maker_id, item ids, prices, cumulative weights)]"""
+        next_id = self._next_id('menu_items')
+        if next_id is None:
+            return None
+        menus, rows = [], []
+        for maker_id in maker_ids:
+            item_ids, prices = [], []
+            for _ in range(menu_size):
+                name, description, price = self.random.choice(DISHES)
+                price += self.random.choice((-10, 0, 0, 10, 20))
+                item_ids.append(next_id)
+                prices.append(price)
+                if self.schema['tiffin_makers']:
+                    rows.append((next_id, name, description, price, self.random.choice(DAYS), maker_id))
+                else:
+                    rows.append((next_id, name, description, price, self.random.choice(DAYS)))
+                next_id += 1
+            # Shuffle which dish is the favourite so every menu has its own
+            popularity = list(range(menu_size))
+            self.random.shuffle(popularity)
+            menus.append((maker_id, [item_ids[i] for i in popularity], [prices[i] for i in popularity],
+                           zipf_weights(menu_size, self.skew)))
+
+        columns = ('id', 'name', 'description', 'price', 'day_of_week')
+        if self.schema['tiffin_makers']:
+            columns += ('tiffin_maker_id',)
+        return menus if self._insert('menu_items', columns, rows, counts) else None
+
+    def _insert_orders(self, count, customer_ids, menus, start_date, end_date, counts):
+        first_id = self._next_id('orders')
+        if first_id is None:
+            return False
+        rng = self.random
+        start = datetime.combine(start_date, datetime.min.time())
+        span = (end_date - start_date).days * 86400 + 86399
+        recent = datetime.combine(end_date, datetime.min.time()) - timedelta(days=2)
+        maker_weights = zipf_weights(len(menus), self.skew)
+        customer_weights = zipf_weights(len(customer_ids), 0.5)
+        active_statuses = self.schema['statuses']
+        with_makers = self.schema['tiffin_makers']
+
+        if with_makers:
+            order_columns = ('id', 'customer_id', 'tiffin_maker_id', 'order_date', 'delivery_date',
+                             'total_amount', 'payment_method', 'status', 'delivery_address', 'created_at')
+        else:
+            order_columns = ('id', 'customer_id', 'total_amount', 'status', 'payment_method',
+                             'delivery_address', 'order_date', 'created_at')
+        item_columns = ('order_id', 'menu_item_id', 'quantity', self.schema['item_price_column'])
+        order_query = (f"INSERT INTO orders ({', '.join(order_columns)}) "
+                       f"VALUES ({', '.join(['%s'] * len(order_columns))})")
+        item_query = (f"INSERT INTO order_items ({', '.join(item_columns)}) "
+                      f"VALUES ({', '.join(['%s'] * len(item_columns))})")
+
+        for batch_start in range(0, count, self.batch_size):
+            orders, items = [], []
+            batch_size = min(self.batch_size, count - batch_start)
+            makers = rng.choices(menus, cum_weights=maker_weights, k=batch_size)
+            customers = rng.choices(customer_ids, cum_weights=customer_weights, k=batch_size)
+            for offset, ((maker_id, item_ids, prices, item_weights), customer_id) in enumerate(zip(makers, customers)):
+                order_id = first_id + batch_start + offset
+                created_at = start + timedelta(seconds=rng.randrange(span))
+                if created_at < recent:
+                    status = 'cancelled' if rng.random() < 0.08 else 'delivered'
+                else:
+                    status = rng.choice(active_statuses)
+
+                total = 0
+                picked = set()
+                for _ in range(rng.choices(ITEM_COUNTS, ITEM_COUNT_WEIGHTS)[0]):
+                    index = rng.choices(range(len(item_ids)), cum_weights=item_weights)[0]
+                    if index in picked:
+                        continue
+                    picked.add(index)
+                    quantity = rng.choices(QUANTITIES, QUANTITY_WEIGHTS)[0]
+                    items.append((order_id, item_ids[index], quantity, prices[index]))
+                    total += quantity * prices[index]
+
+                payment_method = 'GPay' if rng.random() < 0.4 else 'COD'
+                address = f"{customer_id} Seed Street, {CITIES[customer_id % len(CITIES)]}"
+                if with_makers:
+                    orders.append((order_id, customer_id, maker_id, created_at.date(),
+                                   created_at.date() + timedelta(days=rng.choice((0, 1))), total,
+                                   payment_method, status, address, created_at))
+                else:
+                    orders.append((order_id, customer_id, total, status, payment_method, address,
+                                   created_at.date(), created_at))
+
+            # An order and its items land together or not at all
+            try:
+                with self.db.transaction():
+                    self.db.execute_many(order_query, orders)
+                    self.db.execute_many(item_query, items)
+            except Exception as e:
+                self.db.report_error(f"Error inserting orders: {e}")
+                return False
+            counts['orders'] = counts.get('orders', 0) + len(orders)
+            counts['order_items'] = counts.get('order_items', 0) + len(items)
+        return True
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Home Flavours data for scale testing")
+    parser.add_argument('--schema', choices=sorted(SCHEMAS), default='database',
+                        help="database.py (dashboards) or database_config.py (main_mysql.py)")
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--tiffin-makers', type=int, default=20)
+    parser.add_argument('--menu-size', type=int, default=12, help="dishes per tiffin maker")
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--start', type=parse_date, default=date.today() - timedelta(days=365))
+    parser.add_argument('--end', type=parse_date, default=date.today())
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.schema == 'database':
+        from database import db, order_rollups
+    else:
+        from database_config import db_manager as db
+        order_rollups = None
+    if not db.ensure_ready():
+        sys.exit(1)
+
+    started = time.perf_counter()
+    generator = DataGenerator(db, args.schema, seed=args.seed, batch_size=args.batch_size)
+    counts = generator.generate(args.customers, args.tiffin_makers, args.orders,
+                                args.start, args.end, menu_size=args.menu_size)
+    if counts is None:
+        print("❌ Data generation failed")
+        sys.exit(1)
+    # Orders were inserted directly, so rebuild the rollups the charts read
+    if order_rollups is not None and order_rollups.backfill(args.start, args.end) is None:
+        print("❌ Rollup backfill failed; run: python order_rollups.py backfill")
+        sys.exit(1)
+
+    for table, rows in counts.items():
+        print(f"✅ {table}: {rows} rows")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
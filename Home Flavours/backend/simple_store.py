@@ -0,0 +1,329 @@
+import json
+import os
+import threading
+from datetime import datetime
+from config import SIMPLE_STORE_CONFIG
+
+class Record:
+    """Fixed-field record; __slots__ drops the per-instance __dict__"""
+    __slots__ = ()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+class User(Record):
+    __slots__ = ('email', 'password', 'full_name', 'phone', 'address', 'user_type')
+
+    def __init__(self, email, password, full_name, phone, address, user_type='customer'):
+        self.email = email
+        self.password = password
+        self.full_name = full_name
+        self.phone = phone
+        self.address = address
+        self.user_type = user_type
+
+
+class CartItem(Record):
+    __slots__ = ('name', 'price', 'description', 'icon', 'quantity')
+
+    def __init__(self, name, price, description, icon, quantity):
+        self.name = name
+        self.price = price
+        self.description = description
+        self.icon = icon
+        self.quantity = quantity
+
+
+class Order(Record):
+    __slots__ = ('id', 'customer', 'items', 'total', 'date', 'status')
+
+    def __init__(self, id, customer, items, total, date, status='pending'):
+        self.id = id
+        self.customer = customer
+        self.items = items
+        self.total = total
+        self.date = date
+        self.status = status
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['items'] = [item.to_dict() for item in self.items]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['customer'], [CartItem(**item) for item in data['items']],
+                   data['total'], data['date'], data['status'])
+
+
+class IdAllocator:
+    """Increasing ids that are never handed out twice, even after deletions"""
+    __slots__ = ('next_id',)
+
+    def __init__(self, next_id=1):
+        self.next_id = next_id
+
+    def allocate(self):
+        allocated = self.next_id
+        self.next_id += 1
+        return allocated
+
+    def observe(self, used_id):
+        """Skip past an id assigned elsewhere, e.g. one replayed from the journal"""
+        if used_id >= self.next_id:
+            self.next_id = used_id + 1
+
+
+class SimpleStore:
+    """Process-wide users, carts and orders for simple_main.py, kept in memory.
+
+    Every change is applied under one lock and appended to a JSON-lines
+    journal, so all sessions of the app process see the same data and it
+    survives restarts without a database. Once compact_every changes have
+    been appended, the journal is rewritten as a single snapshot line, which
+    keeps replay at startup short. One app process should own a journal.
+
+    Records are compact __slots__ objects. Orders are also indexed by id and
+    by customer and carts are keyed by dish name, so a customer's pages cost
+    O(their own orders) however many orders the store holds. Returned
+    records are shared; treat them as read-only.
+    """
+
+    def __init__(self, path=None, compact_every=1000, fsync=False):
+        self.path = path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._load({})
+        self._journal = None
+        self._appended = 0  # changes since the last snapshot
+        self._lock = threading.RLock()
+        if path:
+            self._replay()
+
+    def get_user(self, username):
+        return self._users.get(username)
+
+    def users(self):
+        """(username, user) pairs in registration order"""
+        with self._lock:
+            return list(self._users.items())
+
+    def user_count(self):
+        return len(self._users)
+
+    def add_user(self, username, user):
+        """Register a user from a dict of User fields; returns False if the username is taken"""
+        with self._lock:
+            if username in self._users:
+                return False
+            self._commit({'op': 'user', 'username': username, 'user': user})
+            return True
+
+    def cart(self, username):
+        with self._lock:
+            return list(self._carts.get(username, {}).values())
+
+    def add_to_cart(self, username, item, quantity):
+        """Add quantity of a menu item, merging with the same dish already in the cart"""
+        with self._lock:
+            self._commit({'op': 'cart_add', 'username': username, 'quantity': quantity, 'item': {
+                'name': item['name'],
+                'price': item['price'],
+                'description': item['description'],
+                'icon': item.get('icon', '🍽️'),
+            }})
+
+    def remove_from_cart(self, username, name):
+        with self._lock:
+            self._commit({'op': 'cart_remove', 'username': username, 'name': name})
+
+    def place_order(self, username):
+        """Turn the user's cart into a pending order; returns the order, or None if the cart is empty"""
+        with self._lock:
+            items = self._carts.get(username)
+            if not items:
+                return None
+            self._commit({'op': 'order', 'order': {
+                'id': self._order_ids.allocate(),
+                'customer': username,
+                'items': [item.to_dict() for item in items.values()],
+                'total': sum(item.price * item.quantity for item in items.values()),
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'status': 'pending',
+            }})
+            return self._orders[-1]
+
+    def orders(self, customer=None):
+        """All orders, or one customer's, oldest first"""
+        with self._lock:
+            if customer is None:
+                return list(self._orders)
+            return list(self._orders_by_customer.get(customer, ()))
+
+    def order_count(self):
+        return len(self._orders)
+
+    def revenue(self):
+        return self._revenue
+
+    def set_status(self, order_id, status):
+        """Change an order's status; returns False if there is no such order"""
+        with self._lock:
+            if order_id not in self._orders_by_id:
+                return False
+            self._commit({'op': 'status', 'id': order_id, 'status': status})
+            return True
+
+    def restore(self, state):
+        """Replace everything with state ({'users', 'carts', 'orders'} as dicts), e.g. a benchmark fixture"""
+        with self._lock:
+            self._load(state)
+            if self.path:
+                self.compact()
+
+    def compact(self):
+        """Rewrite the journal as one snapshot of the current state"""
+        with self._lock:
+            if not self.path:
+                return
+            temporary = f"{self.path}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'op': 'snapshot', 'state': self._state()}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            if self._journal is not None:
+                self._journal.close()
+            os.replace(temporary, self.path)
+            self._journal = open(self.path, 'a', encoding='utf-8')
+            self._appended = 0
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _commit(self, event):
+        """Append a change to the journal, then apply it; caller holds the lock.
+
+        A change the journal could not record is never applied, so memory
+        never holds anything a restart would lose.
+        """
+        if self._journal is None:
+            self._apply(event)
+            return
+        try:
+            self._journal.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+        except OSError:
+            # Rewrite the journal from memory to drop a partly written line
+            try:
+                self.compact()
+            except OSError:
+                pass
+            raise
+        self._apply(event)
+        self._appended += 1
+        if self.compact_every and self._appended >= self.compact_every:
+            self.compact()
+
+    def _apply(self, event):
+        op = event['op']
+        if op == 'user':
+            self._users[event['username']] = User.from_dict(event['user'])
+        elif op == 'cart_add':
+            cart = self._carts.setdefault(event['username'], {})
+            item = cart.get(event['item']['name'])
+            if item is not None:
+                item.quantity += event['quantity']
+            else:
+                cart[event['item']['name']] = CartItem(quantity=event['quantity'], **event['item'])
+        elif op == 'cart_remove':
+            self._carts.get(event['username'], {}).pop(event['name'], None)
+        elif op == 'order':
+            self._add_order(Order.from_dict(event['order']))
+            self._carts.pop(event['order']['customer'], None)
+        elif op == 'status':
+            order = self._orders_by_id.get(event['id'])
+            if order is not None:
+                order.status = event['status']
+        elif op == 'snapshot':
+            self._load(event['state'])
+        else:
+            raise ValueError(f"Unknown journal entry '{op}'")
+
+    def _add_order(self, order):
+        self._orders.append(order)
+        self._orders_by_id[order.id] = order
+        self._orders_by_customer.setdefault(order.customer, []).append(order)
+        self._order_ids.observe(order.id)
+        self._revenue += order.total
+
+    def _state(self):
+        return {
+            'users': {username: user.to_dict() for username, user in self._users.items()},
+            'carts': {username: [item.to_dict() for item in cart.values()]
+                      for username, cart in self._carts.items() if cart},
+            'orders': [order.to_dict() for order in self._orders],
+            'next_order_id': self._order_ids.next_id,
+        }
+
+    def _load(self, state):
+        self._users = {username: User.from_dict(user) for username, user in state.get('users', {}).items()}
+        self._carts = {
+            username: {item['name']: CartItem.from_dict(item) for item in items}
+            for username, items in state.get('carts', {}).items()
+        }
+        self._orders = []
+        self._orders_by_id = {}
+        self._orders_by_customer = {}
+        self._order_ids = IdAllocator(state.get('next_order_id', 1))
+        self._revenue = 0
+        for order in state.get('orders', ()):
+            self._add_order(Order.from_dict(order))
+
+    def _replay(self):
+        """Rebuild the state from the journal, then reopen it for appending.
+
+        Only the final line may be unreadable, since a crash can leave it
+        half-written; a bad line anywhere else raises ValueError.
+        """
+        entries = 0
+        damaged = None  # line number of an unreadable entry
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for number, line in enumerate(f, 1):
+                    if damaged is not None:
+                        raise ValueError(f"Unreadable journal entry on line {damaged} of {self.path}")
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        damaged = number
+                        continue
+                    self._apply(event)
+                    entries += 1
+            if damaged is not None:
+                print(f"Dropping half-written last entry (line {damaged}) of {self.path}")
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._journal = open(self.path, 'a', encoding='utf-8')
+        self._appended = max(entries - 1, 0)
+        # Rewriting also drops a damaged line before anything is appended to it
+        if damaged is not None or (self.compact_every and self._appended >= self.compact_every):
+            self.compact()
+
+
+store = SimpleStore(**SIMPLE_STORE_CONFIG)
@@ -0,0 +1,445 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from mysql.connector import errorcode, errors
+from connection_pool import PoolTimeoutError
+from db_backends import DatabaseBackend
+
+# Dates and timestamps are stored as ISO text, which sorts and compares like
+# the MySQL values; DECIMAL columns come back as Decimal as they do there.
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', 'seconds'))
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATE', lambda value: datetime.fromisoformat(value.decode()).date())
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()))
+
+PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+UPSERT_VALUE = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+SEPARATOR = re.compile(r"\s+SEPARATOR\s+('(?:[^']|'')*')", re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def translate(query, has_params=True):
+    """Rewrite the MySQL dialect the services use into SQLite.
+
+    Covers %s / %(name)s parameters, ON DUPLICATE KEY UPDATE with VALUES(),
+    SELECT ... FOR UPDATE (transactions already hold the write lock) and
+    GROUP_CONCAT(... SEPARATOR ...). CONCAT, GET_LOCK and RELEASE_LOCK are
+    registered as functions on each connection instead.
+    """
+    match = UPSERT.search(query)
+    if match:
+        query = (query[:match.start()] + "ON CONFLICT DO UPDATE SET"
+                 + UPSERT_VALUE.sub(r"excluded.\1", query[match.end():]))
+    query = FOR_UPDATE.sub('', query)
+    query = SEPARATOR.sub(r", \1", query)
+    if has_params:
+        # Like mysql.connector, only a parameterised query has %% escapes
+        query = PLACEHOLDER.sub(
+            lambda match: f":{match.group(1)}" if match.group(1) else '?' if match.group(0) == '%s' else '%',
+            query
+        )
+    return query
+
+def database_error(e):
+    """The mysql.connector error the services already handle for a sqlite3 error"""
+    message = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        errno = errorcode.ER_DUP_ENTRY if 'UNIQUE' in message else errorcode.ER_NO_REFERENCED_ROW_2
+        return errors.IntegrityError(msg=message, errno=errno)
+    if isinstance(e, sqlite3.OperationalError):
+        if message.startswith('no such table'):
+            return errors.ProgrammingError(msg=message, errno=errorcode.ER_NO_SUCH_TABLE)
+        if 'locked' in message or 'busy' in message:
+            return errors.DatabaseError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return errors.OperationalError(msg=message)
+    if isinstance(e, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+@contextmanager
+def translated_errors():
+    try:
+        yield
+    except sqlite3.Error as e:
+        raise database_error(e) from e
+
+def concat(*values):
+    # MySQL's CONCAT is NULL if any argument is
+    if any(value is None for value in values):
+        return None
+    return ''.join(str(value) for value in values)
+
+
+class NamedLocks:
+    """GET_LOCK/RELEASE_LOCK for SQLite, shared by this process's connections.
+
+    The locks guard the menu seed and migrations against other threads of
+    the same process; separate processes rely on those steps being
+    idempotent instead.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get_lock(self, name, timeout):
+        with self._guard:
+            lock = self._locks.setdefault(name, threading.RLock())
+        return 1 if lock.acquire(timeout=timeout if timeout is not None and timeout >= 0 else -1) else 0
+
+    def release_lock(self, name):
+        with self._guard:
+            lock = self._locks.get(name)
+        if lock is None:
+            return None
+        try:
+            lock.release()
+            return 1
+        except RuntimeError:
+            # Held by another thread, or not at all
+            return 0
+
+
+class SQLiteCursor:
+    """sqlite3 cursor with the mysql.connector cursor API the managers use"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(field[0] for field in self._cursor.description or ())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query, params=()):
+        with translated_errors():
+            self._cursor.execute(translate(query, bool(params)), params or ())
+
+    def executemany(self, query, params_seq):
+        with translated_errors():
+            self._cursor.executemany(translate(query), params_seq)
+
+    def fetchone(self):
+        with translated_errors():
+            row = self._cursor.fetchone()
+        return self._row(row) if row is not None else None
+
+    def fetchmany(self, size=1):
+        with translated_errors():
+            return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        with translated_errors():
+            return self._rows(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+    def _row(self, row):
+        return dict(zip(self.column_names, row)) if self._dictionary else row
+
+    def _rows(self, rows):
+        if not self._dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+
+class SQLiteConnection:
+    """sqlite3 connection with the mysql.connector connection API the managers use"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._closed = False
+
+    def cursor(self, dictionary=False, buffered=None):
+        # sqlite3 cursors step through rows lazily, so every cursor streams
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def start_transaction(self):
+        # Take the write lock up front, as SELECT ... FOR UPDATE would
+        with translated_errors():
+            self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        with translated_errors():
+            self._connection.commit()
+
+    def rollback(self):
+        with translated_errors():
+            self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        with translated_errors():
+            self._connection.execute("SELECT 1")
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._closed = True
+        self._connection.close()
+
+
+class ThreadConnectionPool:
+    """One SQLite connection per thread, behind the ConnectionPool interface.
+
+    A thread keeps its connection between checkouts, and nested checkouts
+    on one thread share it, so a stream opened inside a unit of work sees
+    the same transaction. At most pool_size threads hold their connection
+    at once; further threads wait up to checkout_timeout. Connections of
+    finished threads, or idle longer than idle_timeout, are closed.
+    """
+
+    def __init__(self, connect, pool_size=5, idle_timeout=300, checkout_timeout=30):
+        self._connect = connect
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        # thread -> [connection, checkout depth, last released]
+        self._connections = {}
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._created = 0
+        self._evicted = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def acquire(self):
+        """Check out this thread's connection, waiting up to checkout_timeout for a slot"""
+        thread = threading.current_thread()
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        waited = False
+
+        with self._condition:
+            if self._closed:
+                raise PoolTimeoutError("Connection pool is closed")
+            entry = self._connections.get(thread)
+            if entry is not None and entry[1]:
+                entry[1] += 1
+                self._checkouts += 1
+                return entry[0]
+
+            while self._in_use >= self.pool_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No connection available after {self.checkout_timeout}s "
+                        f"(pool size {self.pool_size})"
+                    )
+                waited = True
+                self._condition.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            wait_time = time.monotonic() - start
+            if waited:
+                self._waits += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+            if entry is not None:
+                entry[1] = 1
+            stale = self._pop_stale()
+
+        self._close_all(stale)
+        if entry is not None:
+            return entry[0]
+
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._connections[thread] = [connection, 1, None]
+            self._created += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        """Hand a checkout back; the connection is closed if discard is set"""
+        with self._condition:
+            thread = threading.current_thread()
+            entry = self._connections.get(thread)
+            if entry is None or entry[0] is not connection:
+                # Released from another thread, e.g. a stream finalised elsewhere
+                thread, entry = next(
+                    ((owner, found) for owner, found in self._connections.items() if found[0] is connection),
+                    (None, None)
+                )
+            if entry is None:
+                return
+
+            entry[1] -= 1
+            to_close = []
+            if not entry[1]:
+                # An outer checkout on the same thread keeps using it otherwise
+                self._in_use -= 1
+                entry[2] = time.monotonic()
+                if discard or self._closed:
+                    del self._connections[thread]
+                    to_close = [connection]
+                else:
+                    to_close = self._pop_stale()
+                self._condition.notify()
+
+        self._close_all(to_close)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def evict_idle(self):
+        """Close connections of finished threads and ones idle longer than idle_timeout"""
+        with self._condition:
+            stale = self._pop_stale()
+        self._close_all(stale)
+        return len(stale)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = [thread for thread, entry in self._connections.items() if not entry[1]]
+            connections = [self._connections.pop(thread)[0] for thread in idle]
+            self._condition.notify_all()
+        self._close_all(connections)
+
+    def stats(self):
+        """Snapshot of pool utilisation and checkout wait metrics"""
+        with self._condition:
+            connections = len(self._connections)
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self._in_use,
+                'idle': connections - self._in_use,
+                'pid': os.getpid(),
+                'connections': connections,
+                'created': self._created,
+                'evicted': self._evicted,
+                'reconnects': 0,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_time_total': self._wait_time_total,
+                'wait_time_max': self._wait_time_max,
+                'wait_time_avg': self._wait_time_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def _pop_stale(self):
+        """Remove idle connections of dead threads or past idle_timeout; caller holds the lock"""
+        cutoff = time.monotonic() - self.idle_timeout if self.idle_timeout is not None else None
+        stale = [
+            thread for thread, (_, depth, last_used) in self._connections.items()
+            if not depth and (not thread.is_alive() or (cutoff is not None and last_used < cutoff))
+        ]
+        self._evicted += len(stale)
+        return [self._connections.pop(thread)[0] for thread in stale]
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class SQLiteBackend(DatabaseBackend):
+    """A local SQLite file in WAL mode, with one connection per thread.
+
+    WAL lets readers carry on while one writer commits, and no server or
+    network round trip sits under each statement, which suits single-host
+    deployments and hermetic benchmark runs. Managers pick their
+    SQLITE_MIGRATIONS schema when this backend is selected.
+    """
+    name = 'sqlite'
+    label = 'SQLite'
+
+    def __init__(self, path, busy_timeout=30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.locks = NamedLocks()
+
+    def connect(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with translated_errors():
+            # isolation_level=None: autocommit, transactions start explicitly
+            # as on MySQL. check_same_thread=False so the pool can close a
+            # finished thread's connection from another thread.
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                         detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            # NORMAL is durable across application crashes in WAL mode
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.create_function('CONCAT', -1, concat, deterministic=True)
+            connection.create_function('GET_LOCK', 2, self.locks.get_lock)
+            connection.create_function('RELEASE_LOCK', 1, self.locks.release_lock)
+        return SQLiteConnection(connection)
+
+    def create_pool(self, connect, ping, pool_config):
+        # SQLite connections do not go stale, so there is nothing to ping
+        return ThreadConnectionPool(
+            connect,
+            pool_size=pool_config.get('pool_size', 5),
+            idle_timeout=pool_config.get('idle_timeout', 300),
+            checkout_timeout=pool_config.get('checkout_timeout', 30)
+        )
+
+    def column_array(self, values, type_code):
+        """Type a column from its values; SQLite reports no column types"""
+        present = [value for value in values if value is not None]
+        if present and all(isinstance(value, (date, datetime)) for value in present):
+            return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy()
+        if present and all(isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+                           for value in present):
+            if len(present) == len(values) and all(isinstance(value, int) for value in present):
+                return np.array(values, dtype=np.int64)
+            return np.array(values, dtype=np.float64)
+        return np.array(values, dtype=object)
@@ -0,0 +1,97 @@
+import argparse
+import gc
+import os
+import random
+import time
+import tracemalloc
+
+# Keep the module-level store off disk; the benchmark builds its own stores
+os.environ['SIMPLE_STORE_PATH'] = ''
+from simple_store import SimpleStore
+from seed_data import DISHES
+
+SIZES = (1000, 100000)
+
+def build_orders(size, customers, seed):
+    """Orders in the plain-dict form simple_main.py used to keep in session state"""
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(1, size + 1):
+        items = [
+            {'name': name, 'price': price, 'description': description, 'icon': '🍽️', 'quantity': rng.randint(1, 3)}
+            for name, description, price in rng.sample(DISHES, rng.randint(1, 3))
+        ]
+        orders.append({
+            'id': order_id,
+            'customer': f"customer_{rng.randrange(customers)}",
+            'items': items,
+            'total': sum(item['price'] * item['quantity'] for item in items),
+            'date': '2026-01-01',
+            'status': rng.choice(('pending', 'confirmed', 'delivered')),
+        })
+    return orders
+
+def allocated(build):
+    """Bytes still allocated by what build() returns, and the result"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+def per_call(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+def measure(size, seed, lookups):
+    customers = max(size // 20, 1)
+    source = build_orders(size, customers, seed)
+    users = {
+        f"customer_{index}": {'email': f"customer_{index}@example.com", 'password': '0' * 64,
+                              'full_name': f"Customer {index}", 'phone': '9000000000',
+                              'address': 'Seed Street', 'user_type': 'customer'}
+        for index in range(customers)
+    }
+    state = {'users': users, 'orders': source}
+
+    def build_dicts():
+        # Fresh copies, so each side is charged for everything it holds
+        return ({username: dict(user) for username, user in users.items()},
+                [dict(order, items=[dict(item) for item in order['items']]) for order in source])
+
+    def build_store():
+        store = SimpleStore()
+        store.restore(state)
+        return store
+
+    dict_bytes, (_, orders) = allocated(build_dicts)
+    store_bytes, store = allocated(build_store)
+
+    rng = random.Random(seed)
+    customer = f"customer_{rng.randrange(customers)}"
+    return {
+        'orders': size,
+        'dict_mb': dict_bytes / 1024 / 1024,
+        'store_mb': store_bytes / 1024 / 1024,
+        # The old show_orders filter against the per-customer index
+        'scan_ms': per_call(lambda: [order for order in orders if order['customer'] == customer], lookups) * 1000,
+        'index_ms': per_call(lambda: store.orders(customer=customer), lookups) * 1000,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory and lookup cost of the simple_main.py order store")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="order counts to build")
+    parser.add_argument('--lookups', type=int, default=20, help="timed per-customer lookups per size")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8}  {'dicts MB':>9}  {'store MB':>9}  {'saved':>6}  {'scan ms':>9}  {'index ms':>9}")
+    for size in sorted(int(value) for value in args.sizes.split(',')):
+        row = measure(size, args.seed, args.lookups)
+        saved = (1 - row['store_mb'] / row['dict_mb']) * 100 if row['dict_mb'] else 0.0
+        print(f"{row['orders']:>8}  {row['dict_mb']:>9.1f}  {row['store_mb']:>9.1f}  {saved:>5.0f}%  "
+              f"{row['scan_ms']:>9.3f}  {row['index_ms']:>9.3f}")
@@ -0,0 +1,84 @@
+import threading
+import uuid
+import pytest
+import database_config
+from database_config import DatabaseManager, db_manager
+from cart_service import CartService
+
+@pytest.fixture
+def cart_db(tmp_path, monkeypatch):
+    """The schema-B database manager on a throwaway SQLite file"""
+    monkeypatch.setattr(database_config, 'DB_BACKEND_CONFIG', {
+        'engine': 'sqlite', 'sqlite_path': str(tmp_path / 'cart.db'), 'busy_timeout': 30
+    })
+    db = DatabaseManager()
+    assert db.ensure_ready()
+    yield db
+    db.pool.close()
+
+def concurrent_adds(db, threads, adds_per_thread):
+    """Hammer one cart item from many threads; returns the cart rows and the failed adds"""
+    cart_service = CartService(db, user_column='user_id')
+    username = f"cart_test_{uuid.uuid4().hex[:8]}"
+
+    user = db.execute_write(
+        """INSERT INTO users (username, email, password_hash, full_name, phone, address)
+           VALUES (%s, %s, %s, %s, %s, %s)""",
+        (username, f"{username}@example.com", "-", "Cart Test", "0000000000", "-")
+    )
+    item = db.execute_write(
+        "INSERT INTO menu_items (name, description, price, day_of_week) VALUES (%s, %s, %s, %s)",
+        (username, "Cart concurrency test item", 1, "Monday")
+    )
+    user_id = user.lastrowid if user else None
+    menu_item_id = item.lastrowid if item else None
+    failures = []
+
+    def worker():
+        for _ in range(adds_per_thread):
+            if not cart_service.add_item(user_id, menu_item_id, 1):
+                failures.append(1)
+
+    try:
+        assert user_id is not None and menu_item_id is not None, "could not create test user and menu item"
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        rows = db.execute_query(
+            "SELECT quantity FROM cart WHERE user_id = %s AND menu_item_id = %s",
+            (user_id, menu_item_id), use_cache=False
+        )
+        return rows, failures
+    finally:
+        db.execute_batch([
+            ("DELETE FROM cart WHERE user_id = %s", (user_id,)),
+            ("DELETE FROM menu_items WHERE id = %s", (menu_item_id,)),
+            ("DELETE FROM users WHERE id = %s", (user_id,)),
+        ])
+
+def test_concurrent_adds(cart_db, threads=20, adds_per_thread=25):
+    """Concurrent adds of one item merge into a single row without losing quantity"""
+    rows, failures = concurrent_adds(cart_db, threads, adds_per_thread)
+    assert not failures
+    assert len(rows) == 1 and rows[0]['quantity'] == threads * adds_per_thread
+
+if __name__ == "__main__":
+    threads, adds_per_thread = 20, 25
+    print("🔍 Testing concurrent cart adds...")
+    print("-" * 50)
+
+    if not db_manager.ensure_ready():
+        print("\n❌ Database connection failed!")
+    else:
+        rows, failures = concurrent_adds(db_manager, threads, adds_per_thread)
+        expected = threads * adds_per_thread
+        print(f"📊 {threads} threads x {adds_per_thread} adds, {len(failures)} failed writes")
+        print(f"📊 Cart rows: {len(rows)}, quantity: {rows[0]['quantity'] if rows else 0}")
+
+        if failures or len(rows) != 1 or rows[0]['quantity'] != expected:
+            print(f"\n❌ Cart upsert lost updates! Expected one cart row with quantity {expected}")
+        else:
+            print("\n🎉 Cart upsert is safe under concurrency!")
@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    opened = []
+
+    def connect():
+        connection = FakeConnection(len(opened))
+        opened.append(connection)
+        return connection
+
+    return ConnectionPool(connect, **options), opened
+
+def test_released_connection_is_reused():
+    pool, opened = make_pool(pool_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(opened) == 1
+    assert pool.stats()['checkouts'] == 2
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    pool, _ = make_pool(pool_size=1, checkout_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats['timeouts'] == 1
+    assert stats['in_use'] == 1
+
+def test_waiting_checkout_gets_the_released_connection():
+    pool, opened = make_pool(pool_size=1, checkout_timeout=5)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, (held,)).start()
+    assert pool.acquire() is held
+    assert len(opened) == 1
+    assert pool.stats()['waits'] == 1
+
+def test_idle_connections_past_the_timeout_are_evicted():
+    pool, _ = make_pool(pool_size=2, idle_timeout=0.01)
+    connection = pool.acquire()
+    pool.release(connection)
+    time.sleep(0.02)
+    assert pool.evict_idle() == 1
+    assert connection.closed
+    assert pool.stats()['connections'] == 0
+
+def test_failed_ping_replaces_a_stale_connection():
+    pool, _ = make_pool(pool_size=1, ping=lambda connection: False, ping_interval=0)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is not first
+    assert first.closed
+    assert pool.stats()['reconnects'] == 1
+
+def test_discarded_connection_is_closed_and_its_slot_freed():
+    pool, _ = make_pool(pool_size=1, checkout_timeout=0.05)
+    connection = pool.acquire()
+    pool.release(connection, discard=True)
+    assert connection.closed
+    assert pool.acquire() is not connection
+
+def test_failed_connect_frees_the_slot():
+    def connect():
+        raise OSError("server unavailable")
+
+    pool = ConnectionPool(connect, pool_size=1, checkout_timeout=0.05)
+    with pytest.raises(OSError):
+        pool.acquire()
+    assert pool.stats()['in_use'] == 0
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from mysql.connector import Error, FieldType
+from db_backends import column_array
+from database_base import WriteResult
+
+@pytest.fixture
+def menu_db(sqlite_db):
+    sqlite_db.execute_write("CREATE TABLE menu (id INTEGER PRIMARY KEY, name TEXT NOT NULL, price DECIMAL(10,2))")
+    return sqlite_db
+
+def names(db):
+    return [row['name'] for row in db.execute_query("SELECT name FROM menu ORDER BY id")]
+
+def test_write_results_report_rowcount_and_lastrowid(menu_db):
+    assert menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",)) == WriteResult(1, 1)
+    assert menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", [("Roti",), ("Rice",)]).rowcount == 2
+    assert menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", []) == WriteResult(0, None)
+
+    results = menu_db.execute_batch([
+        ("UPDATE menu SET price = %s", (90,)),
+        ("DELETE FROM menu WHERE name = %s", ("Rice",)),
+    ])
+    assert [result.rowcount for result in results] == [3, 1]
+    assert names(menu_db) == ["Dal", "Roti"]
+
+def test_failed_batch_is_rolled_back(menu_db):
+    assert menu_db.execute_batch([
+        ("INSERT INTO menu (name) VALUES (%s)", ("Dal",)),
+        ("INSERT INTO menu (name) VALUES (%s)", (None,)),
+    ]) is None
+    assert menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", [("Roti",), (None,)]) is None
+    assert names(menu_db) == []
+
+def test_nested_transaction_joins_the_outer_one(menu_db):
+    with menu_db.transaction() as outer:
+        with menu_db.transaction() as inner:
+            assert inner is outer
+            menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+        # execute_many opens its own transaction() block, which joins too
+        menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", [("Roti",)])
+    assert names(menu_db) == ["Dal", "Roti"]
+
+def test_exception_in_outer_block_rolls_back_inner_writes(menu_db):
+    with pytest.raises(RuntimeError):
+        with menu_db.transaction():
+            with menu_db.transaction():
+                menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+            menu_db.execute_batch([("INSERT INTO menu (name) VALUES (%s)", ("Roti",))])
+            raise RuntimeError("abort")
+    assert names(menu_db) == []
+
+def test_errors_inside_a_transaction_raise(menu_db):
+    with pytest.raises(Error):
+        with menu_db.transaction():
+            menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", (None,))
+    assert not menu_db.in_transaction()
+
+def test_committed_transaction_evicts_cached_reads(menu_db):
+    assert names(menu_db) == []
+    with menu_db.transaction():
+        menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+        # Reads inside the block bypass the cache and see the uncommitted row
+        assert names(menu_db) == ["Dal"]
+    assert names(menu_db) == ["Dal"]
+
+def test_rolled_back_transaction_evicts_cached_reads(menu_db):
+    assert names(menu_db) == []
+    with pytest.raises(RuntimeError):
+        with menu_db.transaction():
+            menu_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+            raise RuntimeError("abort")
+    assert menu_db.cache_stats()['entries'] == 0
+    assert names(menu_db) == []
+
+def test_stream_returns_its_connection_after_full_iteration(menu_db):
+    menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", [(f"Dish {index}",) for index in range(25)])
+
+    rows = list(menu_db.stream_query("SELECT id, name FROM menu ORDER BY id", batch_size=10, named=True))
+
+    assert [row.name for row in rows[:2]] == ["Dish 0", "Dish 1"] and len(rows) == 25
+    stats = menu_db.pool_stats()
+    assert stats['in_use'] == 0
+    assert stats['connections'] == 1
+
+def test_stream_abandoned_part_way_is_discarded(menu_db):
+    menu_db.execute_many("INSERT INTO menu (name) VALUES (%s)", [(f"Dish {index}",) for index in range(25)])
+    created = menu_db.pool_stats()['created']
+
+    stream = menu_db.stream_query("SELECT id FROM menu ORDER BY id", batch_size=10)
+    for row in stream:
+        assert menu_db.pool_stats()['in_use'] == 1
+        break
+    stream.close()
+
+    stats = menu_db.pool_stats()
+    assert stats['in_use'] == 0
+    assert stats['connections'] == 0
+    # The next read opens a fresh connection instead of reusing the abandoned one
+    assert len(menu_db.execute_query("SELECT id FROM menu")) == 25
+    assert menu_db.pool_stats()['created'] == created + 1
+
+@pytest.fixture
+def orders_db(sqlite_db):
+    sqlite_db.execute_write("""CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INT, total DECIMAL(10,2),
+                                                    status TEXT, order_date DATE)""")
+    sqlite_db.execute_many(
+        "INSERT INTO orders (customer_id, total, status, order_date) VALUES (%s, %s, %s, %s)",
+        [(7, 80, 'pending', '2026-01-05'), (None, 120.5, 'cancelled', '2026-01-06')]
+    )
+    return sqlite_db
+
+def test_frame_columns_are_typed(orders_db):
+    frame = orders_db.execute_frame("SELECT id, customer_id, total, status, order_date FROM orders ORDER BY id")
+
+    assert list(frame.columns) == ['id', 'customer_id', 'total', 'status', 'order_date']
+    assert frame['id'].dtype == np.int64
+    # Integers with NULLs become float64 with NaN, decimals float64
+    assert frame['customer_id'].dtype == np.float64 and np.isnan(frame['customer_id'][1])
+    assert frame['total'].dtype == np.float64 and frame['total'].tolist() == [80.0, 120.5]
+    assert frame['status'].tolist() == ['pending', 'cancelled']
+    assert frame['order_date'].dtype.kind == 'M'
+
+def test_empty_frame_keeps_its_columns(orders_db):
+    frame = orders_db.execute_frame("SELECT id, total FROM orders WHERE status = %s", ('delivered',))
+    assert list(frame.columns) == ['id', 'total']
+    assert len(frame) == 0
+
+def test_frame_dtypes_override_and_cached_copies(orders_db):
+    frame = orders_db.execute_frame("SELECT id, status FROM orders ORDER BY id", dtypes={'status': 'category'})
+    assert frame['status'].dtype == 'category'
+
+    frame = orders_db.execute_frame("SELECT id FROM orders ORDER BY id")
+    frame.loc[0, 'id'] = 99
+    assert orders_db.execute_frame("SELECT id FROM orders ORDER BY id")['id'].tolist() == [1, 2]
+
+def test_mysql_column_types():
+    assert column_array([1, None], FieldType.LONG).dtype == np.float64
+    assert column_array([1, 2], FieldType.LONGLONG).dtype == np.int64
+    assert column_array(['1.50', '2'], FieldType.NEWDECIMAL).dtype == np.float64
+    assert column_array(['a'], FieldType.VAR_STRING).dtype == object
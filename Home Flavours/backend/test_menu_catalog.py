@@ -0,0 +1,55 @@
+import threading
+from menu_catalog import MenuCatalog
+
+WEEKLY_MENU = {
+    'Monday': [{'name': 'Dal Khichdi', 'price': 80, 'description': 'Rice and lentils'},
+               {'name': 'Thali Special', 'price': 120, 'description': 'Complete meal'}],
+    'Friday': [{'name': 'Dal Khichdi', 'price': 80, 'description': 'Rice and lentils'}],
+}
+OWNER_QUERY = "SELECT id FROM tiffin_makers WHERE is_active = TRUE ORDER BY id LIMIT 1"
+
+def catalog(db, **options):
+    return MenuCatalog(db, WEEKLY_MENU, owner_column='tiffin_maker_id', owner_query=OWNER_QUERY, **options)
+
+def menu_rows(db):
+    return db.execute_query("SELECT COUNT(*) AS n FROM menu_items", use_cache=False)[0]['n']
+
+def test_menu_is_seeded_once(app_db):
+    before = menu_rows(app_db)
+    first = catalog(app_db)
+
+    # app_db already has Monday's Dal Khichdi, so only the other two are missing
+    assert first.seed() == 2
+    assert first.seed() == 0
+    # A second worker finds everything already there
+    assert catalog(app_db).seed() == 0
+    assert menu_rows(app_db) == before + 2
+
+def test_resolve_maps_day_and_name_to_the_menu_item(app_db):
+    menu = catalog(app_db)
+    assert menu.resolve('Monday', 'Dal Khichdi') == 1
+    friday = menu.resolve('Friday', 'Dal Khichdi')
+    assert friday is not None and friday != 1
+    assert menu.resolve('Monday', 'Not On The Menu') is None
+    assert menu.resolve('Sunday', 'Dal Khichdi') is None
+
+def test_seed_is_skipped_when_the_lock_is_not_granted(app_db):
+    held, done = threading.Event(), threading.Event()
+
+    def other_worker():
+        app_db.backend.locks.get_lock('home_flavours_menu_seed', 0)
+        held.set()
+        done.wait(5)
+        app_db.backend.locks.release_lock('home_flavours_menu_seed')
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    try:
+        held.wait(5)
+        before = menu_rows(app_db)
+        assert catalog(app_db, lock_timeout=0.05).seed() == 0
+        assert menu_rows(app_db) == before
+    finally:
+        done.set()
+        worker.join()
+    assert catalog(app_db).seed() == 2
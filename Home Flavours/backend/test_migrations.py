@@ -0,0 +1,46 @@
+import pytest
+import database
+import database_config
+from migrations import Migration, MigrationRunner
+
+SCHEMAS = [
+    pytest.param(database, {'idx_orders_created', 'idx_rollups_maker_day', 'uq_cart_customer_item'}, id='database'),
+    pytest.param(database_config, {'idx_orders_created', 'uq_cart_user_item'}, id='database_config'),
+]
+
+def versions(db):
+    return [row['version'] for row in db.execute_query(
+        "SELECT version FROM schema_version ORDER BY version", use_cache=False
+    )]
+
+def indexes(db):
+    return {row['name'] for row in db.execute_query(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%'", use_cache=False
+    )}
+
+@pytest.mark.parametrize('schema, expected_indexes', SCHEMAS)
+def test_sqlite_migrations_apply_once_and_record_their_versions(sqlite_db, schema, expected_indexes):
+    expected = [migration.version for migration in schema.SQLITE_MIGRATIONS]
+
+    assert MigrationRunner(sqlite_db, schema.SQLITE_MIGRATIONS).migrate() == expected
+    assert MigrationRunner(sqlite_db, schema.SQLITE_MIGRATIONS).migrate() == []
+    assert versions(sqlite_db) == expected
+    assert MigrationRunner(sqlite_db, schema.SQLITE_MIGRATIONS).current_version() == expected[-1]
+    assert expected_indexes <= indexes(sqlite_db)
+
+@pytest.mark.parametrize('schema', [database, database_config], ids=['database', 'database_config'])
+def test_mysql_and_sqlite_histories_match(schema):
+    assert ([(migration.version, migration.name) for migration in schema.MIGRATIONS]
+            == [(migration.version, migration.name) for migration in schema.SQLITE_MIGRATIONS])
+
+def test_migrations_run_in_version_order_and_only_new_ones_later(sqlite_db):
+    migrations = [
+        Migration(2, "add price", ["ALTER TABLE menu ADD COLUMN price DECIMAL(10,2)"]),
+        Migration(1, "menu", ["CREATE TABLE menu (id INTEGER PRIMARY KEY, name TEXT)"]),
+    ]
+    assert MigrationRunner(sqlite_db, migrations).migrate() == [1, 2]
+
+    migrations.append(Migration(3, "menu index", ["CREATE INDEX idx_menu_name ON menu (name)"]))
+    assert MigrationRunner(sqlite_db, migrations).migrate() == [3]
+    assert versions(sqlite_db) == [1, 2, 3]
+    assert 'idx_menu_name' in indexes(sqlite_db)
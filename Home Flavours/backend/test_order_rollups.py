@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+from order_rollups import OrderRollups
+from order_service import OrderService
+
+def place_orders(db, rollups, count):
+    service = OrderService(db, rollups=rollups)
+    order_ids = []
+    for index in range(count):
+        order_ids.append(service.place_order(
+            1, [(1 + index % 2, 1 + index, 80)],
+            tiffin_maker_id=1, order_date=date.today(), delivery_date=date.today() + timedelta(days=1),
+            total_amount=80 * (1 + index), payment_method='COD'
+        ))
+    return order_ids
+
+def rollup_rows(db):
+    return db.execute_query(
+        "SELECT day, tiffin_maker_id, status, order_count, revenue FROM order_daily_rollups "
+        "WHERE order_count <> 0 ORDER BY day, tiffin_maker_id, status", use_cache=False
+    )
+
+def test_rollups_follow_orders_and_status_changes(app_db):
+    rollups = OrderRollups(app_db)
+    first, second, third = place_orders(app_db, rollups, 3)
+
+    assert rollups.update_status(first, 'confirmed')
+    assert rollups.update_status(first, 'delivered')
+    assert rollups.update_status(second, 'cancelled')
+    assert rollups.update_status(third, 'pending')
+    assert not rollups.update_status(999, 'confirmed')
+
+    assert rollups.check_consistency() == []
+    assert [(row['status'], row['order_count'], row['revenue']) for row in rollup_rows(app_db)] == [
+        ('cancelled', 1, 160), ('delivered', 1, 80), ('pending', 1, 240)
+    ]
+
+def test_inconsistent_rollups_are_reported(app_db):
+    rollups = OrderRollups(app_db)
+    place_orders(app_db, rollups, 1)
+    app_db.execute_write("UPDATE order_daily_rollups SET order_count = order_count + 1")
+
+    mismatches = rollups.check_consistency()
+    assert [(row['status'], row['expected_count'], row['rollup_count']) for row in mismatches] == [
+        ('pending', 1, 2)
+    ]
+
+def test_backfill_rebuilds_the_same_rows(app_db):
+    rollups = OrderRollups(app_db)
+    first, second = place_orders(app_db, rollups, 2)
+    rollups.update_status(second, 'cancelled')
+    expected = rollup_rows(app_db)
+
+    app_db.execute_write("DELETE FROM order_daily_rollups")
+    today = date.today()
+    assert rollups.backfill(today - timedelta(days=1), today + timedelta(days=1)) == 2
+
+    assert rollup_rows(app_db) == expected
+    assert rollups.check_consistency(today, today) == []
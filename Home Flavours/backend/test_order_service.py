@@ -0,0 +1,46 @@
+from datetime import date
+from order_service import OrderService
+from order_rollups import OrderRollups
+
+ORDER_FIELDS = {'tiffin_maker_id': 1, 'order_date': date(2026, 1, 5), 'delivery_date': date(2026, 1, 6),
+                'total_amount': 245, 'payment_method': 'COD'}
+
+def fill_cart(db):
+    db.execute_batch([
+        ("INSERT INTO cart (customer_id, menu_item_id, quantity) VALUES (%s, %s, %s)", (1, 1, 2)),
+        ("INSERT INTO cart (customer_id, menu_item_id, quantity) VALUES (%s, %s, %s)", (1, 2, 1)),
+    ])
+
+def count(db, table):
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {table}", use_cache=False)[0]['n']
+
+def test_order_items_and_cart_clear_are_written_together(app_db):
+    fill_cart(app_db)
+    service = OrderService(app_db, rollups=OrderRollups(app_db))
+
+    order_id = service.place_order(1, [(1, 2, 80), (2, 1, 85)], **ORDER_FIELDS)
+
+    assert order_id is not None
+    assert count(app_db, 'orders') == 1
+    assert app_db.execute_query(
+        "SELECT menu_item_id, quantity FROM order_items WHERE order_id = %s ORDER BY menu_item_id", (order_id,)
+    ) == [{'menu_item_id': 1, 'quantity': 2}, {'menu_item_id': 2, 'quantity': 1}]
+    assert count(app_db, 'cart') == 0
+    assert count(app_db, 'order_daily_rollups') == 1
+
+def test_failed_item_insert_rolls_back_the_whole_order(app_db):
+    fill_cart(app_db)
+    service = OrderService(app_db, rollups=OrderRollups(app_db))
+
+    # quantity is NOT NULL, so the bulk insert fails after the order row was written
+    order_id = service.place_order(1, [(1, 2, 80), (2, None, 85)], **ORDER_FIELDS)
+
+    assert order_id is None
+    assert count(app_db, 'orders') == 0
+    assert count(app_db, 'order_items') == 0
+    assert count(app_db, 'order_daily_rollups') == 0
+    assert count(app_db, 'cart') == 2
+
+def test_empty_order_is_not_placed(app_db):
+    assert OrderService(app_db).place_order(1, [], **ORDER_FIELDS) is None
+    assert count(app_db, 'orders') == 0
@@ -0,0 +1,71 @@
+from query_cache import QueryCache, tables_in, is_cacheable
+
+def test_tables_are_read_from_the_statement():
+    assert tables_in("SELECT * FROM orders o JOIN users u ON u.id = o.customer_id") == {'orders', 'users'}
+    assert tables_in("UPDATE cart SET quantity = 1") == {'cart'}
+    assert not is_cacheable("SELECT * FROM orders WHERE created_at > NOW()")
+
+def test_invalidating_a_table_drops_only_entries_that_read_it():
+    cache = QueryCache(max_entries=10, ttl=60)
+    for key, tables in (('orders', {'orders'}), ('both', {'orders', 'users'}), ('users', {'users'})):
+        cache.put(key, frozenset(tables), [key], cache.generations(tables))
+
+    cache.invalidate({'orders'})
+
+    assert cache.get('orders') is None
+    assert cache.get('both') is None
+    assert cache.get('users') == ['users']
+
+def test_result_read_before_a_write_is_not_stored():
+    cache = QueryCache(max_entries=10, ttl=60)
+    generations = cache.generations({'orders'})
+    # Another thread writes to orders while this read is in flight
+    cache.invalidate({'orders'})
+    cache.put('orders', frozenset({'orders'}), ['stale'], generations)
+    assert cache.get('orders') is None
+
+def test_clear_also_rejects_reads_that_started_before_it():
+    cache = QueryCache(max_entries=10, ttl=60)
+    cache.put('old', frozenset({'orders'}), ['old'], cache.generations({'orders'}))
+    generations = cache.generations({'orders'})
+    cache.clear()
+    cache.put('orders', frozenset({'orders'}), ['stale'], generations)
+    assert cache.get('orders') is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2, ttl=60)
+    for key in ('a', 'b'):
+        cache.put(key, frozenset({'t'}), [key], cache.generations({'t'}))
+    cache.get('a')
+    cache.put('c', frozenset({'t'}), ['c'], cache.generations({'t'}))
+    assert cache.get('b') is None
+    assert cache.get('a') == ['a']
+
+def test_expired_entry_is_a_miss():
+    cache = QueryCache(max_entries=10, ttl=0)
+    cache.put('a', frozenset({'t'}), ['a'], cache.generations({'t'}))
+    assert cache.get('a') is None
+
+def test_write_evicts_cached_reads_of_its_table(sqlite_db):
+    sqlite_db.execute_write("CREATE TABLE menu (id INTEGER PRIMARY KEY, name TEXT)")
+    sqlite_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+    assert [row['name'] for row in sqlite_db.execute_query("SELECT name FROM menu")] == ["Dal"]
+    assert sqlite_db.cache_stats()['entries'] == 1
+
+    sqlite_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Roti",))
+    assert [row['name'] for row in sqlite_db.execute_query("SELECT name FROM menu")] == ["Dal", "Roti"]
+
+def test_transaction_evicts_on_commit(sqlite_db):
+    sqlite_db.execute_write("CREATE TABLE menu (id INTEGER PRIMARY KEY, name TEXT)")
+    sqlite_db.execute_query("SELECT COUNT(*) AS n FROM menu")
+    with sqlite_db.transaction():
+        sqlite_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+    assert sqlite_db.execute_query("SELECT COUNT(*) AS n FROM menu")[0]['n'] == 1
+
+def test_cached_rows_are_not_shared_with_callers(sqlite_db):
+    sqlite_db.execute_write("CREATE TABLE menu (id INTEGER PRIMARY KEY, name TEXT)")
+    sqlite_db.execute_write("INSERT INTO menu (name) VALUES (%s)", ("Dal",))
+    rows = sqlite_db.execute_query("SELECT name FROM menu")
+    rows[0]['name'] = "changed"
+    assert sqlite_db.execute_query("SELECT name FROM menu")[0]['name'] == "Dal"
+    assert sqlite_db.cache_stats()['hits'] == 1
@@ -0,0 +1,55 @@
+import pytest
+from query_stats import QueryStats, QueryBudgetExceeded
+
+LOOKUP = "SELECT * FROM order_items WHERE order_id = %s"
+
+def test_trackers_see_statements_past_the_aggregate_cap():
+    stats = QueryStats(max_statements=1, n_plus_one_threshold=3)
+    stats.record("SELECT * FROM users", (), 0.001, 1)
+
+    with stats.track('orders page', report=False) as tracker:
+        for order_id in range(3):
+            stats.record("SELECT * FROM order_items WHERE order_id = %s", (order_id,), 0.001, 1)
+
+    assert tracker.repeated() == [("SELECT * FROM order_items WHERE order_id = ?", 3)]
+    # The aggregate table stays capped
+    assert set(stats._statements) == {"SELECT * FROM users", '<other statements>'}
+    assert stats._statements['<other statements>']['calls'] == 3
+
+def run_page(stats, page, queries, budget=None):
+    with stats.track(page, budget) as tracker:
+        for order_id in range(queries):
+            stats.record(LOOKUP, (order_id,), 0.001, 1)
+    return tracker
+
+def test_strict_budget_raises_when_a_page_runs_too_many_queries():
+    stats = QueryStats(strict_budgets=True)
+    run_page(stats, 'within budget', 3, budget=3)
+
+    with pytest.raises(QueryBudgetExceeded, match='over budget ran 4 queries, over its budget of 3'):
+        run_page(stats, 'over budget', 4, budget=3)
+
+def test_non_strict_budget_only_records_the_overrun(capsys):
+    stats = QueryStats(strict_budgets=False)
+
+    tracker = run_page(stats, 'orders page', 4, budget=3)
+
+    assert tracker.over_budget
+    assert [(run['page'], run['calls'], run['over_budget']) for run in stats.snapshot()['pages']] == [
+        ('orders page', 4, True)
+    ]
+    assert 'over its budget of 3' in capsys.readouterr().out
+
+def test_repeats_with_different_parameters_are_flagged_as_n_plus_one():
+    stats = QueryStats(n_plus_one_threshold=3)
+
+    with stats.track('orders page', report=False) as tracker:
+        for order_id in range(3):
+            stats.record(LOOKUP, (order_id,), 0.001, 1)
+        # The same lookup repeated with the same parameters is not N+1
+        for _ in range(5):
+            stats.record("SELECT * FROM users WHERE id = %s", (1,), 0.001, 1)
+        stats.record("SELECT * FROM menu_items WHERE id = %s", (1,), 0.001, 1)
+        stats.record("SELECT * FROM menu_items WHERE id = %s", (2,), 0.001, 1)
+
+    assert tracker.repeated() == [("SELECT * FROM order_items WHERE order_id = ?", 3)]
@@ -0,0 +1,127 @@
+import pytest
+from simple_store import IdAllocator, SimpleStore
+
+USER = {'email': 'asha@example.com', 'password': '0' * 64, 'full_name': 'Asha',
+        'phone': '9000000000', 'address': 'Seed Street', 'user_type': 'customer'}
+DAL = {'name': 'Dal Khichdi', 'price': 80, 'description': 'Rice and lentils', 'icon': '🍲'}
+ROTI = {'name': 'Roti Sabzi', 'price': 90, 'description': 'Rotis with vegetables'}
+
+def fill(store):
+    store.add_user('asha', USER)
+    store.add_to_cart('asha', DAL, 2)
+    order = store.place_order('asha')
+    store.set_status(order.id, 'delivered')
+    store.add_to_cart('asha', ROTI, 1)
+    store.add_to_cart('asha', ROTI, 1)
+
+def check(store):
+    assert store.get_user('asha').email == USER['email']
+    assert [(order.id, order.status, order.total) for order in store.orders('asha')] == [(1, 'delivered', 160)]
+    assert [(item.name, item.quantity) for item in store.cart('asha')] == [('Roti Sabzi', 2)]
+    assert store.revenue() == 160
+
+def test_journal_is_replayed_after_restart(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path))
+    fill(store)
+    store.close()
+
+    restarted = SimpleStore(path=str(path))
+    check(restarted)
+    assert restarted.place_order('asha').id == 2
+
+def test_compacted_journal_is_replayed_after_restart(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path), compact_every=2)
+    fill(store)
+    store.close()
+
+    assert len(path.read_text(encoding='utf-8').splitlines()) < 5
+    check(SimpleStore(path=str(path)))
+
+def test_half_written_last_entry_is_dropped(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path))
+    fill(store)
+    store.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "cart_add", "username": "as')
+
+    restarted = SimpleStore(path=str(path))
+    check(restarted)
+    restarted.close()
+    # The damaged line was compacted away, so the next restart is clean
+    check(SimpleStore(path=str(path)))
+
+def test_unreadable_entry_before_the_last_raises(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path))
+    fill(store)
+    store.close()
+    lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
+    lines[2] = 'not json\n'
+    path.write_text(''.join(lines), encoding='utf-8')
+
+    with pytest.raises(ValueError, match='line 3'):
+        SimpleStore(path=str(path))
+
+def test_allocator_never_goes_back():
+    ids = IdAllocator()
+    assert [ids.allocate(), ids.allocate()] == [1, 2]
+    ids.observe(1)
+    assert ids.allocate() == 3
+    ids.observe(7)
+    assert ids.allocate() == 8
+
+def test_snapshot_next_id_is_kept_past_the_highest_order(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path))
+    # Orders 3 to 9 no longer exist, but their ids were handed out
+    store.restore({
+        'users': {'asha': USER},
+        'orders': [{'id': 1, 'customer': 'asha', 'items': [dict(DAL, quantity=1)], 'total': 80,
+                    'date': '2026-01-05', 'status': 'delivered'},
+                   {'id': 2, 'customer': 'asha', 'items': [dict(DAL, quantity=1)], 'total': 80,
+                    'date': '2026-01-05', 'status': 'pending'}],
+        'next_order_id': 10,
+    })
+    store.add_to_cart('asha', ROTI, 1)
+    assert store.place_order('asha').id == 10
+    store.close()
+
+    # Replayed from the snapshot plus the order, then from a fresh snapshot
+    for expected in (11, 12):
+        restarted = SimpleStore(path=str(path))
+        restarted.add_to_cart('asha', ROTI, 1)
+        assert restarted.place_order('asha').id == expected
+        restarted.compact()
+        restarted.close()
+
+class FailingJournal:
+    """Stands in for the journal file when the disk is full"""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def write(self, line):
+        self.journal.write(line[:10])
+        raise OSError(28, "No space left on device")
+
+    def __getattr__(self, name):
+        return getattr(self.journal, name)
+
+def test_change_is_not_applied_when_the_journal_write_fails(tmp_path):
+    path = tmp_path / 'store.jsonl'
+    store = SimpleStore(path=str(path))
+    fill(store)
+    store._journal = FailingJournal(store._journal)
+
+    with pytest.raises(OSError):
+        store.add_to_cart('asha', DAL, 1)
+
+    check(store)
+    # The journal was rewritten without the partial line, so writes carry on
+    store.add_to_cart('asha', DAL, 1)
+    store.close()
+    restarted = SimpleStore(path=str(path))
+    assert [(item.name, item.quantity) for item in restarted.cart('asha')] == [('Roti Sabzi', 2), ('Dal Khichdi', 1)]
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import pytest
+from mysql.connector import errorcode, errors
+from connection_pool import PoolTimeoutError
+from sqlite_backend import ThreadConnectionPool, database_error, translate
+
+TRANSLATIONS = [
+    pytest.param(
+        "INSERT INTO cart (user_id, menu_item_id, quantity) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)",
+        "INSERT INTO cart (user_id, menu_item_id, quantity) VALUES (?, ?, ?) "
+        "ON CONFLICT DO UPDATE SET quantity = quantity + excluded.quantity",
+        id='upsert'),
+    pytest.param(
+        "SELECT status FROM orders WHERE id = %s FOR UPDATE",
+        "SELECT status FROM orders WHERE id = ?",
+        id='for update'),
+    pytest.param(
+        "SELECT GROUP_CONCAT(name SEPARATOR ', ') FROM menu_items WHERE day_of_week = %s",
+        "SELECT GROUP_CONCAT(name, ', ') FROM menu_items WHERE day_of_week = ?",
+        id='group_concat separator'),
+    pytest.param(
+        "SELECT * FROM orders WHERE day BETWEEN %(start_date)s AND %(end_date)s",
+        "SELECT * FROM orders WHERE day BETWEEN :start_date AND :end_date",
+        id='named parameters'),
+    pytest.param(
+        "SELECT * FROM users WHERE email LIKE '%%@example.com' AND id = %s",
+        "SELECT * FROM users WHERE email LIKE '%@example.com' AND id = ?",
+        id='escaped percent with parameters'),
+]
+
+@pytest.mark.parametrize('query, expected', TRANSLATIONS)
+def test_translate(query, expected):
+    assert translate(query) == expected
+
+def test_percent_is_left_alone_without_parameters():
+    query = "SELECT * FROM users WHERE email LIKE '%%@example.com'"
+    assert translate(query, has_params=False) == query
+
+ERRORS = [
+    pytest.param(sqlite3.IntegrityError("UNIQUE constraint failed: users.username"),
+                 errors.IntegrityError, errorcode.ER_DUP_ENTRY, id='unique'),
+    pytest.param(sqlite3.IntegrityError("FOREIGN KEY constraint failed"),
+                 errors.IntegrityError, errorcode.ER_NO_REFERENCED_ROW_2, id='foreign key'),
+    pytest.param(sqlite3.OperationalError("no such table: orders"),
+                 errors.ProgrammingError, errorcode.ER_NO_SUCH_TABLE, id='no such table'),
+    pytest.param(sqlite3.OperationalError("database is locked"),
+                 errors.DatabaseError, errorcode.ER_LOCK_WAIT_TIMEOUT, id='locked'),
+    pytest.param(sqlite3.OperationalError("near \"SELEC\": syntax error"),
+                 errors.OperationalError, None, id='other operational'),
+]
+
+@pytest.mark.parametrize('error, expected_type, expected_errno', ERRORS)
+def test_sqlite_errors_map_to_mysql_errors(error, expected_type, expected_errno):
+    mapped = database_error(error)
+    assert type(mapped) is expected_type
+    if expected_errno is not None:
+        assert mapped.errno == expected_errno
+
+def test_constraint_violation_raises_mysql_integrity_error(sqlite_db):
+    sqlite_db.execute_write("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE)")
+    with pytest.raises(errors.IntegrityError) as raised:
+        with sqlite_db.transaction():
+            sqlite_db.execute_write("INSERT INTO users (username) VALUES (%s)", ("asha",))
+            sqlite_db.execute_write("INSERT INTO users (username) VALUES (%s)", ("asha",))
+    assert raised.value.errno == errorcode.ER_DUP_ENTRY
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def in_thread(func):
+    """Run func on a new thread and return what it returned or raised"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = func()
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return outcome
+
+def test_nested_checkouts_on_one_thread_share_a_connection():
+    pool = ThreadConnectionPool(FakeConnection, pool_size=1)
+    outer = pool.acquire()
+    inner = pool.acquire()
+
+    assert inner is outer
+    assert pool.stats()['in_use'] == 1
+    pool.release(inner)
+    assert pool.stats()['in_use'] == 1
+    pool.release(outer)
+    assert pool.stats()['in_use'] == 0
+    # The thread keeps its connection for the next checkout
+    assert pool.acquire() is outer and pool.stats()['created'] == 1
+
+def test_threads_beyond_pool_size_time_out():
+    pool = ThreadConnectionPool(FakeConnection, pool_size=1, checkout_timeout=0.05)
+    held = pool.acquire()
+
+    assert isinstance(in_thread(pool.acquire).get('error'), PoolTimeoutError)
+    assert pool.stats()['timeouts'] == 1
+
+    pool.release(held)
+    outcome = in_thread(lambda: pool.release(pool.acquire()))
+    assert 'error' not in outcome
+
+def test_connection_can_be_released_from_another_thread():
+    pool = ThreadConnectionPool(FakeConnection, pool_size=1, checkout_timeout=0.05)
+    # A stream's generator may be finalised on a different thread than the one that opened it
+    connection = in_thread(pool.acquire)['result']
+    assert pool.stats()['in_use'] == 1
+
+    pool.release(connection, discard=True)
+
+    assert pool.stats()['in_use'] == 0
+    assert connection.closed
+    # The freed slot is available again
+    assert pool.acquire() is not connection
@@ -3,12 +3,22 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from database import db
+from database import db, order_rollups, data_loader, overview_metrics, load_overview
 from auth import auth
+from order_items_loader import OrderItemsLoader, expanded_order_ids
+from pagination import KeysetPaginator
+from query_stats import track_pages
+from page_profiler import profiler, profile_pages
 
+# Query budgets per rerun; exceeding one fails under QUERY_BUDGET_STRICT=1
+@profile_pages(profiler)
+@track_pages(db.stats, budgets={'show_overview': 6, 'show_users': 4, 'show_orders': 8,
+                                'show_tiffin_makers': 4})
 class AdminDashboard:
     def __init__(self):
         self.current_user = auth.get_current_user()
+        self.items_loader = OrderItemsLoader(db)
+        self.metrics = None
     
     def show_dashboard(self):
         """Main admin dashboard"""
@@ -42,77 +52,44 @@ class AdminDashboard:
         with col2:
             end_date = st.date_input("End Date", value=datetime.now().date())
         
-        # Key metrics
+        # The tab's reads are independent, so load them concurrently
+        data = load_overview(data_loader, start_date, end_date)
+        
+        # Key metrics; the snapshot is reused by the Settings tab
+        self.metrics = data['metrics']
         col1, col2, col3, col4 = st.columns(4)
         
-        # Total users
-        total_users = db.execute_query("SELECT COUNT(*) as count FROM users")[0]['count']
         with col1:
-            st.metric("Total Users", total_users)
-        
-        # Total orders
-        total_orders = db.execute_query("""
-            SELECT COUNT(*) as count FROM orders 
-            WHERE created_at BETWEEN %s AND %s
-        """, (start_date, end_date))[0]['count']
+            st.metric("Total Users", self.metrics.total_users or 0)
         with col2:
-            st.metric("Total Orders", total_orders)
-        
-        # Total revenue
-        total_revenue = db.execute_query("""
-            SELECT SUM(total_amount) as total FROM orders 
-            WHERE created_at BETWEEN %s AND %s AND status != 'cancelled'
-        """, (start_date, end_date))[0]['total'] or 0
+            st.metric("Total Orders", self.metrics.range_orders or 0)
         with col3:
-            st.metric("Total Revenue", f"₹{total_revenue}")
-        
-        # Active tiffin makers
-        active_makers = db.execute_query("SELECT COUNT(*) as count FROM tiffin_makers WHERE is_active = TRUE")[0]['count']
+            st.metric("Total Revenue", f"₹{self.metrics.range_revenue or 0}")
         with col4:
-            st.metric("Active Tiffin Makers", active_makers)
+            st.metric("Active Tiffin Makers", self.metrics.active_tiffin_makers or 0)
         
         # Charts
         col1, col2 = st.columns(2)
         
         with col1:
             # Order status distribution
-            status_data = db.execute_query("""
-                SELECT status, COUNT(*) as count
-                FROM orders 
-                WHERE created_at BETWEEN %s AND %s
-                GROUP BY status
-            """, (start_date, end_date))
+            df_status = data['df_status']
             
-            if status_data:
-                df_status = pd.DataFrame(status_data)
+            if not df_status.empty:
                 fig_status = px.pie(df_status, values='count', names='status', title='Order Status Distribution')
                 st.plotly_chart(fig_status, use_container_width=True)
         
         with col2:
             # Revenue trend
-            revenue_data = db.execute_query("""
-                SELECT DATE(created_at) as date, SUM(total_amount) as daily_revenue
-                FROM orders 
-                WHERE created_at BETWEEN %s AND %s AND status != 'cancelled'
-                GROUP BY DATE(created_at)
-                ORDER BY date
-            """, (start_date, end_date))
+            df_revenue = data['df_revenue']
             
-            if revenue_data:
-                df_revenue = pd.DataFrame(revenue_data)
+            if not df_revenue.empty:
                 fig_revenue = px.line(df_revenue, x='date', y='daily_revenue', title='Revenue Trend')
                 st.plotly_chart(fig_revenue, use_container_width=True)
         
         # Recent activity
         st.markdown("### Recent Activity")
-        recent_orders = db.execute_query("""
-            SELECT o.*, u.full_name, tm.business_name
-            FROM orders o
-            JOIN users u ON o.customer_id = u.id
-            JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id
-            ORDER BY o.created_at DESC
-            LIMIT 10
-        """)
+        recent_orders = data['recent_orders']
         
         if recent_orders:
             for order in recent_orders:
@@ -131,21 +108,26 @@ class AdminDashboard:
         with col2:
             search_term = st.text_input("Search by name or email")
         
-        # Build query
-        query = "SELECT * FROM users WHERE 1=1"
+        # Build filters
+        conditions = []
         params = []
         
         if user_type_filter != "All":
-            query += " AND user_type = %s"
+            conditions.append("user_type = %s")
             params.append(user_type_filter)
         
         if search_term:
-            query += " AND (full_name LIKE %s OR email LIKE %s)"
+            conditions.append("(full_name LIKE %s OR email LIKE %s)")
             params.extend([f"%{search_term}%", f"%{search_term}%"])
         
-        query += " ORDER BY created_at DESC"
-        
-        users = db.execute_query(query, tuple(params))
+        paginator = KeysetPaginator(
+            "admin_users",
+            select="id, username, full_name, email, phone, address, user_type, created_at",
+            from_clause="users",
+            where=" AND ".join(conditions) or None,
+            params=params
+        )
+        users = paginator.fetch(db)
         
         if not users:
             st.info("No users found.")
@@ -174,10 +156,13 @@ class AdminDashboard:
                     if st.button("Delete User", key=f"delete_{user['id']}"):
                         if user['user_type'] != 'admin':
                             db.execute_update("DELETE FROM users WHERE id = %s", (user['id'],))
+                            overview_metrics.invalidate()
                             st.success("User deleted!")
                             st.rerun()
                         else:
                             st.error("Cannot delete admin user!")
+        
+        paginator.show_navigation()
     
     def show_orders(self):
         """Manage orders"""
@@ -198,35 +183,40 @@ class AdminDashboard:
         with col3:
             search_term = st.text_input("Search by customer name")
         
-        # Build query
-        query = """
-            SELECT o.*, u.full_name, u.phone, tm.business_name
-            FROM orders o
-            JOIN users u ON o.customer_id = u.id
-            JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id
-            WHERE 1=1
-        """
-        params = []
+        # Build filters
+        conditions = ["o.delivery_date = %s"]
+        params = [date_filter]
         
         if status_filter != "All":
-            query += " AND o.status = %s"
+            conditions.append("o.status = %s")
             params.append(status_filter)
         
-        query += " AND o.delivery_date = %s"
-        params.append(date_filter)
-        
         if search_term:
-            query += " AND u.full_name LIKE %s"
+            conditions.append("u.full_name LIKE %s")
             params.append(f"%{search_term}%")
         
-        query += " ORDER BY o.created_at DESC"
-        
-        orders = db.execute_query(query, tuple(params))
+        paginator = KeysetPaginator(
+            "admin_orders",
+            select="""o.id, o.order_date, o.delivery_date, o.total_amount, o.payment_method, o.status,
+                      o.delivery_address, o.special_instructions, o.created_at,
+                      u.full_name, u.phone, tm.business_name""",
+            from_clause="""orders o
+                JOIN users u ON o.customer_id = u.id
+                JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id""",
+            where=" AND ".join(conditions),
+            params=params,
+            time_column="o.created_at",
+            id_column="o.id"
+        )
+        orders = paginator.fetch(db)
         
         if not orders:
             st.info("No orders found for the selected criteria.")
             return
         
+        # Load items for every opened order in one query
+        order_items = self.items_loader.load(expanded_order_ids(orders, "admin_items"))
+        
         # Display orders
         for order in orders:
             with st.expander(f"Order #{order['id']} - {order['full_name']} → {order['business_name']} - ₹{order['total_amount']}"):
@@ -252,27 +242,25 @@ class AdminDashboard:
                     # Admin actions
                     if order['status'] == 'pending':
                         if st.button("Confirm Order", key=f"admin_confirm_{order['id']}"):
-                            db.execute_update("UPDATE orders SET status = 'confirmed' WHERE id = %s", (order['id'],))
+                            order_rollups.update_status(order['id'], 'confirmed')
+                            overview_metrics.invalidate()
                             st.success("Order confirmed!")
                             st.rerun()
                     
                     if order['status'] in ['pending', 'confirmed']:
                         if st.button("Cancel Order", key=f"admin_cancel_{order['id']}"):
-                            db.execute_update("UPDATE orders SET status = 'cancelled' WHERE id = %s", (order['id'],))
+                            order_rollups.update_status(order['id'], 'cancelled')
+                            overview_metrics.invalidate()
                             st.success("Order cancelled!")
                             st.rerun()
                 
                 # Show order items
-                order_items = db.execute_query("""
-                    SELECT oi.*, mi.name, mi.description
-                    FROM order_items oi
-                    JOIN menu_items mi ON oi.menu_item_id = mi.id
-                    WHERE oi.order_id = %s
-                """, (order['id'],))
-                
-                st.markdown("**Order Items:**")
-                for item in order_items:
-                    st.markdown(f"- {item['name']} x{item['quantity']} @ ₹{item['price_per_unit']}")
+                if st.checkbox("Show order items", key=f"admin_items_{order['id']}"):
+                    st.markdown("**Order Items:**")
+                    for item in order_items.get(order['id'], []):
+                        st.markdown(f"- {item['name']} x{item['quantity']} @ ₹{item['price_per_unit']}")
+        
+        paginator.show_navigation()
     
     def show_tiffin_makers(self):
         """Manage tiffin makers"""
@@ -305,6 +293,7 @@ class AdminDashboard:
                         """, (user_id[0], business_name, location, cuisine_specialty, rating, is_active))
                         
                         if success:
+                            overview_metrics.invalidate()
                             st.success("Tiffin maker added successfully!")
                             st.rerun()
                         else:
@@ -351,11 +340,13 @@ class AdminDashboard:
                             "UPDATE tiffin_makers SET is_active = %s WHERE id = %s",
                             (new_status, maker['id'])
                         )
+                        overview_metrics.invalidate()
                         st.success("Status updated!")
                         st.rerun()
                     
                     if st.button("Delete", key=f"delete_maker_{maker['id']}"):
                         db.execute_update("DELETE FROM tiffin_makers WHERE id = %s", (maker['id'],))
+                        overview_metrics.invalidate()
                         st.success("Tiffin maker deleted!")
                         st.rerun()
     
@@ -366,20 +357,20 @@ class AdminDashboard:
         st.markdown("### Database Information")
         
         # Get database stats
-        total_users = db.execute_query("SELECT COUNT(*) as count FROM users")[0]['count']
-        total_orders = db.execute_query("SELECT COUNT(*) as count FROM orders")[0]['count']
-        total_tiffin_makers = db.execute_query("SELECT COUNT(*) as count FROM tiffin_makers")[0]['count']
-        total_menu_items = db.execute_query("SELECT COUNT(*) as count FROM menu_items")[0]['count']
+        metrics = self.metrics or overview_metrics.snapshot()
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.metric("Total Users", total_users)
-            st.metric("Total Orders", total_orders)
+            st.metric("Total Users", metrics.total_users or 0)
+            st.metric("Total Orders", metrics.total_orders or 0)
         
         with col2:
-            st.metric("Total Tiffin Makers", total_tiffin_makers)
-            st.metric("Total Menu Items", total_menu_items)
+            st.metric("Total Tiffin Makers", metrics.total_tiffin_makers or 0)
+            st.metric("Total Menu Items", metrics.total_menu_items or 0)
+        
+        self.show_query_performance()
+        self.show_page_profiling()
         
         st.markdown("### System Actions")
         
@@ -395,4 +386,78 @@ class AdminDashboard:
                 st.info("Demo data reset feature coming soon!")
         
         st.markdown("### Backup & Maintenance")
-        st.info("Backup and maintenance features coming soon!") 
\ No newline at end of file
+        st.info("Backup and maintenance features coming soon!")
+    
+    def show_query_performance(self):
+        """Per-statement latency and the slow-query log"""
+        st.markdown("### Query Performance")
+        
+        stats = db.query_stats()
+        if not stats['statements']:
+            st.info("No queries recorded yet.")
+            return
+        
+        df_statements = pd.DataFrame(stats['statements'])
+        st.dataframe(
+            df_statements[['statement', 'calls', 'rows', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms']]
+            .round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        st.markdown("**Queries per page** (latest run)")
+        if stats['pages']:
+            df_pages = pd.DataFrame(stats['pages'])
+            df_pages['repeated'] = df_pages['repeated'].apply(
+                lambda repeated: "; ".join(f"{calls}x {statement}" for statement, calls in repeated)
+            )
+            st.dataframe(
+                df_pages[['page', 'calls', 'db_ms', 'budget', 'over_budget', 'repeated']].round(2),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        st.markdown(f"**Slow queries** (over {stats['slow_threshold_ms']:.0f} ms)")
+        if stats['slow_queries']:
+            df_slow = pd.DataFrame(stats['slow_queries']).astype({'params': str})
+            st.dataframe(df_slow.round(2), use_container_width=True, hide_index=True)
+        else:
+            st.info("No slow queries recorded.")
+        
+        if st.button("Reset Query Stats"):
+            db.stats.reset()
+            st.rerun()
+    
+    def show_page_profiling(self):
+        """Opt-in wall/CPU/DB time per page and the slowest profiled reruns"""
+        st.markdown("### Page Profiling")
+        
+        enabled = st.checkbox(
+            "Profile page renders",
+            value=profiler.enabled,
+            help="Times every page for all sessions until turned off; also set by PAGE_PROFILING=1"
+        )
+        if enabled != profiler.enabled:
+            profiler.enabled = enabled
+            st.rerun()
+        
+        report = profiler.snapshot()
+        if not report['pages']:
+            st.info("No pages profiled yet." if enabled else "Page profiling is off.")
+            return
+        
+        df_pages = pd.DataFrame(report['pages'])
+        st.dataframe(
+            df_pages[['page', 'runs', 'wall_ms', 'p95_wall_ms', 'max_wall_ms', 'cpu_ms', 'db_ms', 'other_ms']]
+            .round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        if report['slowest_runs']:
+            st.markdown(f"**Slowest reruns** (cProfile dumps in {profiler.dump_dir})")
+            st.dataframe(pd.DataFrame(report['slowest_runs']).round(2), use_container_width=True, hide_index=True)
+        
+        if st.button("Reset Page Profile"):
+            profiler.reset()
+            st.rerun() 
\ No newline at end of file
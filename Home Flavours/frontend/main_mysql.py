@@ -5,6 +5,14 @@ import hashlib
 import json
 import os
 from database_config import db_manager
+from order_service import OrderService
+from cart_service import CartService
+from menu_catalog import MenuCatalog
+from metrics_service import MetricsService
+from config import METRICS_CONFIG
+from pagination import KeysetPaginator
+from page_profiler import profiler, profile_module_pages
+from app_metrics import logins
 
 # Page configuration
 st.set_page_config(
@@ -268,6 +276,16 @@ WEEKLY_MENU = {
     ]
 }
 
+order_service = OrderService(db_manager, cart_user_column='user_id', item_price_column='price')
+cart_service = CartService(db_manager, user_column='user_id')
+menu_catalog = MenuCatalog(db_manager, WEEKLY_MENU, item_fields=('name', 'description', 'price', 'icon'))
+overview_metrics = MetricsService(db_manager, {
+    'total_users': "SELECT COUNT(*) FROM users",
+    'total_orders': "SELECT COUNT(*) FROM orders",
+    'total_revenue': "SELECT COALESCE(SUM(total_amount), 0) FROM orders",
+}, **METRICS_CONFIG)
+profiler.watch(db_manager.stats)
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -306,10 +324,13 @@ def login_user(username, password):
         if user and user[0]['password_hash'] == hash_password(password):
             st.session_state.authenticated = True
             st.session_state.current_user = user[0]
+            logins.inc(result='success')
             return True, "Login successful!"
         else:
+            logins.inc(result='failure')
             return False, "Invalid username or password"
     except Exception as e:
+        logins.inc(result='error')
         return False, f"Login error: {str(e)}"
 
 def logout_user():
@@ -321,7 +342,7 @@ def get_user_cart(user_id):
     """Get user's cart items from database"""
     try:
         cart_items = db_manager.execute_query("""
-            SELECT c.id, c.quantity, m.name, m.description, m.price, m.icon
+            SELECT c.id, c.menu_item_id, c.quantity, m.name, m.description, m.price, m.icon
             FROM cart c
             JOIN menu_items m ON c.menu_item_id = m.id
             WHERE c.user_id = %s
@@ -331,103 +352,56 @@ def get_user_cart(user_id):
         print(f"Error getting cart: {e}")
         return []
 
-def add_to_cart_db(user_id, menu_item_name, quantity):
+def add_to_cart_db(user_id, day, menu_item_name, quantity):
     """Add item to user's cart in database"""
     try:
-        # First, get or create menu item
-        menu_item = db_manager.execute_query(
-            "SELECT id FROM menu_items WHERE name = %s", (menu_item_name,)
-        )
-        
-        if not menu_item:
-            # Create menu item if it doesn't exist
-            menu_item_id = db_manager.execute_update(
-                "INSERT INTO menu_items (name, description, price, day_of_week, icon) VALUES (%s, %s, %s, %s, %s)",
-                (menu_item_name, "Delicious homemade food", 100, "Monday", "🍽️")
-            )
-        else:
-            menu_item_id = menu_item[0]['id']
-        
-        # Check if item already in cart
-        existing_cart_item = db_manager.execute_query(
-            "SELECT id, quantity FROM cart WHERE user_id = %s AND menu_item_id = %s",
-            (user_id, menu_item_id)
-        )
-        
-        if existing_cart_item:
-            # Update quantity
-            new_quantity = existing_cart_item[0]['quantity'] + quantity
-            db_manager.execute_update(
-                "UPDATE cart SET quantity = %s WHERE id = %s",
-                (new_quantity, existing_cart_item[0]['id'])
-            )
-        else:
-            # Add new item to cart
-            db_manager.execute_update(
-                "INSERT INTO cart (user_id, menu_item_id, quantity) VALUES (%s, %s, %s)",
-                (user_id, menu_item_id, quantity)
-            )
+        # Weekly menu ids come from the in-memory catalog
+        menu_item_id = menu_catalog.resolve(day, menu_item_name)
+        if menu_item_id is None:
+            return False
         
-        return True
+        # Insert or increment the cart row in one statement
+        return cart_service.add_item(user_id, menu_item_id, quantity)
     except Exception as e:
         print(f"Error adding to cart: {e}")
         return False
 
 def place_order_db(user_id, total_amount, payment_method="COD"):
     """Place order in database"""
-    try:
-        # Create order
-        order_id = db_manager.execute_update(
-            """INSERT INTO orders (customer_id, total_amount, payment_method, order_date) 
-               VALUES (%s, %s, %s, %s)""",
-            (user_id, total_amount, payment_method, datetime.now().date())
-        )
-        
-        if order_id:
-            # Get cart items and add to order_items
-            cart_items = get_user_cart(user_id)
-            for item in cart_items:
-                db_manager.execute_update(
-                    "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (%s, %s, %s, %s)",
-                    (order_id, item['id'], item['quantity'], item['price'])
-                )
-            
-            # Clear cart
-            db_manager.execute_update("DELETE FROM cart WHERE user_id = %s", (user_id,))
-            return True
-        return False
-    except Exception as e:
-        print(f"Error placing order: {e}")
-        return False
+    cart_items = get_user_cart(user_id)
+    order_id = order_service.place_order(
+        user_id,
+        [(item['menu_item_id'], item['quantity'], item['price']) for item in cart_items],
+        total_amount=total_amount,
+        payment_method=payment_method,
+        order_date=datetime.now().date()
+    )
+    return order_id is not None
 
 def get_user_orders(user_id):
-    """Get user's orders from database"""
-    try:
-        orders = db_manager.execute_query("""
-            SELECT o.id, o.total_amount, o.status, o.payment_method, o.order_date,
-                   GROUP_CONCAT(CONCAT(oi.quantity, 'x ', m.name) SEPARATOR ', ') as items
-            FROM orders o
+    """Paginator over the user's orders, newest first"""
+    return KeysetPaginator(
+        "user_orders",
+        select="""o.id, o.total_amount, o.status, o.payment_method, o.order_date, o.created_at,
+                  GROUP_CONCAT(CONCAT(oi.quantity, 'x ', m.name) SEPARATOR ', ') as items""",
+        from_clause="""orders o
             LEFT JOIN order_items oi ON o.id = oi.order_id
-            LEFT JOIN menu_items m ON oi.menu_item_id = m.id
-            WHERE o.customer_id = %s
-            GROUP BY o.id
-            ORDER BY o.created_at DESC
-        """, (user_id,))
-        return orders
-    except Exception as e:
-        print(f"Error getting orders: {e}")
-        return []
+            LEFT JOIN menu_items m ON oi.menu_item_id = m.id""",
+        where="o.customer_id = %s",
+        params=(user_id,),
+        group_by="o.id",
+        time_column="o.created_at",
+        id_column="o.id"
+    )
 
 def main():
-    # Initialize database connection
-    if not db_manager.connect():
+    # Connect and migrate the schema once per process, not on every rerun
+    if not db_manager.ensure_ready():
         st.error("❌ Failed to connect to database. Please check your MySQL connection.")
         return
     
-    # Create tables if they don't exist
-    if not db_manager.create_tables():
-        st.error("❌ Failed to create database tables.")
-        return
+    # Load the weekly menu into menu_items once; later calls return at once
+    menu_catalog.seed()
     
     # Enhanced Sidebar
     with st.sidebar:
@@ -639,7 +613,7 @@ def show_menu_browser():
                 
                 if quantity > 0:
                     if st.button("Add to Cart", key=f"add_{selected_day}_{i}"):
-                        if add_to_cart_db(st.session_state.current_user['id'], item['name'], quantity):
+                        if add_to_cart_db(st.session_state.current_user['id'], selected_day, item['name'], quantity):
                             st.success(f"Added {quantity} {item['name']} to cart! 🛒")
                         else:
                             st.error("Failed to add item to cart")
@@ -695,7 +669,8 @@ def show_cart():
 def show_orders():
     st.subheader("📋 My Orders")
     
-    user_orders = get_user_orders(st.session_state.current_user['id'])
+    paginator = get_user_orders(st.session_state.current_user['id'])
+    user_orders = paginator.fetch(db_manager)
     
     if not user_orders:
         st.info("No orders yet. Place your first order! 🍽️")
@@ -708,6 +683,8 @@ def show_orders():
             st.markdown(f"**Total:** ₹{order['total_amount']}")
             st.markdown("**Items:**")
             st.markdown(f"- {order['items']}")
+    
+    paginator.show_navigation()
 
 def show_tiffin_maker_dashboard():
     current_user = st.session_state.current_user
@@ -726,17 +703,20 @@ def show_tiffin_maker_dashboard():
 def show_tiffin_maker_orders():
     st.subheader("📋 Orders")
     
-    # Get all orders
-    orders = db_manager.execute_query("""
-        SELECT o.id, o.total_amount, o.status, o.order_date, u.full_name as customer_name,
-               GROUP_CONCAT(CONCAT(oi.quantity, 'x ', m.name) SEPARATOR ', ') as items
-        FROM orders o
-        JOIN users u ON o.customer_id = u.id
-        LEFT JOIN order_items oi ON o.id = oi.order_id
-        LEFT JOIN menu_items m ON oi.menu_item_id = m.id
-        GROUP BY o.id
-        ORDER BY o.created_at DESC
-    """)
+    # Get all orders, one page at a time
+    paginator = KeysetPaginator(
+        "maker_orders",
+        select="""o.id, o.total_amount, o.status, o.order_date, o.created_at, u.full_name as customer_name,
+                  GROUP_CONCAT(CONCAT(oi.quantity, 'x ', m.name) SEPARATOR ', ') as items""",
+        from_clause="""orders o
+            JOIN users u ON o.customer_id = u.id
+            LEFT JOIN order_items oi ON o.id = oi.order_id
+            LEFT JOIN menu_items m ON oi.menu_item_id = m.id""",
+        group_by="o.id",
+        time_column="o.created_at",
+        id_column="o.id"
+    )
+    orders = paginator.fetch(db_manager)
     
     if not orders:
         st.info("No orders yet. 🍽️")
@@ -758,6 +738,8 @@ def show_tiffin_maker_orders():
                     )
                     st.success("Order confirmed! ✅")
                     st.rerun()
+    
+    paginator.show_navigation()
 
 def show_menu_management():
     st.subheader("🍽️ Menu Management")
@@ -780,10 +762,11 @@ def show_admin_dashboard():
 def show_admin_overview():
     st.subheader("📊 System Overview")
     
-    # Get statistics
-    total_users = db_manager.execute_query("SELECT COUNT(*) as count FROM users")[0]['count']
-    total_orders = db_manager.execute_query("SELECT COUNT(*) as count FROM orders")[0]['count']
-    total_revenue = db_manager.execute_query("SELECT SUM(total_amount) as total FROM orders")[0]['total'] or 0
+    # Get statistics in one query
+    metrics = overview_metrics.snapshot()
+    total_users = metrics.total_users or 0
+    total_orders = metrics.total_orders or 0
+    total_revenue = metrics.total_revenue or 0
     
     col1, col2, col3 = st.columns(3)
     
@@ -814,7 +797,12 @@ def show_admin_overview():
 def show_user_management():
     st.subheader("👥 User Management")
     
-    users = db_manager.execute_query("SELECT * FROM users ORDER BY created_at DESC")
+    paginator = KeysetPaginator(
+        "user_management",
+        select="id, username, full_name, email, phone, user_type, created_at",
+        from_clause="users"
+    )
+    users = paginator.fetch(db_manager)
     
     for user in users:
         with st.expander(f"{user['full_name']} ({user['user_type']})"):
@@ -823,6 +811,11 @@ def show_user_management():
             st.markdown(f"**Phone:** {user['phone']}")
             st.markdown(f"**Type:** {user['user_type'].title()}")
             st.markdown(f"**Created:** {user['created_at']}")
+    
+    paginator.show_navigation()
+
+# Time every show_* page when PAGE_PROFILING=1
+profile_module_pages(profiler, globals())
 
 if __name__ == "__main__":
     # Create demo accounts if they don't exist
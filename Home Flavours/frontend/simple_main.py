@@ -4,6 +4,13 @@ from datetime import datetime, timedelta
 import hashlib
 import json
 import os
+import sys
+
+# The profiler, metrics and store live in backend/, which main.py also puts on the path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from page_profiler import profiler, profile_module_pages
+from app_metrics import logins, orders_placed, cart_adds
+from simple_store import store
 
 # Page configuration
 st.set_page_config(
@@ -215,13 +222,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Simple data storage using session state
-if 'users' not in st.session_state:
-    st.session_state.users = {}
-if 'orders' not in st.session_state:
-    st.session_state.orders = []
-if 'cart' not in st.session_state:
-    st.session_state.cart = []
+# Users, carts and orders are shared by all sessions through the store;
+# session state only remembers who is logged in
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 
@@ -275,26 +277,26 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def register_user(username, email, password, full_name, phone, address, user_type='customer'):
-    if username in st.session_state.users:
-        return False, "Username already exists"
-    
-    st.session_state.users[username] = {
+    if not store.add_user(username, {
         'email': email,
         'password': hash_password(password),
         'full_name': full_name,
         'phone': phone,
         'address': address,
         'user_type': user_type
-    }
+    }):
+        return False, "Username already exists"
     return True, "Registration successful!"
 
 def login_user(username, password):
-    if username in st.session_state.users:
-        user = st.session_state.users[username]
-        if user['password'] == hash_password(password):
+    user = store.get_user(username)
+    if user is not None:
+        if user.password == hash_password(password):
             st.session_state.authenticated = True
             st.session_state.current_user = username
+            logins.inc(result='success')
             return True, "Login successful!"
+    logins.inc(result='failure')
     return False, "Invalid username or password"
 
 def logout_user():
@@ -304,13 +306,13 @@ def logout_user():
 
 def main():
     # Create demo accounts if they don't exist
-    if 'admin' not in st.session_state.users:
+    if store.get_user('admin') is None:
         register_user('admin', 'admin@homeflavours.com', 'admin123', 'System Administrator', '1234567890', 'Admin Address', 'admin')
     
-    if 'chef1' not in st.session_state.users:
+    if store.get_user('chef1') is None:
         register_user('chef1', 'chef1@homeflavours.com', 'chef123', 'Priya Sharma', '9876543210', '123 Cooking Street, Mumbai', 'tiffin_maker')
     
-    if 'customer1' not in st.session_state.users:
+    if store.get_user('customer1') is None:
         register_user('customer1', 'customer1@homeflavours.com', 'customer123', 'Rahul Kumar', '5555555555', '456 Customer Lane, Mumbai', 'customer')
     
     # Enhanced Sidebar
@@ -323,11 +325,11 @@ def main():
         """, unsafe_allow_html=True)
         
         if st.session_state.authenticated:
-            current_user = st.session_state.users[st.session_state.current_user]
-            st.success(f"Welcome, {current_user['full_name']}! 👋")
+            current_user = store.get_user(st.session_state.current_user)
+            st.success(f"Welcome, {current_user.full_name}! 👋")
             
             # Cart indicator
-            cart_count = len(st.session_state.cart)
+            cart_count = len(store.cart(st.session_state.current_user))
             if cart_count > 0:
                 st.markdown(f"🛒 Cart: <span class='cart-badge'>{cart_count} items</span>", unsafe_allow_html=True)
             
@@ -340,10 +342,10 @@ def main():
     if not st.session_state.authenticated:
         show_landing_page()
     else:
-        current_user = st.session_state.users[st.session_state.current_user]
-        if current_user['user_type'] == 'admin':
+        current_user = store.get_user(st.session_state.current_user)
+        if current_user.user_type == 'admin':
             show_admin_dashboard()
-        elif current_user['user_type'] == 'tiffin_maker':
+        elif current_user.user_type == 'tiffin_maker':
             show_tiffin_maker_dashboard()
         else:
             show_user_dashboard()
@@ -468,10 +470,10 @@ def show_landing_page():
                         st.error(message)
 
 def show_user_dashboard():
-    current_user = st.session_state.users[st.session_state.current_user]
+    current_user = store.get_user(st.session_state.current_user)
     
     st.title("🏠 Home Flavours - User Dashboard")
-    st.markdown(f"Welcome back, **{current_user['full_name']}**! 👋")
+    st.markdown(f"Welcome back, **{current_user.full_name}**! 👋")
     
     tab1, tab2, tab3 = st.tabs(["🍽️ Browse Menu", "🛒 My Cart", "📋 My Orders"])
     
@@ -526,97 +528,82 @@ def show_menu_browser():
                         st.success(f"Added {quantity} {item['name']} to cart! 🛒")
 
 def add_to_cart(item, quantity):
-    # Check if item already in cart
-    for cart_item in st.session_state.cart:
-        if cart_item['name'] == item['name']:
-            cart_item['quantity'] += quantity
-            return
-    
-    # Add new item
-    st.session_state.cart.append({
-        'name': item['name'],
-        'price': item['price'],
-        'description': item['description'],
-        'quantity': quantity,
-        'icon': item.get('icon', '🍽️')
-    })
+    cart_adds.inc()
+    store.add_to_cart(st.session_state.current_user, item, quantity)
 
 def show_cart():
     st.subheader("🛒 My Cart")
     
-    if not st.session_state.cart:
+    cart = store.cart(st.session_state.current_user)
+    if not cart:
         st.info("Your cart is empty. Browse our menu to add items! 🍽️")
         return
     
     total = 0
-    for item in st.session_state.cart:
+    for item in cart:
         with st.container():
             col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
             
             with col1:
                 st.markdown(f"""
                 <div class="menu-item-card">
-                    <h4>{item['icon']} {item['name']}</h4>
-                    <p><em>{item['description']}</em></p>
+                    <h4>{item.icon} {item.name}</h4>
+                    <p><em>{item.description}</em></p>
                 </div>
                 """, unsafe_allow_html=True)
             
             with col2:
-                st.markdown(f"<div class='price-tag'>₹{item['price']}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='price-tag'>₹{item.price}</div>", unsafe_allow_html=True)
             
             with col3:
-                st.markdown(f"**Qty: {item['quantity']}**")
+                st.markdown(f"**Qty: {item.quantity}**")
             
             with col4:
-                if st.button("Remove", key=f"remove_{item['name']}"):
-                    st.session_state.cart.remove(item)
+                if st.button("Remove", key=f"remove_{item.name}"):
+                    store.remove_from_cart(st.session_state.current_user, item.name)
                     st.success("Item removed from cart! 🗑️")
                     st.rerun()
             
-            total += item['price'] * item['quantity']
+            total += item.price * item.quantity
     
     st.markdown("---")
     st.markdown(f"**Total: ₹{total}**")
     
     if st.button("Place Order"):
-        place_order(total)
-        st.success("Order placed successfully! 🎉")
+        if place_order():
+            st.success("Order placed successfully! 🎉")
+        else:
+            st.error("Your cart is empty.")
 
-def place_order(total):
-    order = {
-        'id': len(st.session_state.orders) + 1,
-        'customer': st.session_state.current_user,
-        'items': st.session_state.cart.copy(),
-        'total': total,
-        'date': datetime.now().strftime('%Y-%m-%d'),
-        'status': 'pending'
-    }
-    st.session_state.orders.append(order)
-    st.session_state.cart = []
+def place_order():
+    # The store totals the cart itself, so an add from another tab is not lost
+    order = store.place_order(st.session_state.current_user)
+    if order is not None:
+        orders_placed.inc()
+    return order
 
 def show_orders():
     st.subheader("📋 My Orders")
     
-    user_orders = [order for order in st.session_state.orders 
-                   if order['customer'] == st.session_state.current_user]
+    user_orders = store.orders(customer=st.session_state.current_user)
     
     if not user_orders:
         st.info("No orders yet. Place your first order! 🍽️")
         return
     
     for order in user_orders:
-        with st.expander(f"Order #{order['id']} - ₹{order['total']} - {order['date']}"):
-            st.markdown(f"**Status:** {order['status'].title()}")
-            st.markdown(f"**Total:** ₹{order['total']}")
+        with st.expander(f"Order #{order.id} - ₹{order.total} - {order.date}"):
+            st.markdown(f"**Status:** {order.status.title()}")
+            st.markdown(f"**Total:** ₹{order.total}")
             st.markdown("**Items:**")
-            for item in order['items']:
-                st.markdown(f"- {item['icon']} {item['name']} x{item['quantity']} @ ₹{item['price']}")
+            for item in order.items:
+                st.markdown(f"- {item.icon} {item.name} x{item.quantity} @ ₹{item.price}")
 
 def show_tiffin_maker_dashboard():
-    current_user = st.session_state.users[st.session_state.current_user]
+    current_user = store.get_user(st.session_state.current_user)
     
     st.title("👨‍🍳 Home Flavours - Tiffin Maker Dashboard")
-    st.markdown(f"Welcome back, **{current_user['full_name']}**! 👋")
+    st.markdown(f"Welcome back, **{current_user.full_name}**! 👋")
     
     tab1, tab2 = st.tabs(["📋 Orders", "🍽️ Menu Management"])
     
@@ -629,22 +616,23 @@ def show_tiffin_maker_dashboard():
 def show_tiffin_maker_orders():
     st.subheader("📋 Orders")
     
-    if not st.session_state.orders:
+    orders = store.orders()
+    if not orders:
         st.info("No orders yet. 🍽️")
         return
     
-    for order in st.session_state.orders:
-        with st.expander(f"Order #{order['id']} - {order['customer']} - ₹{order['total']}"):
-            st.markdown(f"**Customer:** {order['customer']}")
-            st.markdown(f"**Status:** {order['status'].title()}")
-            st.markdown(f"**Total:** ₹{order['total']}")
+    for order in orders:
+        with st.expander(f"Order #{order.id} - {order.customer} - ₹{order.total}"):
+            st.markdown(f"**Customer:** {order.customer}")
+            st.markdown(f"**Status:** {order.status.title()}")
+            st.markdown(f"**Total:** ₹{order.total}")
             st.markdown("**Items:**")
-            for item in order['items']:
-                st.markdown(f"- {item['icon']} {item['name']} x{item['quantity']} @ ₹{item['price']}")
+            for item in order.items:
+                st.markdown(f"- {item.icon} {item.name} x{item.quantity} @ ₹{item.price}")
             
-            if order['status'] == 'pending':
-                if st.button("Confirm Order", key=f"confirm_{order['id']}"):
-                    order['status'] = 'confirmed'
+            if order.status == 'pending':
+                if st.button("Confirm Order", key=f"confirm_{order.id}"):
+                    store.set_status(order.id, 'confirmed')
                     st.success("Order confirmed! ✅")
                     st.rerun()
 
@@ -653,10 +641,10 @@ def show_menu_management():
     st.info("Menu management feature coming soon! 🚧")
 
 def show_admin_dashboard():
-    current_user = st.session_state.users[st.session_state.current_user]
+    current_user = store.get_user(st.session_state.current_user)
     
     st.title("👨‍💼 Home Flavours - Admin Dashboard")
-    st.markdown(f"Welcome back, **{current_user['full_name']}**! 👋")
+    st.markdown(f"Welcome back, **{current_user.full_name}**! 👋")
     
     tab1, tab2 = st.tabs(["📊 Overview", "👥 Users"])
     
@@ -675,7 +663,7 @@ def show_admin_overview():
         st.markdown(f"""
         <div class="metric-card">
             <h3>👥 Total Users</h3>
-            <h2>{len(st.session_state.users)}</h2>
+            <h2>{store.user_count()}</h2>
         </div>
         """, unsafe_allow_html=True)
     
@@ -683,12 +671,12 @@ def show_admin_overview():
         st.markdown(f"""
         <div class="metric-card">
             <h3>📋 Total Orders</h3>
-            <h2>{len(st.session_state.orders)}</h2>
+            <h2>{store.order_count()}</h2>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        total_revenue = sum(order['total'] for order in st.session_state.orders)
+        total_revenue = store.revenue()
         st.markdown(f"""
         <div class="metric-card">
             <h3>💰 Total Revenue</h3>
@@ -699,12 +687,15 @@ def show_admin_overview():
 def show_user_management():
     st.subheader("👥 User Management")
     
-    for username, user in st.session_state.users.items():
-        with st.expander(f"{user['full_name']} ({user['user_type']})"):
+    for username, user in store.users():
+        with st.expander(f"{user.full_name} ({user.user_type})"):
             st.markdown(f"**Username:** {username}")
-            st.markdown(f"**Email:** {user['email']}")
-            st.markdown(f"**Phone:** {user['phone']}")
-            st.markdown(f"**Type:** {user['user_type'].title()}")
+            st.markdown(f"**Email:** {user.email}")
+            st.markdown(f"**Phone:** {user.phone}")
+            st.markdown(f"**Type:** {user.user_type.title()}")
+
+# Time every show_* page when PAGE_PROFILING=1
+profile_module_pages(profiler, globals())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
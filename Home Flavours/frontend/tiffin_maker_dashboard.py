@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from database import db
+from database import db, menu_catalog, order_rollups, data_loader
 from auth import auth
 from config import WEEKLY_MENU
+from order_items_loader import OrderItemsLoader, expanded_order_ids
+from pagination import KeysetPaginator
+from query_stats import track_pages
+from page_profiler import profiler, profile_pages
 
+# Query budgets per rerun; exceeding one fails under QUERY_BUDGET_STRICT=1
+@profile_pages(profiler)
+@track_pages(db.stats, budgets={'show_orders': 8, 'show_menu_management': 3, 'show_analytics': 4})
 class TiffinMakerDashboard:
     def __init__(self):
         self.current_user = auth.get_current_user()
+        self.items_loader = OrderItemsLoader(db)
         self.tiffin_maker_id = self.get_tiffin_maker_id()
     
     def get_tiffin_maker_id(self):
@@ -58,28 +66,37 @@ class TiffinMakerDashboard:
                 value=datetime.now().date()
             )
         
-        # Build query
-        query = """
-            SELECT o.*, u.full_name, u.phone, u.address
-            FROM orders o
-            JOIN users u ON o.customer_id = u.id
-            WHERE o.tiffin_maker_id = %s
-        """
+        # Build filters
+        conditions = ["o.tiffin_maker_id = %s"]
         params = [self.tiffin_maker_id]
         
         if status_filter != "All":
-            query += " AND o.status = %s"
+            conditions.append("o.status = %s")
             params.append(status_filter)
         
-        query += " AND o.delivery_date = %s ORDER BY o.created_at DESC"
+        conditions.append("o.delivery_date = %s")
         params.append(date_filter)
         
-        orders = db.execute_query(query, tuple(params))
+        paginator = KeysetPaginator(
+            "maker_orders",
+            select="""o.id, o.order_date, o.delivery_date, o.total_amount, o.payment_method, o.status,
+                      o.delivery_address, o.special_instructions, o.created_at,
+                      u.full_name, u.phone""",
+            from_clause="orders o JOIN users u ON o.customer_id = u.id",
+            where=" AND ".join(conditions),
+            params=params,
+            time_column="o.created_at",
+            id_column="o.id"
+        )
+        orders = paginator.fetch(db)
         
         if not orders:
             st.info("No orders found for the selected criteria.")
             return
         
+        # Load items for every opened order in one query
+        order_items = self.items_loader.load(expanded_order_ids(orders, "items"))
+        
         # Display orders
         for order in orders:
             with st.expander(f"Order #{order['id']} - {order['full_name']} - ₹{order['total_amount']}"):
@@ -134,23 +151,16 @@ class TiffinMakerDashboard:
                             st.rerun()
                 
                 # Show order items
-                order_items = db.execute_query("""
-                    SELECT oi.*, mi.name, mi.description
-                    FROM order_items oi
-                    JOIN menu_items mi ON oi.menu_item_id = mi.id
-                    WHERE oi.order_id = %s
-                """, (order['id'],))
-                
-                st.markdown("**Order Items:**")
-                for item in order_items:
-                    st.markdown(f"- {item['name']} x{item['quantity']} @ ₹{item['price_per_unit']}")
+                if st.checkbox("Show order items", key=f"items_{order['id']}"):
+                    st.markdown("**Order Items:**")
+                    for item in order_items.get(order['id'], []):
+                        st.markdown(f"- {item['name']} x{item['quantity']} @ ₹{item['price_per_unit']}")
+        
+        paginator.show_navigation()
     
     def update_order_status(self, order_id, new_status):
         """Update order status"""
-        return db.execute_update(
-            "UPDATE orders SET status = %s WHERE id = %s",
-            (new_status, order_id)
-        )
+        return order_rollups.update_status(order_id, new_status)
     
     def show_menu_management(self):
         """Manage menu items"""
@@ -173,6 +183,7 @@ class TiffinMakerDashboard:
                         """, (name, description, price, day_of_week, self.tiffin_maker_id, is_available))
                         
                         if success:
+                            menu_catalog.refresh()
                             st.success("Menu item added successfully!")
                             st.rerun()
                         else:
@@ -211,12 +222,14 @@ class TiffinMakerDashboard:
                             "UPDATE menu_items SET is_available = %s WHERE id = %s",
                             (new_status, item['id'])
                         )
+                        menu_catalog.refresh()
                         st.success("Availability updated!")
                         st.rerun()
                     
                     # Delete item
                     if st.button("Delete Item", key=f"delete_{item['id']}"):
                         db.execute_update("DELETE FROM menu_items WHERE id = %s", (item['id'],))
+                        menu_catalog.refresh()
                         st.success("Item deleted!")
                         st.rerun()
     
@@ -231,52 +244,47 @@ class TiffinMakerDashboard:
         with col2:
             end_date = st.date_input("End Date", value=datetime.now().date())
         
+        # The three reports are independent, so load them concurrently
+        data = data_loader.load(
+            df_revenue=lambda: order_rollups.daily_revenue(
+                start_date, end_date, self.tiffin_maker_id, as_frame=True
+            ),
+            df_status=lambda: order_rollups.status_counts(
+                start_date, end_date, self.tiffin_maker_id, as_frame=True
+            ),
+            popular_items=("""
+                SELECT mi.name, SUM(oi.quantity) as total_ordered
+                FROM order_items oi
+                JOIN menu_items mi ON oi.menu_item_id = mi.id
+                JOIN orders o ON oi.order_id = o.id
+                WHERE o.tiffin_maker_id = %s 
+                AND o.created_at BETWEEN %s AND %s
+                AND o.status != 'cancelled'
+                GROUP BY mi.id, mi.name
+                ORDER BY total_ordered DESC
+                LIMIT 5
+            """, (self.tiffin_maker_id, start_date, end_date))
+        )
+        
         # Revenue analytics
-        revenue_data = db.execute_query("""
-            SELECT DATE(created_at) as date, SUM(total_amount) as daily_revenue
-            FROM orders 
-            WHERE tiffin_maker_id = %s 
-            AND created_at BETWEEN %s AND %s
-            AND status != 'cancelled'
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        """, (self.tiffin_maker_id, start_date, end_date))
-        
-        if revenue_data:
+        df_revenue = data['df_revenue']
+        
+        if not df_revenue.empty:
             st.markdown("### Revenue Trend")
-            df_revenue = pd.DataFrame(revenue_data)
             st.line_chart(df_revenue.set_index('date')['daily_revenue'])
             
-            total_revenue = sum(item['daily_revenue'] for item in revenue_data)
-            st.metric("Total Revenue", f"₹{total_revenue}")
+            total_revenue = df_revenue['daily_revenue'].sum()
+            st.metric("Total Revenue", f"₹{total_revenue:.2f}")
         
         # Order status distribution
-        status_data = db.execute_query("""
-            SELECT status, COUNT(*) as count
-            FROM orders 
-            WHERE tiffin_maker_id = %s 
-            AND created_at BETWEEN %s AND %s
-            GROUP BY status
-        """, (self.tiffin_maker_id, start_date, end_date))
-        
-        if status_data:
+        df_status = data['df_status']
+        
+        if not df_status.empty:
             st.markdown("### Order Status Distribution")
-            df_status = pd.DataFrame(status_data)
             st.bar_chart(df_status.set_index('status')['count'])
         
         # Popular items
-        popular_items = db.execute_query("""
-            SELECT mi.name, SUM(oi.quantity) as total_ordered
-            FROM order_items oi
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            JOIN orders o ON oi.order_id = o.id
-            WHERE o.tiffin_maker_id = %s 
-            AND o.created_at BETWEEN %s AND %s
-            AND o.status != 'cancelled'
-            GROUP BY mi.id, mi.name
-            ORDER BY total_ordered DESC
-            LIMIT 5
-        """, (self.tiffin_maker_id, start_date, end_date))
+        popular_items = data['popular_items']
         
         if popular_items:
             st.markdown("### Most Popular Items")
@@ -1,13 +1,23 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from database import db
+from database import db, menu_catalog, order_rollups
 from auth import auth
 from config import WEEKLY_MENU
+from order_service import OrderService
+from cart_service import CartService
+from pagination import KeysetPaginator
+from query_stats import track_pages
+from page_profiler import profiler, profile_pages
 
+# Query budgets per rerun; exceeding one fails under QUERY_BUDGET_STRICT=1
+@profile_pages(profiler)
+@track_pages(db.stats, budgets={'show_menu_browser': 4, 'show_cart': 8, 'show_orders': 4})
 class UserDashboard:
     def __init__(self):
         self.current_user = auth.get_current_user()
+        self.order_service = OrderService(db, rollups=order_rollups)
+        self.cart_service = CartService(db)
     
     def show_dashboard(self):
         """Main user dashboard"""
@@ -75,8 +85,8 @@ class UserDashboard:
                     
                     if quantity > 0:
                         if st.button("Add to Cart", key=f"add_{selected_day}_{i}"):
-                            self.add_to_cart(item, quantity, selected_day)
-                            st.success(f"Added {quantity} {item['name']} to cart!")
+                            if self.add_to_cart(item, quantity, selected_day):
+                                st.success(f"Added {quantity} {item['name']} to cart!")
         
         # Show tiffin makers
         st.markdown("### 🏪 Available Tiffin Makers")
@@ -88,55 +98,17 @@ class UserDashboard:
     def add_to_cart(self, item, quantity, day):
         """Add item to cart"""
         try:
-            # Check if item already in cart
-            existing_item = db.execute_query(
-                "SELECT id, quantity FROM cart WHERE customer_id = %s AND menu_item_id = %s",
-                (self.current_user['id'], item.get('id', 0))
-            )
+            # Weekly menu ids come from the in-memory catalog
+            menu_item_id = menu_catalog.resolve(day, item['name'])
+            if menu_item_id is None:
+                st.error(f"{item['name']} is not available yet.")
+                return False
             
-            if existing_item:
-                # Update quantity
-                new_quantity = existing_item[0]['quantity'] + quantity
-                db.execute_update(
-                    "UPDATE cart SET quantity = %s WHERE id = %s",
-                    (new_quantity, existing_item[0]['id'])
-                )
-            else:
-                # Add new item to cart
-                # First, create menu item if it doesn't exist
-                menu_item_id = self.create_menu_item(item, day)
-                
-                db.execute_update(
-                    "INSERT INTO cart (customer_id, menu_item_id, quantity) VALUES (%s, %s, %s)",
-                    (self.current_user['id'], menu_item_id, quantity)
-                )
+            # Insert or increment the cart row in one statement
+            return self.cart_service.add_item(self.current_user['id'], menu_item_id, quantity)
         except Exception as e:
             st.error(f"Error adding to cart: {str(e)}")
-    
-    def create_menu_item(self, item, day):
-        """Create menu item in database"""
-        # Get first available tiffin maker
-        tiffin_maker = db.execute_query(
-            "SELECT id FROM tiffin_makers WHERE is_active = TRUE LIMIT 1"
-        )
-        
-        if not tiffin_maker:
-            return None
-        
-        # Insert menu item
-        db.execute_update(
-            """INSERT INTO menu_items (name, description, price, day_of_week, tiffin_maker_id) 
-               VALUES (%s, %s, %s, %s, %s)""",
-            (item['name'], item['description'], item['price'], day, tiffin_maker[0]['id'])
-        )
-        
-        # Get the inserted item ID
-        result = db.execute_query(
-            "SELECT id FROM menu_items WHERE name = %s AND day_of_week = %s ORDER BY id DESC LIMIT 1",
-            (item['name'], day)
-        )
-        
-        return result[0]['id'] if result else None
+            return False
     
     def show_cart(self):
         """Display user's cart"""
@@ -144,7 +116,8 @@ class UserDashboard:
         
         # Get cart items
         cart_items = db.execute_query("""
-            SELECT c.id, c.quantity, mi.name, mi.price, mi.description, tm.business_name
+            SELECT c.id, c.menu_item_id, c.quantity, mi.name, mi.price, mi.description,
+                   mi.tiffin_maker_id, tm.business_name
             FROM cart c
             JOIN menu_items mi ON c.menu_item_id = mi.id
             JOIN tiffin_makers tm ON mi.tiffin_maker_id = tm.id
@@ -222,57 +195,35 @@ class UserDashboard:
     
     def place_order(self, cart_items, total, delivery_date, delivery_address, payment_method, special_instructions):
         """Place order and clear cart"""
-        try:
-            # Get tiffin maker ID (assuming first item's tiffin maker)
-            tiffin_maker_id = db.execute_query("""
-                SELECT tm.id FROM tiffin_makers tm
-                JOIN menu_items mi ON tm.id = mi.tiffin_maker_id
-                WHERE mi.id = %s
-            """, (cart_items[0]['id'],))[0]['id']
-            
-            # Create order
-            order_success = db.execute_update("""
-                INSERT INTO orders (customer_id, tiffin_maker_id, order_date, delivery_date, 
-                                 total_amount, payment_method, delivery_address, special_instructions)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (self.current_user['id'], tiffin_maker_id, datetime.now().date(), delivery_date,
-                  total, payment_method, delivery_address, special_instructions))
-            
-            if not order_success:
-                return False
-            
-            # Get order ID
-            order_id = db.execute_query("""
-                SELECT id FROM orders WHERE customer_id = %s ORDER BY created_at DESC LIMIT 1
-            """, (self.current_user['id'],))[0]['id']
-            
-            # Add order items
-            for item in cart_items:
-                db.execute_update("""
-                    INSERT INTO order_items (order_id, menu_item_id, quantity, price_per_unit)
-                    VALUES (%s, %s, %s, %s)
-                """, (order_id, item['id'], item['quantity'], item['price']))
-            
-            # Clear cart
-            db.execute_update("DELETE FROM cart WHERE customer_id = %s", (self.current_user['id'],))
-            
-            return True
-            
-        except Exception as e:
-            st.error(f"Error placing order: {str(e)}")
-            return False
+        # Orders go to the first item's tiffin maker
+        order_id = self.order_service.place_order(
+            self.current_user['id'],
+            [(item['menu_item_id'], item['quantity'], item['price']) for item in cart_items],
+            tiffin_maker_id=cart_items[0]['tiffin_maker_id'],
+            order_date=datetime.now().date(),
+            delivery_date=delivery_date,
+            total_amount=total,
+            payment_method=payment_method,
+            delivery_address=delivery_address,
+            special_instructions=special_instructions
+        )
+        return order_id is not None
     
     def show_orders(self):
         """Display user's order history"""
         st.subheader("📋 My Orders")
         
-        orders = db.execute_query("""
-            SELECT o.*, tm.business_name, tm.location
-            FROM orders o
-            JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id
-            WHERE o.customer_id = %s
-            ORDER BY o.created_at DESC
-        """, (self.current_user['id'],))
+        paginator = KeysetPaginator(
+            "my_orders",
+            select="""o.id, o.order_date, o.delivery_date, o.total_amount, o.payment_method, o.status,
+                      o.special_instructions, o.created_at, tm.business_name, tm.location""",
+            from_clause="orders o JOIN tiffin_makers tm ON o.tiffin_maker_id = tm.id",
+            where="o.customer_id = %s",
+            params=(self.current_user['id'],),
+            time_column="o.created_at",
+            id_column="o.id"
+        )
+        orders = paginator.fetch(db)
         
         if not orders:
             st.info("No orders yet. Place your first order!")
@@ -294,6 +245,8 @@ class UserDashboard:
                     st.markdown(f"**Total:** ₹{order['total_amount']}")
                     if order['special_instructions']:
                         st.markdown(f"**Special Instructions:** {order['special_instructions']}")
+        
+        paginator.show_navigation()
     
     def show_profile(self):
         """Display user profile"""